@@ -0,0 +1,10 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Common - Shared helpers for the calculator modules
+--------------------------------------------------
+Tools used by both invoCal and medTime that belong to neither of them.
+Submodules are imported explicitly so that this package stays free of
+optional dependencies such as NumPy.
+"""
@@ -0,0 +1,356 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Bench - Benchmark suite with saved baselines
+--------------------------------------------
+This module times the hot paths of the calculators and GUIs and compares them
+with a saved baseline, failing when one became significantly slower.
+
+Every benchmark is timed with timeit (best of several repeats) and divided by a
+fixed pure-Python calibration loop measured in the same run, so baselines
+recorded on one machine remain meaningful on another. Benchmarks whose optional
+dependency (NumPy, Kivy) is missing are skipped.
+
+    python -m modules.core.common.bench                # compare, exit 1 on regressions
+    python -m modules.core.common.bench --save         # record a new baseline
+    python -m modules.core.common.bench -k invoice     # only matching benchmarks
+"""
+
+import argparse
+import importlib
+import json
+import os
+import platform
+import sys
+import timeit
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+DEFAULT_BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "bench_baseline.json")
+DEFAULT_TOLERANCE = 0.30  # Fail when a benchmark is more than 30% slower than its baseline
+REPEATS = 5
+
+
+@dataclass
+class Benchmark:
+    """A named benchmark; setup returns the function that is timed"""
+    name: str
+    setup: Callable[[], Callable[[], Any]]
+    requires: Tuple[str, ...] = ()
+
+    def available(self) -> bool:
+        for module in self.requires:
+            try:
+                importlib.import_module(module)
+            except Exception:  # Kivy can fail with errors other than ImportError without a display
+                return False
+        return True
+
+
+@dataclass
+class Comparison:
+    """Result of one benchmark against the baseline"""
+    name: str
+    seconds: float
+    baseline: Optional[float]
+    ratio: Optional[float]  # Normalized current / baseline time
+
+    def regressed(self, tolerance: float) -> bool:
+        return self.ratio is not None and self.ratio > 1 + tolerance
+
+
+BENCHMARKS: List[Benchmark] = []
+
+
+def benchmark(name: str, requires: Tuple[str, ...] = ()):
+    """Register a benchmark setup function under a name"""
+    def decorator(setup):
+        BENCHMARKS.append(Benchmark(name, setup, requires))
+        return setup
+    return decorator
+
+
+def _calibration() -> float:
+    """Seconds per call of a fixed pure-Python workload"""
+    def workload():
+        total = 0
+        for value in range(1000):
+            total += value * value % 7
+        return total
+    return measure(workload)
+
+
+def measure(function: Callable[[], Any], repeats: int = REPEATS) -> float:
+    """Return the best seconds per call of function over several repeats"""
+    timer = timeit.Timer(function)
+    number, _ = timer.autorange()
+    return min(timer.repeat(repeat=repeats, number=number)) / number
+
+
+# Calculators ----------------------------------------------------------------
+
+@benchmark("invoice.single")
+def _invoice_single():
+    from modules.core.invoCal.calculator import InvoiceCalculator
+
+    def run():
+        for option in (1, 2, 3, 4):
+            InvoiceCalculator(123456.78, option).result["Alınan Net Ücret"]
+    return run
+
+
+@benchmark("invoice.batch_100k", requires=("numpy",))
+def _invoice_batch():
+    import numpy as np
+    from modules.core.invoCal.batch import calculate_batch
+    fees = np.linspace(1000, 250000, 100_000)
+    options = np.arange(100_000) % 4 + 1
+    return lambda: calculate_batch(fees, options)
+
+
+@benchmark("deadlines.calculate_dates")
+def _calculate_dates():
+    from datetime import datetime
+    from modules.core.medTime.calculator import MediationTimeCalculator
+    calculator = MediationTimeCalculator()
+    start = datetime(2025, 3, 9)
+    return lambda: calculator.calculate_dates(start)
+
+
+@benchmark("deadlines.should_calculate")
+def _should_calculate():
+    from modules.core.medTime.calculator import MediationTimeCalculator
+    calculator = MediationTimeCalculator()
+    cells = [(dispute.name, week) for dispute in calculator.get_dispute_types() for week in calculator.get_all_weeks()]
+
+    def run():
+        for name, week in cells:
+            calculator.should_calculate(name, week)
+    return run
+
+
+@benchmark("deadlines.batch_100k", requires=("numpy",))
+def _deadlines_batch():
+    import numpy as np
+    from modules.core.medTime.batch import calculate_case_deadlines
+    starts = np.datetime64("2020-01-01") + np.arange(100_000) % 2000
+    disputes = np.arange(100_000) % 8 + 1
+    return lambda: calculate_case_deadlines(starts, disputes)
+
+
+@benchmark("deadlines.docket_query_100k")
+def _docket_query():
+    from datetime import date, timedelta
+    from modules.core.medTime.docket import Docket
+    docket = Docket()
+    docket.add_many((number, date(2024, 1, 1) + timedelta(days=number % 700), number % 8 + 1)
+                    for number in range(100_000))
+
+    def run():
+        docket.between(date(2025, 3, 3), date(2025, 3, 7), (3, 4))
+        docket.upcoming(20, date(2025, 6, 1))
+    return run
+
+
+@benchmark("tariff.fee")
+def _tariff_fee():
+    from modules.core.invoCal.tariff import TariffRegistry
+    tariff = TariffRegistry.default().tariffs[-1]  # Pinned, as today may be past the last bundled table
+    cases = [("ticari", 1250000.0, 3), ("isci_isveren", None, 2), ("kira", 80000.0, 2), ("aile", 30000000.0, 12)] * 25
+
+    def run():
+        for subject, amount, parties in cases:
+            tariff.fee(subject, amount, parties)
+    return run
+
+
+@benchmark("tariff.fee_batch_100k", requires=("numpy",))
+def _tariff_fee_batch():
+    import numpy as np
+    from modules.core.invoCal.tariff import TariffRegistry
+    registry = TariffRegistry.default()
+    subjects = np.array(["ticari", "isci_isveren", "kira", "aile"])[np.arange(100_000) % 4]
+    amounts = np.where(np.arange(100_000) % 3 == 0, np.nan, np.linspace(0, 5e7, 100_000))
+    parties = np.arange(100_000) % 12 + 2
+    on = np.datetime64(registry.tariffs[-1].effective_from, "D")
+    return lambda: registry.fee_batch(subjects, amounts, parties, dates=on)
+
+
+# Parsing and formatting ------------------------------------------------------
+
+@benchmark("format.parse_amount")
+def _parse_amount():
+    from modules.core.common.formatting import parse_amount
+    values = ["1.234.567,89", "100000", "12,5", "999.999,99"] * 25
+    return lambda: [parse_amount(value) for value in values]
+
+
+@benchmark("format.format_amount")
+def _format_amount():
+    from modules.core.common.formatting import format_amount
+    values = [1234567.891, 100000.0, 12.5, 999999.99] * 25
+    return lambda: [format_amount(value) for value in values]
+
+
+@benchmark("format.parse_amounts_100k")
+def _parse_amounts():
+    from modules.core.common.formatting import parse_amounts
+    values = ["1.234.567,89", "100000", "12,5", "999.999,99"] * 25_000
+    return lambda: parse_amounts(values)
+
+
+@benchmark("format.format_amounts_100k", requires=("numpy",))
+def _format_amounts():
+    import numpy as np
+    from modules.core.common.formatting import format_amounts
+    values = np.linspace(-1e7, 1e7, 100_000)
+    return lambda: format_amounts(values, symbol=True)
+
+
+# Headless GUI refresh ---------------------------------------------------------
+
+@benchmark("gui.deadline_table_refresh", requires=("kivy",))
+def _deadline_table_refresh():
+    from datetime import datetime
+    from modules.core.medTime.gui import MediationTimeGUI
+    gui = MediationTimeGUI()
+    dates = [datetime(2025, 3, 9), datetime(2025, 3, 10)]
+    state = {"index": 0}
+
+    def run():
+        # Alternate dates so every call really changes the shown cells
+        state["index"] ^= 1
+        gui._show_dates(dates[state["index"]])
+    return run
+
+
+@benchmark("gui.invoice_screen_refresh", requires=("kivy",))
+def _invoice_screen_refresh():
+    from kivy.lang import Builder
+    from modules.core.invoCal.gui import InvoiceScreen
+    kv_path = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "invoCal", "invoice.kv")
+    if kv_path not in Builder.files:
+        Builder.load_file(kv_path)
+    screen = InvoiceScreen()
+    screen.ids.option_spinner.text = "KDV Dahil, Stopaj Hariç"
+    fees = ["100.000,00", "100.000,01"]
+    state = {"index": 0}
+
+    def run():
+        state["index"] ^= 1
+        screen.ids.fee_input.text = fees[state["index"]]
+        screen.calculate(live=True)  # Explicit calculations would also save to the history
+    return run
+
+
+# Running and comparing --------------------------------------------------------
+
+def run_benchmarks(pattern: Optional[str] = None) -> Tuple[Dict[str, float], List[str]]:
+    """Run the registered benchmarks
+
+    Args:
+        pattern: Only run benchmarks whose name contains this text
+
+    Returns:
+        Tuple[Dict[str, float], List[str]]: Seconds per call by name, and the
+        names skipped for missing dependencies
+    """
+    results: Dict[str, float] = {}
+    skipped: List[str] = []
+    for item in BENCHMARKS:
+        if pattern and pattern not in item.name:
+            continue
+        if not item.available():
+            skipped.append(item.name)
+            continue
+        results[item.name] = measure(item.setup())
+    return results, skipped
+
+
+def compare(results: Dict[str, float], calibration: float,
+            baseline: Optional[Dict[str, Any]]) -> List[Comparison]:
+    """Compare results with a baseline, normalized by each run's calibration time"""
+    comparisons = []
+    recorded = (baseline or {}).get("benchmarks", {})
+    base_calibration = (baseline or {}).get("calibration")
+    for name, seconds in results.items():
+        previous = recorded.get(name)
+        ratio = None
+        if previous and base_calibration:
+            ratio = (seconds / calibration) / (previous / base_calibration)
+        comparisons.append(Comparison(name, seconds, previous, ratio))
+    return comparisons
+
+
+def load_baseline(path: str) -> Optional[Dict[str, Any]]:
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding="utf-8") as handle:
+        return json.load(handle)
+
+
+def save_baseline(path: str, results: Dict[str, float], calibration: float) -> None:
+    """Write results as the new baseline, keeping entries of benchmarks not run"""
+    baseline = load_baseline(path) or {}
+    benchmarks = dict(baseline.get("benchmarks", {}))
+    if baseline.get("calibration"):
+        # Rescale kept entries to this run's calibration so they stay comparable
+        scale = calibration / baseline["calibration"]
+        benchmarks = {name: seconds * scale for name, seconds in benchmarks.items()}
+    benchmarks.update(results)
+    with open(path, "w", encoding="utf-8") as handle:
+        json.dump({
+            "python": platform.python_version(),
+            "machine": platform.machine(),
+            "calibration": calibration,
+            "benchmarks": dict(sorted(benchmarks.items())),
+        }, handle, indent=2)
+        handle.write("\n")
+
+
+def _format_seconds(seconds: Optional[float]) -> str:
+    if seconds is None:
+        return "-"
+    for unit, scale in (("s", 1), ("ms", 1e-3), ("us", 1e-6)):
+        if seconds >= scale:
+            return f"{seconds / scale:.2f} {unit}"
+    return f"{seconds / 1e-9:.0f} ns"
+
+
+def main(argv=None) -> int:
+    """Command line entry point; returns 1 when a benchmark regressed"""
+    parser = argparse.ArgumentParser(description="Run the benchmark suite and compare with the baseline.")
+    parser.add_argument("-k", "--filter", help="Only run benchmarks whose name contains this text")
+    parser.add_argument("--baseline", default=DEFAULT_BASELINE, help="Baseline JSON file")
+    parser.add_argument("--save", action="store_true", help="Save the results as the new baseline")
+    parser.add_argument("--tolerance", type=float, default=DEFAULT_TOLERANCE,
+                        help="Allowed slowdown before failing (default: 0.30 = 30%%)")
+    args = parser.parse_args(argv)
+
+    calibration = _calibration()
+    results, skipped = run_benchmarks(args.filter)
+    comparisons = compare(results, calibration, load_baseline(args.baseline))
+
+    print(f"{'benchmark':32} {'current':>12} {'baseline':>12} {'ratio':>7}")
+    for item in comparisons:
+        ratio = "-" if item.ratio is None else f"{item.ratio:.2f}"
+        flag = "  SLOWER" if item.regressed(args.tolerance) else ""
+        print(f"{item.name:32} {_format_seconds(item.seconds):>12} {_format_seconds(item.baseline):>12} {ratio:>7}{flag}")
+    for name in skipped:
+        print(f"{name:32} {'skipped (missing dependency)':>33}")
+
+    if args.save:
+        save_baseline(args.baseline, results, calibration)
+        print(f"Baseline saved to {args.baseline}")
+        return 0
+
+    regressions = [item.name for item in comparisons if item.regressed(args.tolerance)]
+    if regressions:
+        print(f"Regressions over {args.tolerance:.0%}: {', '.join(regressions)}", file=sys.stderr)
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,101 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Cache - Bounded LRU memoization for calculator results
+------------------------------------------------------
+This module provides the small LRU cache used by the opt-in memoization of
+InvoiceCalculator and MediationTimeCalculator. Every cache carries a version
+token (the tax rate, the dispute definitions, ...); when the token changes the
+cache is emptied so stale results are never served.
+"""
+
+from collections import OrderedDict
+from threading import Lock
+from typing import Any, Callable, Hashable, NamedTuple
+
+
+class CacheInfo(NamedTuple):
+    """Snapshot of cache counters"""
+    hits: int
+    misses: int
+    maxsize: int
+    currsize: int
+    invalidations: int
+
+
+class LRUCache:
+    """Thread-safe least-recently-used cache with hit/miss counters"""
+
+    def __init__(self, maxsize: int = 1024):
+        """Create an empty cache
+
+        Args:
+            maxsize: Maximum number of entries kept; the least recently used
+                entry is evicted first
+
+        Raises:
+            ValueError: If maxsize is not positive
+        """
+        if maxsize < 1:
+            raise ValueError("maxsize must be at least 1")
+        self.maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+        self.invalidations = 0
+        self._data = OrderedDict()
+        self._version = None
+        self._lock = Lock()
+
+    def get_or_compute(self, key: Hashable, compute: Callable[[], Any], version: Hashable = None) -> Any:
+        """Return the cached value for key, computing and storing it on a miss
+
+        Args:
+            key: Cache key
+            compute: Called without arguments to produce the value on a miss
+            version: Token describing the inputs the values depend on; a
+                different token than the previous call clears the cache
+
+        Returns:
+            Any: The cached or newly computed value
+        """
+        with self._lock:
+            if version != self._version:
+                if self._data:
+                    self._data.clear()
+                    self.invalidations += 1
+                self._version = version
+            try:
+                value = self._data[key]
+            except KeyError:
+                self.misses += 1
+            else:
+                self._data.move_to_end(key)
+                self.hits += 1
+                return value
+
+        value = compute()
+        with self._lock:
+            if version == self._version:
+                self._data[key] = value
+                if len(self._data) > self.maxsize:
+                    self._data.popitem(last=False)
+        return value
+
+    def clear(self) -> None:
+        """Drop every entry and count it as an invalidation"""
+        with self._lock:
+            self._data.clear()
+            self.invalidations += 1
+
+    def info(self) -> CacheInfo:
+        """Return the current counters
+
+        Returns:
+            CacheInfo: Hits, misses, size limit, current size and invalidations
+        """
+        with self._lock:
+            return CacheInfo(self.hits, self.misses, self.maxsize, len(self._data), self.invalidations)
+
+    def __len__(self) -> int:
+        return len(self._data)
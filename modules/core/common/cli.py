@@ -0,0 +1,271 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+CLI - One-shot command line calculations
+----------------------------------------
+This module answers a single invoice or deadline question and exits. It only
+imports the pure-Python calculators, never Kivy or NumPy, so it starts in a few
+tens of milliseconds and is safe to call from scripts.
+
+    python -m modules.core.common.cli invoice 100000 --option 2
+    python -m modules.core.common.cli invoice 100000 --date 01.01.2023 --json
+    python -m modules.core.common.cli deadlines 01.03.2025 --dispute 1 --holidays
+    python -m modules.core.common.cli invoice 100000 --record
+    python -m modules.core.common.cli history receipts --from 01.01.2025 --fee-min 50000
+"""
+
+import argparse
+import json
+import sys
+from datetime import datetime
+from typing import Any, Dict, List, Optional
+
+from .formatting import format_amount, parse_amount
+
+DATE_FORMAT = "%d.%m.%Y"
+
+
+def _parse_date(value: str) -> datetime:
+    try:
+        return datetime.strptime(value, DATE_FORMAT)
+    except ValueError:
+        raise argparse.ArgumentTypeError(f"Invalid date '{value}'. Expected format: DD.MM.YYYY")
+
+
+def _parse_fee(value: str) -> float:
+    try:
+        return parse_amount(value)
+    except ValueError as e:
+        raise argparse.ArgumentTypeError(str(e))
+
+
+def invoice(fee: float, option: int, invoice_date: Optional[datetime] = None) -> Dict[str, Any]:
+    """Calculate one serbest meslek makbuzu
+
+    Args:
+        fee: Mediation fee in ₺
+        option: CalculationOption value (1-4)
+        invoice_date: Use the tax rates in force on this date (current rates if None)
+
+    Returns:
+        Dict[str, Any]: Fee, option, receipt lines as {line: [tuzel, gercek]}
+            and the printed label of each line, showing the rates in force
+    """
+    from modules.core.invoCal.calculator import InvoiceCalculator
+
+    if invoice_date is None:
+        calculator = InvoiceCalculator(fee, option)
+    else:
+        from modules.core.invoCal.regimes import DEFAULT_REGISTRY
+        calculator = DEFAULT_REGISTRY.calculator(fee, option, invoice_date)
+    return {
+        "fee": fee,
+        "option": option,
+        "lines": {line: [round(tuzel, 2), round(gercek, 2)] for line, (tuzel, gercek) in calculator.result.items()},
+        "labels": {line: calculator.line_label(line) for line in calculator.result},
+    }
+
+
+def deadlines(start_date: datetime, disputes: Optional[List[str]] = None,
+              holidays: bool = False, judicial_recess: bool = False) -> Dict[str, Any]:
+    """Calculate the deadlines of one start date
+
+    Args:
+        start_date: Start date of the mediation
+        disputes: Dispute ids or names to include (all dispute types if None)
+        holidays: Move deadlines off weekends and public holidays
+        judicial_recess: Also extend deadlines that fall into the judicial recess
+
+    Returns:
+        Dict[str, Any]: Start date and {dispute name: {week: "DD.MM.YYYY"}}
+
+    Raises:
+        ValueError: If a dispute id or name is unknown
+    """
+    from modules.core.medTime.calculator import MediationTimeCalculator
+
+    work_calendar = None
+    if holidays or judicial_recess:
+        from modules.core.medTime.workdays import WorkCalendar
+        # A small year range keeps the calendar build in the low milliseconds
+        work_calendar = WorkCalendar(start_date.year, start_date.year + 1, judicial_recess=judicial_recess)
+    calculator = MediationTimeCalculator(work_calendar=work_calendar)
+    registry = calculator.registry
+
+    selected = list(registry)
+    if disputes:
+        selected = []
+        for value in disputes:
+            dispute = registry.get(int(value)) if value.isdigit() else registry.get(value)
+            if dispute is None:
+                raise ValueError(f"Unknown dispute type: {value}")
+            selected.append(dispute)
+
+    dates = calculator.calculate_dates(start_date)
+    return {
+        "start_date": start_date.strftime(DATE_FORMAT),
+        "disputes": {
+            dispute.name: {
+                str(week): dates[week].strftime(DATE_FORMAT)
+                for week in sorted(registry.weeks_for(dispute.id)) if week in dates
+            }
+            for dispute in selected
+        },
+    }
+
+
+def record(result: Dict[str, Any], invoice_date: Optional[datetime] = None, path: Optional[str] = None) -> None:
+    """Save an invoice() or deadlines() result in the history store"""
+    from .history import HistoryStore
+
+    with HistoryStore(path) as store:
+        if "lines" in result:
+            from modules.core.invoCal.calculator import InvoiceCalculator
+            if invoice_date is None:
+                calculator = InvoiceCalculator(result["fee"], result["option"])
+            else:
+                from modules.core.invoCal.regimes import DEFAULT_REGISTRY
+                calculator = DEFAULT_REGISTRY.calculator(result["fee"], result["option"], invoice_date)
+            store.add_receipt(calculator, invoice_date)
+        else:
+            from modules.core.medTime.disputes import DisputeRegistry
+            registry = DisputeRegistry.default()
+            start_date = datetime.strptime(result["start_date"], DATE_FORMAT)
+            store.add_deadline_rows(
+                (None, start_date, registry.get(name).id, int(week), datetime.strptime(day, DATE_FORMAT))
+                for name, weeks in result["disputes"].items() for week, day in weeks.items()
+            )
+
+
+def history(args: argparse.Namespace) -> Dict[str, Any]:
+    """Return one page of the history store as plain data
+
+    Returns:
+        Dict[str, Any]: Rows and the --after value of the next page (None at the end)
+    """
+    from .history import HistoryStore
+
+    after = None
+    if args.after:
+        key, _, row_id = args.after.rpartition("/")
+        after = (float(key) if args.order == "fee" else int(key) if args.order == "id" else key, int(row_id))
+    date_from = args.date_from and args.date_from.date()
+    date_to = args.date_to and args.date_to.date()
+    with HistoryStore(args.db) as store:
+        if args.table == "receipts":
+            page = store.receipts(date_from, date_to, args.fee_min, args.fee_max, args.option,
+                                  order=args.order or "date", descending=args.desc, after=after, limit=args.limit)
+            rows = [{"id": row.id, "invoice_date": row.invoice_date.strftime(DATE_FORMAT), "fee": row.fee,
+                     "option": row.option, "lines": row.lines} for row in page.rows]
+        else:
+            page = store.deadlines(date_from, date_to, args.dispute, args.week, args.case,
+                                   order=args.order or "deadline", descending=args.desc, after=after, limit=args.limit)
+            rows = [{"id": row.id, "case_id": row.case_id, "start_date": row.start_date.strftime(DATE_FORMAT),
+                     "dispute_id": row.dispute_id, "week": row.week,
+                     "deadline": row.deadline.strftime(DATE_FORMAT)} for row in page.rows]
+    cursor = page.next_cursor
+    return {"rows": rows, "next": None if cursor is None else f"{cursor[0]}/{cursor[1]}"}
+
+
+def _print_invoice(result: Dict[str, Any]) -> None:
+    print(f"₺{format_amount(result['fee'])} - seçenek {result['option']}")
+    print("{:30} {:>15} {:>15}".format("Makbuza Yazılacak", "Tüzel Kişi", "Gerçek Kişi"))
+    print("=" * 65)
+    for line, (tuzel, gercek) in result["lines"].items():
+        print("{:30} {:>15} {:>15}".format(result["labels"][line], format_amount(tuzel, symbol=True), format_amount(gercek, symbol=True)))
+
+
+def _print_deadlines(result: Dict[str, Any]) -> None:
+    print(f"Başlangıç: {result['start_date']}")
+    for name, weeks in result["disputes"].items():
+        print(f"{name}: " + ", ".join(f"{week}. hafta {day}" for week, day in weeks.items()))
+
+
+def _print_history(result: Dict[str, Any]) -> None:
+    for row in result["rows"]:
+        if "fee" in row:
+            net = row["lines"].get("Alınan Net Ücret", ["-", "-"])
+            print(f"#{row['id']:<8} {row['invoice_date']}  {format_amount(row['fee'], symbol=True):>18}  "
+                  f"seçenek {row['option']}  net {format_amount(net[0], symbol=True)} / {format_amount(net[1], symbol=True)}")
+        else:
+            case = f"  {row['case_id']}" if row["case_id"] else ""
+            print(f"#{row['id']:<8} {row['deadline']}  {row['week']}. hafta  uyuşmazlık {row['dispute_id']}  "
+                  f"başlangıç {row['start_date']}{case}")
+    if result["next"]:
+        print(f"Sonraki sayfa: --after {result['next']}")
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(prog="calc", description="One-shot mediation fee and deadline calculations.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    invoice_parser = commands.add_parser("invoice", help="Serbest meslek makbuzu lines for a fee")
+    invoice_parser.add_argument("fee", type=_parse_fee, help="Mediation fee in ₺, Turkish formatted (100.000 or 1.000,50)")
+    invoice_parser.add_argument("-o", "--option", type=int, choices=(1, 2, 3, 4), default=1,
+                                help="1: KDV ve stopaj dahil, 2: KDV dahil stopaj hariç, "
+                                     "3: KDV ve stopaj hariç, 4: KDV hariç stopaj dahil (default: 1)")
+    invoice_parser.add_argument("--date", type=_parse_date, help="Invoice date for historical tax rates (DD.MM.YYYY)")
+    invoice_parser.add_argument("--json", action="store_true", help="Print JSON")
+    invoice_parser.add_argument("--record", action="store_true", help="Save the receipt in the history store")
+
+    deadline_parser = commands.add_parser("deadlines", help="Mediation deadlines for a start date")
+    deadline_parser.add_argument("start_date", nargs="?", type=_parse_date, help="Start date (default: today)")
+    deadline_parser.add_argument("-d", "--dispute", action="append", help="Dispute id or name (repeatable)")
+    deadline_parser.add_argument("--holidays", action="store_true", help="Move deadlines off weekends and holidays")
+    deadline_parser.add_argument("--recess", action="store_true", help="Extend deadlines in the judicial recess")
+    deadline_parser.add_argument("--json", action="store_true", help="Print JSON")
+    deadline_parser.add_argument("--record", action="store_true", help="Save the deadlines in the history store")
+
+    history_parser = commands.add_parser("history", help="Browse recorded receipts or deadlines page by page")
+    history_parser.add_argument("table", choices=("receipts", "deadlines"))
+    history_parser.add_argument("--from", dest="date_from", type=_parse_date,
+                                help="First invoice/deadline date (DD.MM.YYYY)")
+    history_parser.add_argument("--to", dest="date_to", type=_parse_date, help="Last invoice/deadline date (DD.MM.YYYY)")
+    history_parser.add_argument("--fee-min", type=_parse_fee, help="Smallest fee (receipts)")
+    history_parser.add_argument("--fee-max", type=_parse_fee, help="Largest fee (receipts)")
+    history_parser.add_argument("-o", "--option", type=int, choices=(1, 2, 3, 4), help="Calculation option (receipts)")
+    history_parser.add_argument("-d", "--dispute", type=int, help="Dispute id (deadlines)")
+    history_parser.add_argument("--week", type=int, help="Week (deadlines)")
+    history_parser.add_argument("--case", help="Case id (deadlines)")
+    history_parser.add_argument("--order", choices=("id", "date", "fee", "deadline", "start"),
+                                help="Sort key (default: date for receipts, deadline for deadlines)")
+    history_parser.add_argument("--desc", action="store_true", help="Newest or largest first")
+    history_parser.add_argument("--after", help="Continue after this cursor (printed below each page)")
+    history_parser.add_argument("--limit", type=int, default=20, help="Rows per page (default: 20)")
+    history_parser.add_argument("--db", help="History database (default: $MEDCALC_HISTORY or ~/.mediationcalculator)")
+    history_parser.add_argument("--json", action="store_true", help="Print JSON")
+    return parser
+
+
+def main(argv=None) -> int:
+    """Command line entry point; returns the process exit code"""
+    args = build_parser().parse_args(argv)
+    try:
+        if args.command == "invoice":
+            result = invoice(args.fee, args.option, args.date)
+            printer = _print_invoice
+            if args.record:
+                record(result, args.date)
+        elif args.command == "deadlines":
+            start_date = args.start_date or datetime.combine(datetime.today().date(), datetime.min.time())
+            result = deadlines(start_date, args.dispute, args.holidays, args.recess)
+            printer = _print_deadlines
+            if args.record:
+                record(result)
+        else:
+            result = history(args)
+            printer = _print_history
+    except ValueError as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+
+    if args.json:
+        print(json.dumps(result, ensure_ascii=False))
+    else:
+        printer(result)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
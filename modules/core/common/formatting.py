@@ -0,0 +1,203 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Formatting - Turkish amount parsing and formatting
+--------------------------------------------------
+This module is the one place where amounts are turned into text and back, so
+the CLI, the GUIs and exports all show "1.234.567,89 ₺" the same way.
+
+The parser is strict: dots must group the integer part in threes and a comma
+separates the decimals, so ambiguous input such as "12.5" is rejected instead
+of silently read as 125. The column functions work on whole lists at once: the
+formatter lays out the text of a column in one pass (vectorized with NumPy
+when it is installed) and the parser cleans a validated column as one text,
+so a million amounts are formatted in a fraction of a second.
+"""
+
+import math
+import re
+from typing import Iterable, List, Sequence
+
+CURRENCY_SYMBOL = "₺"
+
+_NUMBER = r"[+-]?(?:\d{1,3}(?:\.\d{3})+|\d+)(?:,\d+)?"
+_AMOUNT = r"[ \t]*(?:₺[ \t]*)?" + _NUMBER + r"(?:[ \t]*₺)?[ \t]*"
+_AMOUNT_RE = re.compile(_AMOUNT)
+_PADDING = " \t" + CURRENCY_SYMBOL
+_SMALL_COLUMN = 256  # Shorter lists are formatted faster without NumPy's setup cost
+
+
+def _invalid(value: str, row: int = None) -> ValueError:
+    # Every caller of the parsers is Turkish, so the messages are too
+    if row is not None:
+        return ValueError(f"Satır {row}: geçersiz tutar '{value}'; 1.234,56 biçiminde giriniz")
+    return ValueError(f"Geçersiz tutar '{value}'; 1.234,56 biçiminde giriniz")
+
+
+def parse_amount(text: str) -> float:
+    """Parse a Turkish formatted amount such as "1.234,56" or "₺ 100000"
+
+    Args:
+        text: Amount with optional thousands dots, decimal comma and ₺ sign
+
+    Returns:
+        float: The amount
+
+    Raises:
+        ValueError: If the text is not a well-formed Turkish number
+    """
+    if not isinstance(text, str) or _AMOUNT_RE.fullmatch(text) is None:
+        raise _invalid(text)
+    return float(text.strip(_PADDING).replace(".", "").replace(",", "."))
+
+
+def parse_amounts(values: Sequence[str]) -> List[float]:
+    """Parse a column of Turkish formatted amounts
+
+    Args:
+        values: Amount texts as accepted by parse_amount
+
+    Returns:
+        List[float]: The amounts in input order
+
+    Raises:
+        ValueError: Naming the first malformed row (1-based)
+    """
+    values = list(values)
+    try:
+        valid = all(map(_AMOUNT_RE.fullmatch, values))
+    except TypeError:  # A value that is not text
+        valid = False
+    if not valid:
+        for row, value in enumerate(values, start=1):
+            if not isinstance(value, str) or _AMOUNT_RE.fullmatch(value) is None:
+                raise _invalid(value, row)
+    if not values:
+        return []
+    # Validated rows cannot contain newlines, so the column is cleaned as one text
+    text = "\n".join(value.strip(_PADDING) for value in values)
+    return list(map(float, text.replace(".", "").replace(",", ".").split("\n")))
+
+
+def format_amount(value: float, decimals: int = 2, symbol: bool = False) -> str:
+    """Format an amount the Turkish way, e.g. 1234567.891 -> "1.234.567,89"
+
+    Args:
+        value: Amount to format
+        decimals: Number of decimals
+        symbol: Append " ₺"
+
+    Raises:
+        ValueError: If the value is NaN or infinite
+    """
+    if not math.isfinite(value):
+        raise ValueError(f"Sonlu olmayan tutar biçimlendirilemez: {value}")
+    # Group with "_" so the separators can be swapped with two replaces
+    text = format(value, f"_.{decimals}f").replace(".", ",").replace("_", ".")
+    return f"{text} {CURRENCY_SYMBOL}" if symbol else text
+
+
+def format_amounts(values: Iterable[float], decimals: int = 2, symbol: bool = False) -> List[str]:
+    """Format a column of amounts; gives the same text as format_amount per value
+
+    Args:
+        values: Amounts (a list, tuple or NumPy array)
+        decimals: Number of decimals
+        symbol: Append " ₺" to every amount
+
+    Returns:
+        List[str]: Formatted amounts in input order
+
+    Raises:
+        ValueError: If an amount is NaN or infinite
+    """
+    if isinstance(values, (list, tuple)) and len(values) < _SMALL_COLUMN:
+        return _format_amounts_python(list(values), decimals, symbol)
+    try:
+        import numpy as np
+    except ImportError:
+        return _format_amounts_python(list(values), decimals, symbol)
+    return _format_amounts_numpy(np, np.asarray(values, dtype=np.float64).ravel(), decimals, symbol)
+
+
+def _format_amounts_python(values: List[float], decimals: int, symbol: bool) -> List[str]:
+    if not values:
+        return []
+    if not all(math.isfinite(value) for value in values):
+        raise ValueError("Sonlu olmayan tutarlar biçimlendirilemez")
+    suffix = f" {CURRENCY_SYMBOL}" if symbol else ""
+    # One format call over the whole column, then the separators are swapped once
+    template = ("{:_.%df}%s\n" % (decimals, suffix)) * len(values)
+    return template.format(*values).replace(".", ",").replace("_", ".").split("\n")[:-1]
+
+
+# Values beyond this lose cent precision in float64 and would overflow int64
+_NUMPY_LIMIT = 2.0 ** 52
+
+
+def _format_amounts_numpy(np, values, decimals: int, symbol: bool) -> List[str]:
+    """Lay every amount out right-aligned in a byte matrix, then drop the padding
+
+    Each row holds a sign column, the integer digits with their thousands
+    dots, the decimal comma and digits, and a newline. Unused leading cells
+    are zero bytes, which are removed before the column is decoded at once.
+    """
+    count = len(values)
+    if count == 0:
+        return []
+    if not np.isfinite(values).all():
+        raise ValueError("Sonlu olmayan tutarlar biçimlendirilemez")
+    scale = 10 ** decimals
+    scaled = np.abs(values) * scale
+    if scaled.max() >= _NUMPY_LIMIT:
+        return _format_amounts_python(values.tolist(), decimals, symbol)
+
+    units = np.rint(scaled).astype(np.int64)
+    # Scaling is inexact, so near-ties are rounded by format() itself from the exact value
+    ties = np.flatnonzero(np.abs(scaled - np.floor(scaled) - 0.5) < np.maximum(scaled * 1e-15, 1e-6))
+    for index in ties.tolist():
+        units[index] = int(format(abs(float(values[index])), f".{decimals}f").replace(".", ""))
+    whole, fraction = np.divmod(units, scale)
+    digits = max(1, len(str(int(whole.max()))))
+    suffix = (" " + CURRENCY_SYMBOL).encode("utf-8") if symbol else b""
+
+    columns = []  # Left to right: (kind, position)
+    for position in range(digits - 1, -1, -1):
+        columns.append(("digit", position))
+        if position and position % 3 == 0:
+            columns.append(("dot", position))
+    width = 1 + len(columns) + (1 + decimals if decimals else 0) + len(suffix) + 1
+    # Filled column by column, so each column is contiguous until the final transpose
+    table = np.zeros((width, count), dtype=np.uint8)
+
+    # A minus sign is kept for values that round to zero, like format() does
+    table[0] = np.signbit(values) * np.uint8(ord("-"))
+    remaining = whole.copy()
+    digit = {}
+    for position in range(digits):
+        remaining, digit[position] = np.divmod(remaining, 10)
+    for index, (kind, position) in enumerate(columns, start=1):
+        if kind == "dot":
+            table[index] = (whole >= 10 ** position) * np.uint8(ord("."))
+        elif position:
+            table[index] = (whole >= 10 ** position) * (digit[position] + ord("0")).astype(np.uint8)
+        else:
+            table[index] = digit[position] + ord("0")
+
+    index = 1 + len(columns)
+    if decimals:
+        table[index] = ord(",")
+        remaining = fraction
+        for offset in range(decimals, 0, -1):
+            remaining, table[index + offset] = np.divmod(remaining, 10)
+            table[index + offset] += ord("0")
+        index += 1 + decimals
+    for byte in suffix:
+        table[index] = byte
+        index += 1
+    table[index] = ord("\n")
+
+    flat = table.T.ravel()
+    text = flat[flat != 0].tobytes().decode("utf-8")
+    return text.split("\n")[:-1]
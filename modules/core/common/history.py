@@ -0,0 +1,364 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+History - Persistent store of issued receipts and computed deadlines
+--------------------------------------------------------------------
+This module keeps every recorded invoice and deadline calculation in an
+embedded SQLite database, so they can be looked up later instead of being
+recalculated.
+
+The database runs in WAL mode, so the GUI and the CLI can read while another
+process writes. Records are buffered and written with one executemany per
+batch. Receipts are indexed by invoice date, fee and option, deadlines by
+deadline date, start date and dispute type. Queries are keyset paginated: a
+page ends with a cursor (sort key, row id) and the next page starts right after
+it through the index, so browsing millions of rows only ever reads one page.
+
+    store = HistoryStore("history.sqlite3")
+    store.add_receipt(InvoiceCalculator(100000, 1))
+    page = store.receipts(date_from=date(2025, 1, 1), fee_min=50000)
+    page = store.receipts(date_from=date(2025, 1, 1), fee_min=50000, after=page.next_cursor)
+"""
+
+import json
+import os
+import sqlite3
+from datetime import date, datetime
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Sequence, Tuple, Union
+
+ENV_VARIABLE = "MEDCALC_HISTORY"
+DATABASE_FILE = "history.sqlite3"
+DEFAULT_BATCH_SIZE = 500
+DEFAULT_PAGE_SIZE = 50
+CACHE_KIB = 16384  # Page cache per connection; keeps the index pages of bulk inserts in memory
+
+DateLike = Union[date, datetime, str]
+Cursor = Tuple[Any, int]
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS receipts (
+    id INTEGER PRIMARY KEY,
+    recorded_at TEXT NOT NULL,
+    invoice_date TEXT NOT NULL,
+    fee REAL NOT NULL,
+    option INTEGER NOT NULL,
+    kdv_rate REAL NOT NULL,
+    stopaj_rate REAL NOT NULL,
+    lines TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS receipts_by_date ON receipts (invoice_date, id);
+CREATE INDEX IF NOT EXISTS receipts_by_fee ON receipts (fee, id);
+CREATE INDEX IF NOT EXISTS receipts_by_option ON receipts (option, invoice_date, id);
+
+CREATE TABLE IF NOT EXISTS deadlines (
+    id INTEGER PRIMARY KEY,
+    recorded_at TEXT NOT NULL,
+    case_id TEXT,
+    start_date TEXT NOT NULL,
+    dispute_id INTEGER NOT NULL,
+    week INTEGER NOT NULL,
+    deadline TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS deadlines_by_date ON deadlines (deadline, id);
+CREATE INDEX IF NOT EXISTS deadlines_by_start ON deadlines (start_date, id);
+CREATE INDEX IF NOT EXISTS deadlines_by_dispute ON deadlines (dispute_id, deadline, id);
+"""
+
+# Sort keys a page can be ordered by, per table
+RECEIPT_ORDERS = {"id": "id", "date": "invoice_date", "fee": "fee"}
+DEADLINE_ORDERS = {"id": "id", "deadline": "deadline", "start": "start_date"}
+
+
+_LINES_ENCODER = json.JSONEncoder(ensure_ascii=False, separators=(",", ":"))
+
+
+class Receipt(NamedTuple):
+    """One recorded serbest meslek makbuzu"""
+    id: int
+    recorded_at: str
+    invoice_date: date
+    fee: float
+    option: int
+    kdv_rate: float
+    stopaj_rate: float
+    lines: Dict[str, List[float]]  # Receipt line -> [tuzel, gercek]
+
+
+class Deadline(NamedTuple):
+    """One recorded deadline of a dispute type and week"""
+    id: int
+    recorded_at: str
+    case_id: Optional[str]
+    start_date: date
+    dispute_id: int
+    week: int
+    deadline: date
+
+
+class Page(NamedTuple):
+    """A page of query results and the cursor of the next page (None at the end)"""
+    rows: List[Any]
+    next_cursor: Optional[Cursor]
+
+
+def default_path(folder: Optional[str] = None) -> str:
+    """Return the database path: $MEDCALC_HISTORY, else history.sqlite3 in folder
+
+    Args:
+        folder: Directory for the database (default: ~/.mediationcalculator)
+    """
+    if os.environ.get(ENV_VARIABLE):
+        return os.environ[ENV_VARIABLE]
+    folder = folder or os.path.join(os.path.expanduser("~"), ".mediationcalculator")
+    return os.path.join(folder, DATABASE_FILE)
+
+
+def _iso(value: DateLike) -> str:
+    if isinstance(value, str):
+        return date.fromisoformat(value).isoformat()  # Validates the text
+    if isinstance(value, datetime):
+        return value.date().isoformat()
+    return value.isoformat()
+
+
+def _now() -> str:
+    return datetime.now().isoformat(timespec="seconds")
+
+
+class HistoryStore:
+    """SQLite store of receipts and deadlines with batched writes and paged reads"""
+
+    def __init__(self, path: Optional[str] = None, batch_size: int = DEFAULT_BATCH_SIZE):
+        """Open (and create if needed) a history database
+
+        Args:
+            path: Database file, ":memory:" for a temporary store (default: default_path())
+            batch_size: Number of buffered records that triggers a write
+
+        Raises:
+            ValueError: If batch_size is not positive
+        """
+        if batch_size < 1:
+            raise ValueError("batch_size must be at least 1")
+        self.path = path or default_path()
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(os.path.abspath(self.path)), exist_ok=True)
+        self.batch_size = batch_size
+        self.connection = sqlite3.connect(self.path)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        # WAL with synchronous=NORMAL only syncs at checkpoints and stays crash-safe
+        self.connection.execute("PRAGMA synchronous=NORMAL")
+        self.connection.execute(f"PRAGMA cache_size=-{CACHE_KIB}")
+        self.connection.executescript(SCHEMA)
+        self._receipts: List[tuple] = []
+        self._deadlines: List[tuple] = []
+
+    def __enter__(self) -> "HistoryStore":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    # Writing -----------------------------------------------------------------
+
+    def add_receipt(self, calculator, invoice_date: Optional[DateLike] = None) -> None:
+        """Record the receipt of an InvoiceCalculator
+
+        Args:
+            calculator: InvoiceCalculator whose fee, option, rates and result are stored
+            invoice_date: Date of the receipt (default: today)
+        """
+        lines = {line: [round(tuzel, 2), round(gercek, 2)] for line, (tuzel, gercek) in calculator.result.items()}
+        self.add_receipt_rows([(
+            invoice_date or date.today(), calculator.mediation_fee, calculator.option,
+            calculator.kdv_rate, calculator.stopaj_rate, lines,
+        )])
+
+    def add_receipt_rows(self, rows: Iterable[Tuple[DateLike, float, int, float, float, Dict[str, Any]]]) -> None:
+        """Record receipts given as (invoice date, fee, option, kdv rate, stopaj rate, lines)"""
+        recorded_at = _now()
+        for invoice_date, fee, option, kdv_rate, stopaj_rate, lines in rows:
+            self._receipts.append((recorded_at, _iso(invoice_date), float(fee), int(option),
+                                   float(kdv_rate), float(stopaj_rate),
+                                   _LINES_ENCODER.encode(lines)))
+            if len(self._receipts) >= self.batch_size:
+                self.flush()
+
+    def add_deadlines(self, start_date: DateLike, dates: Dict[int, DateLike], registry,
+                      disputes: Optional[Sequence[Union[int, str]]] = None,
+                      case_id: Optional[str] = None) -> None:
+        """Record the deadlines of one calculation, one row per dispute type and week
+
+        Args:
+            start_date: Start date of the mediation
+            dates: Week -> deadline, as returned by MediationTimeCalculator.calculate_dates
+            registry: DisputeRegistry deciding which weeks apply to which dispute type
+            disputes: Dispute ids or names to record (default: all)
+            case_id: Optional case reference stored with every row
+        """
+        selected = registry if disputes is None else [registry.get(dispute) for dispute in disputes]
+        self.add_deadline_rows(
+            (case_id, start_date, dispute.id, week, dates[week])
+            for dispute in selected if dispute is not None
+            for week in sorted(registry.weeks_for(dispute.id)) if week in dates
+        )
+
+    def add_deadline_rows(self, rows: Iterable[Tuple[Optional[str], DateLike, int, int, DateLike]]) -> None:
+        """Record deadlines given as (case id, start date, dispute id, week, deadline)"""
+        recorded_at = _now()
+        for case_id, start_date, dispute_id, week, deadline in rows:
+            self._deadlines.append((recorded_at, case_id, _iso(start_date), int(dispute_id),
+                                    int(week), _iso(deadline)))
+            if len(self._deadlines) >= self.batch_size:
+                self.flush()
+
+    def flush(self) -> None:
+        """Write buffered records in one transaction"""
+        if not self._receipts and not self._deadlines:
+            return
+        with self.connection:
+            if self._receipts:
+                self.connection.executemany(
+                    "INSERT INTO receipts (recorded_at, invoice_date, fee, option, kdv_rate, stopaj_rate, lines) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?)", self._receipts)
+            if self._deadlines:
+                self.connection.executemany(
+                    "INSERT INTO deadlines (recorded_at, case_id, start_date, dispute_id, week, deadline) "
+                    "VALUES (?, ?, ?, ?, ?, ?)", self._deadlines)
+        self._receipts = []
+        self._deadlines = []
+
+    def close(self) -> None:
+        """Write buffered records and close the database"""
+        self.flush()
+        self.connection.close()
+
+    # Reading -----------------------------------------------------------------
+
+    def _page(self, table: str, columns: str, orders: Dict[str, str], order: str,
+              conditions: List[str], parameters: List[Any], after: Optional[Cursor],
+              limit: int, descending: bool) -> Tuple[List[tuple], Optional[Cursor]]:
+        """Run a keyset paginated query; returns raw rows and the next cursor"""
+        if order not in orders:
+            raise ValueError(f"Unknown order '{order}', expected one of: {', '.join(orders)}")
+        if limit < 1:
+            raise ValueError("limit must be at least 1")
+        self.flush()
+        key = orders[order]
+        direction = "DESC" if descending else "ASC"
+        if after is not None:
+            # Row value comparison lets SQLite seek straight to the cursor in the (key, id) index
+            conditions = conditions + [f"({key}, id) {'<' if descending else '>'} (?, ?)"]
+            parameters = parameters + [after[0], after[1]]
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        # One extra row tells whether another page follows
+        rows = self.connection.execute(
+            f"SELECT {columns}, {key} FROM {table} {where} ORDER BY {key} {direction}, id {direction} LIMIT ?",
+            parameters + [limit + 1],
+        ).fetchall()
+        next_cursor = None
+        if len(rows) > limit:
+            rows = rows[:limit]
+            next_cursor = (rows[-1][-1], rows[-1][0])
+        return [row[:-1] for row in rows], next_cursor
+
+    def receipts(self, date_from: Optional[DateLike] = None, date_to: Optional[DateLike] = None,
+                 fee_min: Optional[float] = None, fee_max: Optional[float] = None,
+                 option: Optional[int] = None, order: str = "date", descending: bool = False,
+                 after: Optional[Cursor] = None, limit: int = DEFAULT_PAGE_SIZE) -> Page:
+        """Return one page of recorded receipts
+
+        Args:
+            date_from: First invoice date (inclusive)
+            date_to: Last invoice date (inclusive)
+            fee_min: Smallest fee (inclusive)
+            fee_max: Largest fee (inclusive)
+            option: Only this calculation option
+            order: Sort key: "date", "fee" or "id" (recording order)
+            descending: Newest/largest first
+            after: next_cursor of the previous page
+            limit: Page size
+
+        Returns:
+            Page: Receipt rows and the cursor of the next page
+
+        Raises:
+            ValueError: On an unknown order or a limit below 1
+        """
+        conditions, parameters = [], []
+        for column, operator, value in (
+            ("invoice_date", ">=", date_from and _iso(date_from)),
+            ("invoice_date", "<=", date_to and _iso(date_to)),
+            ("fee", ">=", fee_min),
+            ("fee", "<=", fee_max),
+            ("option", "=", option),
+        ):
+            if value is not None:
+                conditions.append(f"{column} {operator} ?")
+                parameters.append(value)
+        rows, next_cursor = self._page(
+            "receipts", "id, recorded_at, invoice_date, fee, option, kdv_rate, stopaj_rate, lines",
+            RECEIPT_ORDERS, order, conditions, parameters, after, limit, descending)
+        return Page([
+            Receipt(row[0], row[1], date.fromisoformat(row[2]), row[3], row[4], row[5], row[6], json.loads(row[7]))
+            for row in rows
+        ], next_cursor)
+
+    def deadlines(self, date_from: Optional[DateLike] = None, date_to: Optional[DateLike] = None,
+                  dispute_id: Optional[int] = None, week: Optional[int] = None,
+                  case_id: Optional[str] = None, order: str = "deadline", descending: bool = False,
+                  after: Optional[Cursor] = None, limit: int = DEFAULT_PAGE_SIZE) -> Page:
+        """Return one page of recorded deadlines
+
+        Args:
+            date_from: First deadline date (inclusive)
+            date_to: Last deadline date (inclusive)
+            dispute_id: Only this dispute type
+            week: Only this week
+            case_id: Only this case
+            order: Sort key: "deadline", "start" or "id" (recording order)
+            descending: Latest first
+            after: next_cursor of the previous page
+            limit: Page size
+
+        Returns:
+            Page: Deadline rows and the cursor of the next page
+
+        Raises:
+            ValueError: On an unknown order or a limit below 1
+        """
+        conditions, parameters = [], []
+        for column, operator, value in (
+            ("deadline", ">=", date_from and _iso(date_from)),
+            ("deadline", "<=", date_to and _iso(date_to)),
+            ("dispute_id", "=", dispute_id),
+            ("week", "=", week),
+            ("case_id", "=", case_id),
+        ):
+            if value is not None:
+                conditions.append(f"{column} {operator} ?")
+                parameters.append(value)
+        rows, next_cursor = self._page(
+            "deadlines", "id, recorded_at, case_id, start_date, dispute_id, week, deadline",
+            DEADLINE_ORDERS, order, conditions, parameters, after, limit, descending)
+        return Page([
+            Deadline(row[0], row[1], row[2], date.fromisoformat(row[3]), row[4], row[5], date.fromisoformat(row[6]))
+            for row in rows
+        ], next_cursor)
+
+    def iter_pages(self, query: str, **filters) -> Iterator[Page]:
+        """Yield every page of receipts() or deadlines() in turn
+
+        Args:
+            query: "receipts" or "deadlines"
+            **filters: Arguments of that query, without after
+        """
+        fetch = {"receipts": self.receipts, "deadlines": self.deadlines}[query]
+        after = None
+        while True:
+            page = fetch(after=after, **filters)
+            yield page
+            if page.next_cursor is None:
+                return
+            after = page.next_cursor
@@ -0,0 +1,127 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+History View - Kivy browser for the calculation history
+-------------------------------------------------------
+This module shows recorded receipts or deadlines (see history.py) in a
+RecycleView that asks the store for one keyset page at a time: the first page
+is loaded when the popup opens and the next one when the list is scrolled to
+its end. Only the rows on screen have widgets, so browsing a history of
+millions of rows stays as fast as browsing a short one.
+"""
+
+from typing import Any, Callable, Optional
+
+from kivy.app import App
+from kivy.metrics import dp
+from kivy.uix.boxlayout import BoxLayout
+from kivy.uix.button import Button
+from kivy.uix.label import Label
+from kivy.uix.popup import Popup
+from kivy.uix.recycleboxlayout import RecycleBoxLayout
+from kivy.uix.recycleview import RecycleView
+
+from .formatting import format_amount
+from .history import Cursor, DEFAULT_PAGE_SIZE, HistoryStore, Page, default_path
+
+DATE_FORMAT = "%d.%m.%Y"
+ROW_HEIGHT = dp(32)
+TEXT_COLOR = (1, 1, 1, 1)  # On the dark popup background
+# Load the next page when less than this fraction of the list is left below the viewport
+LOAD_MORE_THRESHOLD = 0.1
+
+_STORE: Optional[HistoryStore] = None
+
+
+def app_history_store() -> HistoryStore:
+    """Return the history store shared by the screens of the running app
+
+    The database lives in the app's user_data_dir (writable on Android) and is
+    opened on first use, so it costs nothing at startup.
+    """
+    global _STORE
+    if _STORE is None:
+        app = App.get_running_app()
+        _STORE = HistoryStore(default_path(getattr(app, "user_data_dir", None)))
+    return _STORE
+
+
+def receipt_text(row) -> str:
+    net = row.lines.get("Alınan Net Ücret", [0, 0])
+    return (f"{row.invoice_date.strftime(DATE_FORMAT)}   {format_amount(row.fee, symbol=True)}   "
+            f"Seçenek {row.option}   Net {format_amount(net[0], symbol=True)} / {format_amount(net[1], symbol=True)}")
+
+
+def deadline_text(row) -> str:
+    case = f"   {row.case_id}" if row.case_id else ""
+    return (f"{row.deadline.strftime(DATE_FORMAT)}   {row.week}. hafta   Uyuşmazlık {row.dispute_id}   "
+            f"Başlangıç {row.start_date.strftime(DATE_FORMAT)}{case}")
+
+
+class HistoryRow(Label):
+    """Left-aligned single line label used as the recycled row view"""
+
+    def __init__(self, **kwargs):
+        super().__init__(halign="left", valign="middle", padding=(dp(10), 0), **kwargs)
+        self.bind(size=self._wrap)
+
+    def _wrap(self, instance, size) -> None:
+        self.text_size = size
+
+
+class HistoryView(RecycleView):
+    """Paged list of history rows, loading more as it is scrolled"""
+
+    def __init__(self, fetch: Callable[[Optional[Cursor], int], Page], row_text: Callable[[Any], str],
+                 page_size: int = DEFAULT_PAGE_SIZE, **kwargs):
+        """Create the list and load its first page
+
+        Args:
+            fetch: Called with (cursor, limit), returns a Page, e.g. a bound
+                HistoryStore.receipts with its filters
+            row_text: Turns a row into the text shown for it
+            page_size: Rows loaded per page
+        """
+        super().__init__(**kwargs)
+        self.fetch = fetch
+        self.row_text = row_text
+        self.page_size = page_size
+        self.cursor: Optional[Cursor] = None
+        self.exhausted = False
+
+        layout = RecycleBoxLayout(orientation="vertical", size_hint_y=None,
+                                  default_size=(None, ROW_HEIGHT), default_size_hint=(1, None))
+        layout.bind(minimum_height=layout.setter("height"))
+        self.add_widget(layout)
+        self.viewclass = HistoryRow  # Stored on the layout manager, so set after adding it
+        self.bind(scroll_y=self._on_scroll)
+        self.load_more()
+
+    def load_more(self) -> None:
+        """Append the next page, if there is one"""
+        if self.exhausted:
+            return
+        page = self.fetch(self.cursor, self.page_size)
+        self.data.extend({"text": self.row_text(row), "color": TEXT_COLOR} for row in page.rows)
+        self.cursor = page.next_cursor
+        self.exhausted = page.next_cursor is None
+        if not self.data:
+            self.data = [{"text": "Kayıt yok", "color": TEXT_COLOR}]
+
+    def _on_scroll(self, instance, scroll_y: float) -> None:
+        if scroll_y <= LOAD_MORE_THRESHOLD:
+            self.load_more()
+
+
+def open_history(title: str, fetch: Callable[[Optional[Cursor], int], Page],
+                 row_text: Callable[[Any], str]) -> Popup:
+    """Open a popup with a HistoryView and a close button"""
+    content = BoxLayout(orientation="vertical", spacing=dp(5))
+    content.add_widget(HistoryView(fetch, row_text))
+    close = Button(text="Kapat", size_hint_y=None, height=dp(40))
+    content.add_widget(close)
+    popup = Popup(title=title, content=content, size_hint=(0.9, 0.9))
+    close.bind(on_release=popup.dismiss)
+    popup.open()
+    return popup
@@ -0,0 +1,318 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Metrics - Opt-in call counts and latency histograms
+---------------------------------------------------
+This module times the hot paths of both packages (calculator calls, KV
+loading, table setup and refreshes, the screens' calculate methods) and
+exports call counts, error counts and latency histograms as Prometheus text
+or a JSON snapshot. In the GUIs it also records, per frame, how long the
+instrumented code ran and the time between frames.
+
+Instrumentation is off by default and then costs nothing: the modules only
+register their methods here, and the timing wrappers are swapped onto the
+classes when metrics are enabled and removed again when they are disabled.
+Enable it at startup with the MEDCALC_METRICS environment variable, whose
+value is the report written at exit (".json" for JSON, anything else for
+Prometheus text; "1" writes medcalc_metrics.prom in the working folder), or
+at runtime with METRICS.enable(), the METRICS.profile() block, or SIGUSR1
+after install_signal_hook(), which toggles metrics and writes the report
+each time they are switched off.
+
+    MEDCALC_METRICS=metrics.prom python -m modules.core.medTime.main
+    MEDCALC_METRICS=metrics.json python -m modules.core.common.cli invoice 100000
+
+Metrics are per process; the server also serves them at GET /metrics.
+"""
+
+import atexit
+import json
+import os
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+ENV_VARIABLE = "MEDCALC_METRICS"
+METRIC_NAME = "medcalc_call_seconds"
+# Upper bounds in seconds, from a cached calculator call to a slow KV load
+BUCKETS = (0.000001, 0.000005, 0.00001, 0.00005, 0.0001, 0.0005, 0.001, 0.005,
+           0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 5.0)
+
+FRAME_REFRESH = "gui.frame.refresh"  # Instrumented GUI time spent within one frame
+FRAME_INTERVAL = "gui.frame.interval"  # Time between two frames
+
+
+class Histogram:
+    """Call count, error count, total and bucketed latencies of one metric"""
+
+    __slots__ = ("count", "errors", "total", "maximum", "buckets")
+
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.total = 0.0
+        self.maximum = 0.0
+        self.buckets = [0] * (len(BUCKETS) + 1)  # The last one counts values above every bound
+
+    def observe(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        if seconds > self.maximum:
+            self.maximum = seconds
+        self.buckets[bisect_left(BUCKETS, seconds)] += 1
+
+    def cumulative(self) -> List[Tuple[str, int]]:
+        """Return (upper bound, calls at or below it) pairs ending with "+Inf" """
+        pairs = []
+        running = 0
+        for bound, count in zip(BUCKETS + (None,), self.buckets):
+            running += count
+            pairs.append(("+Inf" if bound is None else repr(bound), running))
+        return pairs
+
+
+class _Probe:
+    """A method registered for timing and the original it replaces while enabled"""
+
+    __slots__ = ("owner", "attribute", "name", "gui", "original")
+
+    def __init__(self, owner: type, attribute: str, name: str, gui: bool):
+        self.owner = owner
+        self.attribute = attribute
+        self.name = name
+        self.gui = gui
+        self.original = None
+
+
+class Metrics:
+    """Registry of instrumented methods and their histograms"""
+
+    def __init__(self):
+        self.enabled = False
+        self.histograms: Dict[str, Histogram] = {}
+        self._probes: List[_Probe] = []
+        self._frame_cost = 0.0
+        self._gui_depth = 0  # Nested GUI calls are counted once in the frame cost
+        self._watch_frames = False
+        self._frame_event = None
+        self._last_frame: Optional[float] = None
+
+    def histogram(self, name: str) -> Histogram:
+        histogram = self.histograms.get(name)
+        if histogram is None:
+            histogram = self.histograms[name] = Histogram()
+        return histogram
+
+    def instrument(self, owner: type, attribute: str, name: Optional[str] = None, gui: bool = False) -> None:
+        """Register a method to be timed while metrics are enabled
+
+        Args:
+            owner: Class defining the method
+            attribute: Method name; plain, static and class methods are supported
+            name: Metric name (default: "<class>.<method>")
+            gui: Count the time in the per-frame GUI refresh cost
+        """
+        probe = _Probe(owner, attribute, name or f"{owner.__name__}.{attribute}", gui)
+        self._probes.append(probe)
+        if self.enabled:
+            self._patch(probe)
+
+    def observe(self, name: str, seconds: float, gui: bool = False) -> None:
+        """Record one timed call, if metrics are enabled"""
+        if self.enabled:
+            self.histogram(name).observe(seconds)
+            if gui and not self._gui_depth:
+                self._frame_cost += seconds
+
+    @contextmanager
+    def timer(self, name: str, gui: bool = False) -> Iterator[None]:
+        """Time a block, for code that runs once such as KV loading"""
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            self.histogram(name).errors += 1
+            raise
+        finally:
+            self.observe(name, time.perf_counter() - start, gui)
+
+    def enable(self) -> None:
+        """Start timing every registered method"""
+        if self.enabled:
+            return
+        self.enabled = True
+        for probe in self._probes:
+            self._patch(probe)
+        if self._watch_frames:
+            self._start_frames()
+
+    def disable(self) -> None:
+        """Stop timing; the collected histograms are kept"""
+        if not self.enabled:
+            return
+        self.enabled = False
+        for probe in self._probes:
+            if probe.original is not None:
+                setattr(probe.owner, probe.attribute, probe.original)
+                probe.original = None
+        if self._frame_event is not None:
+            self._frame_event.cancel()
+            self._frame_event = None
+
+    def reset(self) -> None:
+        """Zero every histogram; the timing wrappers keep theirs"""
+        for histogram in self.histograms.values():
+            histogram.__init__()
+        self._frame_cost = 0.0
+        self._last_frame = None
+
+    @contextmanager
+    def profile(self) -> Iterator["Metrics"]:
+        """Enable metrics for the duration of a block"""
+        was_enabled = self.enabled
+        self.enable()
+        try:
+            yield self
+        finally:
+            if not was_enabled:
+                self.disable()
+
+    def _patch(self, probe: _Probe) -> None:
+        original = probe.owner.__dict__[probe.attribute]
+        function = original.__func__ if isinstance(original, (staticmethod, classmethod)) else original
+        timed = self._timed(function, probe.name, probe.gui)
+        if isinstance(original, staticmethod):
+            timed = staticmethod(timed)
+        elif isinstance(original, classmethod):
+            timed = classmethod(timed)
+        probe.original = original
+        setattr(probe.owner, probe.attribute, timed)
+
+    def _timed(self, function: Callable, name: str, gui: bool) -> Callable:
+        histogram = self.histogram(name)
+        clock = time.perf_counter
+
+        @wraps(function)
+        def timed(*args, **kwargs):
+            start = clock()
+            if gui:
+                self._gui_depth += 1
+            try:
+                return function(*args, **kwargs)
+            except BaseException:
+                histogram.errors += 1
+                raise
+            finally:
+                elapsed = clock() - start
+                histogram.observe(elapsed)
+                if gui:
+                    self._gui_depth -= 1
+                    if not self._gui_depth:
+                        self._frame_cost += elapsed
+
+        return timed
+
+    def watch_frames(self) -> None:
+        """Record the per-frame GUI cost and frame interval while enabled; call from App.build"""
+        self._watch_frames = True
+        if self.enabled:
+            self._start_frames()
+
+    def _start_frames(self) -> None:
+        if self._frame_event is None:
+            from kivy.clock import Clock
+            self._last_frame = None
+            self._frame_event = Clock.schedule_interval(self._on_frame, 0)
+
+    def _on_frame(self, dt: float) -> None:
+        now = time.perf_counter()
+        if self._last_frame is not None:
+            self.histogram(FRAME_INTERVAL).observe(now - self._last_frame)
+        self._last_frame = now
+        if self._frame_cost:
+            self.histogram(FRAME_REFRESH).observe(self._frame_cost)
+            self._frame_cost = 0.0
+
+    def snapshot(self) -> Dict[str, Any]:
+        """Return every metric as JSON-ready dicts, times in milliseconds"""
+        metrics = {}
+        for name in sorted(self.histograms):
+            histogram = self.histograms[name]
+            metrics[name] = {
+                "count": histogram.count,
+                "errors": histogram.errors,
+                "total_ms": round(histogram.total * 1000, 3),
+                "mean_ms": round(histogram.total * 1000 / histogram.count, 4) if histogram.count else 0.0,
+                "max_ms": round(histogram.maximum * 1000, 3),
+                "buckets": dict(histogram.cumulative()),
+            }
+        return {"enabled": self.enabled, "pid": os.getpid(), "time": time.time(), "metrics": metrics}
+
+    def to_prometheus(self) -> str:
+        """Return every metric in the Prometheus text exposition format"""
+        lines = [f"# HELP {METRIC_NAME} Latency of instrumented mediationCalculator calls",
+                 f"# TYPE {METRIC_NAME} histogram"]
+        for name in sorted(self.histograms):
+            histogram = self.histograms[name]
+            for bound, count in histogram.cumulative():
+                lines.append(f'{METRIC_NAME}_bucket{{name="{name}",le="{bound}"}} {count}')
+            lines.append(f'{METRIC_NAME}_sum{{name="{name}"}} {histogram.total!r}')
+            lines.append(f'{METRIC_NAME}_count{{name="{name}"}} {histogram.count}')
+        lines += ["# HELP medcalc_call_errors_total Instrumented calls that raised",
+                  "# TYPE medcalc_call_errors_total counter"]
+        for name in sorted(self.histograms):
+            lines.append(f'medcalc_call_errors_total{{name="{name}"}} {self.histograms[name].errors}')
+        return "\n".join(lines) + "\n"
+
+    def write(self, path: str) -> str:
+        """Write a JSON snapshot (".json" paths) or Prometheus text to path
+
+        Returns:
+            str: The path written
+        """
+        with open(path, "w", encoding="utf-8") as handle:
+            if path.lower().endswith(".json"):
+                json.dump(self.snapshot(), handle, indent=2)
+            else:
+                handle.write(self.to_prometheus())
+        return path
+
+    def install_signal_hook(self, path: str, signum: Optional[int] = None) -> bool:
+        """Toggle metrics on a signal (SIGUSR1 by default), writing path when they are switched off
+
+        Returns:
+            bool: False where the platform has no such signal
+        """
+        import signal
+        if signum is None:
+            signum = getattr(signal, "SIGUSR1", None)
+            if signum is None:
+                return False
+
+        def toggle(received, frame):
+            if self.enabled:
+                self.disable()
+                self.write(path)
+            else:
+                self.enable()
+
+        signal.signal(signum, toggle)
+        return True
+
+
+# Shared registry of the running process
+METRICS = Metrics()
+
+if os.environ.get(ENV_VARIABLE):
+    METRICS.enable()
+    _report = os.environ[ENV_VARIABLE]
+    if _report == "1":
+        _report = "medcalc_metrics.prom"
+    atexit.register(METRICS.write, _report)
+    METRICS.install_signal_hook(_report)
@@ -0,0 +1,134 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Parallel - Multi-core sharded batch execution
+---------------------------------------------
+This module splits large invoice and deadline batches into chunks, runs them on
+a process pool and merges the results back in the original order.
+
+Workers receive slices of the input NumPy columns and return one contiguous
+array per chunk, so only compact buffers cross process boundaries.
+"""
+
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from typing import Callable, Dict, Iterable, Optional, Sequence, Tuple
+
+import numpy as np
+
+DEFAULT_CHUNK_SIZE = 250_000
+
+
+def _chunk_bounds(length: int, chunk_size: int):
+    """Yield (start, stop) pairs covering range(length) in chunk_size steps"""
+    for start in range(0, length, chunk_size):
+        yield start, min(start + chunk_size, length)
+
+
+def run_sharded(worker: Callable[..., np.ndarray], columns: Sequence[np.ndarray],
+                chunk_size: int = DEFAULT_CHUNK_SIZE, workers: Optional[int] = None) -> np.ndarray:
+    """Map a worker over equal-length columns in chunks on a process pool
+
+    Args:
+        worker: Module-level function taking one slice of each column and
+            returning an array whose last axis is the chunk length
+        columns: Input arrays, all with the same length
+        chunk_size: Number of rows per task
+        workers: Number of processes (defaults to the CPU count); 1 runs inline
+
+    Returns:
+        np.ndarray: Worker results concatenated along the last axis, in input order
+
+    Raises:
+        ValueError: If the columns differ in length or the tunables are not positive
+    """
+    lengths = {len(column) for column in columns}
+    if len(lengths) != 1:
+        raise ValueError("All input columns must have the same length")
+    if chunk_size < 1:
+        raise ValueError("chunk_size must be at least 1")
+    workers = workers or os.cpu_count() or 1
+    if workers < 1:
+        raise ValueError("workers must be at least 1")
+
+    length = lengths.pop()
+    bounds = list(_chunk_bounds(length, chunk_size))
+    shards = [[column[start:stop] for start, stop in bounds] for column in columns]
+
+    # A single chunk or worker is not worth the cost of starting a pool
+    if workers == 1 or len(bounds) <= 1:
+        results = list(map(worker, *shards))
+    else:
+        with ProcessPoolExecutor(max_workers=min(workers, len(bounds))) as executor:
+            results = list(executor.map(worker, *shards))
+
+    if not results:
+        return worker(*[column[:0] for column in columns])
+    return np.concatenate(results, axis=-1)
+
+
+def _invoice_worker(fees: np.ndarray, options: np.ndarray) -> np.ndarray:
+    """Calculate one chunk of invoices into a (line, person, row) float64 array"""
+    from modules.core.invoCal.batch import calculate_batch
+    from modules.core.invoCal.calculator import RECEIPT_LINES
+
+    result = calculate_batch(fees, options)
+    return np.array([result[line] for line in RECEIPT_LINES])
+
+
+def _deadline_worker(start_days: np.ndarray, weeks: Tuple[int, ...]) -> np.ndarray:
+    """Calculate one chunk of deadlines into a (week, row) datetime64[D] array"""
+    from modules.core.medTime.batch import calculate_dates_batch
+
+    result = calculate_dates_batch(start_days, weeks)
+    return np.array([result[week] for week in weeks], dtype="datetime64[D]").reshape(len(weeks), -1)
+
+
+def parallel_invoices(fees, options, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                      workers: Optional[int] = None) -> Dict[str, Tuple[np.ndarray, np.ndarray]]:
+    """Calculate invoices for large fee/option arrays on all cores
+
+    Args:
+        fees: Array-like of mediation fees in ₺
+        options: Array-like of CalculationOption values (1-4), or a single value
+        chunk_size: Number of rows per task
+        workers: Number of processes (defaults to the CPU count)
+
+    Returns:
+        Dict[str, Tuple[np.ndarray, np.ndarray]]: Same layout as
+        invoCal.batch.calculate_batch
+    """
+    from modules.core.invoCal.calculator import RECEIPT_LINES
+
+    fees, options = np.broadcast_arrays(np.asarray(fees, dtype=np.float64), np.asarray(options))
+    merged = run_sharded(_invoice_worker, [fees.ravel(), options.ravel()], chunk_size, workers)
+    merged = merged.reshape(merged.shape[:2] + fees.shape)
+    return {line: (merged[line_no, 0], merged[line_no, 1]) for line_no, line in enumerate(RECEIPT_LINES)}
+
+
+def parallel_deadlines(start_dates, weeks: Optional[Iterable[int]] = None,
+                       chunk_size: int = DEFAULT_CHUNK_SIZE,
+                       workers: Optional[int] = None) -> Dict[int, np.ndarray]:
+    """Calculate deadlines for large arrays of start dates on all cores
+
+    Args:
+        start_dates: Start dates accepted by medTime.batch.to_datetime64
+        weeks: Week numbers to calculate (defaults to all weeks of the calculator)
+        chunk_size: Number of rows per task
+        workers: Number of processes (defaults to the CPU count)
+
+    Returns:
+        Dict[int, np.ndarray]: Same layout as medTime.batch.calculate_dates_batch
+    """
+    from modules.core.medTime.batch import to_datetime64
+    from modules.core.medTime.calculator import MediationTimeCalculator
+
+    if weeks is None:
+        weeks = MediationTimeCalculator().get_all_weeks()
+    weeks = tuple(week for week in weeks if isinstance(week, int) and week > 0)
+
+    start_days = to_datetime64(start_dates)
+    merged = run_sharded(partial(_deadline_worker, weeks=weeks), [start_days], chunk_size, workers)
+    return {week: merged[index] for index, week in enumerate(weeks)}
@@ -0,0 +1,390 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Server - Local asyncio HTTP service for the calculators
+-------------------------------------------------------
+This module serves invoice and deadline calculations over HTTP/1.1 on
+localhost, using only the standard library (plus NumPy for invoice batches).
+
+Concurrent requests are queued and coalesced into micro-batches: invoices of a
+batch are priced with one vectorized call and deadlines are computed once per
+distinct start date. Connections are kept alive between requests and the
+latency of every request is recorded for percentile reporting.
+
+Endpoints:
+    POST /invoice    {"fee": 100000, "option": 1}
+    POST /deadlines  {"start_date": "01.01.2025"}
+    GET  /stats      request counts and latency percentiles per endpoint
+    GET  /metrics    call metrics in Prometheus text format (see metrics.py)
+    GET  /health
+
+    python -m modules.core.common.server --port 8080
+"""
+
+import argparse
+import asyncio
+import json
+import math
+import time
+from collections import defaultdict, deque
+from datetime import datetime
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Set, Tuple
+
+from .formatting import parse_amount
+from .metrics import METRICS
+
+DEFAULT_HOST = "127.0.0.1"
+DEFAULT_PORT = 8080
+MAX_BODY_SIZE = 1 << 20
+
+STATUS_TEXT = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed",
+               413: "Payload Too Large", 500: "Internal Server Error"}
+
+
+class MicroBatcher:
+    """Coalesce concurrent submissions into batches for a batch handler"""
+
+    def __init__(self, handler: Callable[[List[Any]], List[Any]],
+                 max_batch: int = 512, max_delay: float = 0.001):
+        """Create a batcher; call start() from a running event loop
+
+        Args:
+            handler: Called with a list of items, returns one result (or an
+                Exception instance) per item in the same order
+            max_batch: Largest number of items handed to the handler at once
+            max_delay: Seconds to wait for more items after the first one arrives
+        """
+        self.handler = handler
+        self.max_batch = max_batch
+        self.max_delay = max_delay
+        self.batches = 0
+        self.items = 0
+        self._queue: Optional[asyncio.Queue] = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        self._queue = asyncio.Queue()
+        self._task = asyncio.get_running_loop().create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            try:
+                await self._task
+            except asyncio.CancelledError:
+                pass
+            self._task = None
+
+    async def submit(self, item: Any) -> Any:
+        """Queue an item and wait for its result
+
+        Raises:
+            Exception: Whatever the handler reported for this item
+        """
+        future = asyncio.get_running_loop().create_future()
+        self._queue.put_nowait((item, future))
+        result = await future
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            deadline = loop.time() + self.max_delay
+            while len(batch) < self.max_batch:
+                # Take whatever is already queued before waiting for stragglers
+                if not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                    continue
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            items = [item for item, _ in batch]
+            try:
+                results = self.handler(items)
+            except Exception as e:  # A failing batch fails every request in it
+                results = [e] * len(items)
+            self.batches += 1
+            self.items += len(items)
+            for (_, future), result in zip(batch, results):
+                if not future.done():
+                    future.set_result(result)
+
+
+class LatencyRecorder:
+    """Keep the most recent request latencies per endpoint"""
+
+    def __init__(self, window: int = 10000):
+        self.window = window
+        self.counts: Dict[str, int] = defaultdict(int)
+        self.samples: Dict[str, deque] = defaultdict(lambda: deque(maxlen=self.window))
+
+    def record(self, endpoint: str, seconds: float) -> None:
+        self.counts[endpoint] += 1
+        self.samples[endpoint].append(seconds)
+
+    def snapshot(self) -> Dict[str, Dict[str, float]]:
+        """Return counts and p50/p90/p99/max latencies in milliseconds per endpoint"""
+        report = {}
+        for endpoint, samples in self.samples.items():
+            ordered = sorted(samples)
+            if not ordered:
+                continue
+
+            def percentile(fraction: float) -> float:
+                return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))] * 1000
+
+            report[endpoint] = {
+                "count": self.counts[endpoint],
+                "p50_ms": round(percentile(0.50), 3),
+                "p90_ms": round(percentile(0.90), 3),
+                "p99_ms": round(percentile(0.99), 3),
+                "max_ms": round(ordered[-1] * 1000, 3),
+            }
+        return report
+
+
+def _invoice_batch(items: List[Tuple[float, int]]) -> List[Any]:
+    """Price a micro-batch of (fee, option) pairs with one vectorized call"""
+    from modules.core.invoCal.batch import calculate_batch
+    from modules.core.invoCal.calculator import CalculationOption, RECEIPT_LINES, RECEIPT_FIELDS
+
+    valid_options = {option.value for option in CalculationOption}
+    valid = [index for index, (_, option) in enumerate(items) if option in valid_options]
+    results: List[Any] = [ValueError("Geçersiz seçenek!")] * len(items)
+    if not valid:
+        return results
+
+    columns = calculate_batch([items[index][0] for index in valid], [items[index][1] for index in valid])
+    lines = [(field, columns[line][0].tolist(), columns[line][1].tolist())
+             for field, line in zip(RECEIPT_FIELDS, RECEIPT_LINES)]
+    for row, index in enumerate(valid):
+        fee, option = items[index]
+        results[index] = {
+            "fee": fee,
+            "option": option,
+            "result": {field: [tuzel[row], gercek[row]] for field, tuzel, gercek in lines},
+        }
+    return results
+
+
+class CalculationServer:
+    """HTTP/1.1 keep-alive server with micro-batched calculation endpoints"""
+
+    def __init__(self, host: str = DEFAULT_HOST, port: int = DEFAULT_PORT,
+                 max_batch: int = 512, max_delay: float = 0.001):
+        from modules.core.medTime.calculator import MediationTimeCalculator
+
+        self.host = host
+        self.port = port
+        self.latency = LatencyRecorder()
+        self.invoices = MicroBatcher(_invoice_batch, max_batch, max_delay)
+        self.deadlines = MicroBatcher(self._deadline_batch, max_batch, max_delay)
+        self.deadline_calculator = MediationTimeCalculator(cache_size=4096)
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._connections: Set[asyncio.Task] = set()
+        self._routes: Dict[Tuple[str, str], Callable[[Any], Awaitable[Any]]] = {
+            ("POST", "/invoice"): self._invoice,
+            ("POST", "/deadlines"): self._deadline,
+            ("GET", "/stats"): self._stats,
+            ("GET", "/health"): self._health,
+            ("GET", "/metrics"): self._metrics,
+        }
+
+    async def start(self) -> None:
+        """Start listening; the bound port is available as self.port afterwards"""
+        self.invoices.start()
+        self.deadlines.start()
+        self._server = await asyncio.start_server(self._handle_connection, self.host, self.port)
+        self.port = self._server.sockets[0].getsockname()[1]
+
+    async def stop(self) -> None:
+        if self._server is not None:
+            self._server.close()
+            # Idle keep-alive connections would otherwise hold wait_closed() open
+            connections = list(self._connections)
+            for task in connections:
+                task.cancel()
+            await asyncio.gather(*connections, return_exceptions=True)
+            await self._server.wait_closed()
+        await self.invoices.stop()
+        await self.deadlines.stop()
+
+    async def serve_forever(self) -> None:
+        await self.start()
+        print(f"Listening on http://{self.host}:{self.port}")
+        async with self._server:
+            await self._server.serve_forever()
+
+    def _deadline_batch(self, items: List[str]) -> List[Any]:
+        """Compute a micro-batch of start dates, once per distinct date"""
+        calculator = self.deadline_calculator
+        responses: Dict[str, Any] = {}
+        for start in set(items):
+            try:
+                dates = calculator.calculate_dates(start)
+            except ValueError as e:
+                responses[start] = e
+                continue
+            responses[start] = {
+                "start_date": start,
+                "disputes": {
+                    dispute.name: {
+                        str(week): dates[week].strftime("%d.%m.%Y")
+                        for week in calculator.get_all_weeks()
+                        if week in dates and calculator.should_calculate(dispute.name, week)
+                    }
+                    for dispute in calculator.get_dispute_types()
+                },
+            }
+        return [responses[start] for start in items]
+
+    async def _invoice(self, body: Any) -> Any:
+        if not isinstance(body, dict) or "fee" not in body or "option" not in body:
+            raise ValueError('Expected {"fee": ..., "option": ...}')
+        fee = body["fee"]
+        if isinstance(fee, bool) or not isinstance(fee, (int, float, str)):
+            raise ValueError("Invalid fee")
+        # Text fees are Turkish formatted like everywhere else: "100.000" is one hundred thousand
+        fee = parse_amount(fee) if isinstance(fee, str) else float(fee)
+        if not math.isfinite(fee):
+            raise ValueError("Invalid fee")
+        option = body["option"]
+        if isinstance(option, float) and option.is_integer():
+            option = int(option)
+        if isinstance(option, bool) or not isinstance(option, int):
+            raise ValueError("Geçersiz seçenek!")
+        return await self.invoices.submit((fee, option))
+
+    async def _deadline(self, body: Any) -> Any:
+        start = body.get("start_date") if isinstance(body, dict) else None
+        if start is None:
+            start = datetime.today().strftime("%d.%m.%Y")
+        if not isinstance(start, str):
+            raise ValueError("Invalid date format. Expected format: DD.MM.YYYY")
+        return await self.deadlines.submit(start.strip())
+
+    async def _stats(self, body: Any) -> Any:
+        return {
+            "latency": self.latency.snapshot(),
+            "batches": {
+                "invoice": {"batches": self.invoices.batches, "items": self.invoices.items},
+                "deadlines": {"batches": self.deadlines.batches, "items": self.deadlines.items},
+            },
+        }
+
+    async def _health(self, body: Any) -> Any:
+        return {"status": "ok"}
+
+    async def _metrics(self, body: Any) -> Any:
+        return METRICS.to_prometheus()
+
+    async def _handle_connection(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        task = asyncio.current_task()
+        self._connections.add(task)
+        try:
+            while True:
+                try:
+                    head = await reader.readuntil(b"\r\n\r\n")
+                except (asyncio.IncompleteReadError, asyncio.LimitOverrunError, ConnectionError):
+                    break
+                started = time.perf_counter()
+                request_line, *header_lines = head.decode("latin-1").split("\r\n")
+                try:
+                    method, path, version = request_line.split(" ", 2)
+                except ValueError:
+                    await self._respond(writer, 400, {"error": "Malformed request line"}, False)
+                    break
+                headers = {}
+                for line in header_lines:
+                    if ":" in line:
+                        name, value = line.split(":", 1)
+                        headers[name.strip().lower()] = value.strip()
+
+                connection = headers.get("connection", "").lower()
+                keep_alive = connection != "close" if version == "HTTP/1.1" else connection == "keep-alive"
+
+                try:
+                    length = int(headers.get("content-length", "0") or 0)
+                except ValueError:
+                    length = -1
+                if length < 0:
+                    # The body cannot be delimited, so the connection cannot be reused
+                    await self._respond(writer, 400, {"error": "Invalid Content-Length"}, False)
+                    break
+                if length > MAX_BODY_SIZE:
+                    await self._respond(writer, 413, {"error": "Request body too large"}, False)
+                    break
+                raw = await reader.readexactly(length) if length else b""
+
+                path = path.split("?", 1)[0]
+                status, payload = await self._dispatch(method, path, raw)
+                await self._respond(writer, status, payload, keep_alive)
+                self.latency.record(path if status != 404 else "unknown", time.perf_counter() - started)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, asyncio.CancelledError):
+            pass
+        finally:
+            self._connections.discard(task)
+            writer.close()
+
+    async def _dispatch(self, method: str, path: str, raw: bytes) -> Tuple[int, Any]:
+        handler = self._routes.get((method, path))
+        if handler is None:
+            known = any(route_path == path for _, route_path in self._routes)
+            return (405, {"error": "Method not allowed"}) if known else (404, {"error": "Not found"})
+        try:
+            body = json.loads(raw) if raw else {}
+            return 200, await handler(body)
+        except (ValueError, TypeError) as e:
+            return 400, {"error": str(e)}
+        except Exception as e:
+            return 500, {"error": str(e)}
+
+    @staticmethod
+    async def _respond(writer: asyncio.StreamWriter, status: int, payload: Any, keep_alive: bool) -> None:
+        # Text payloads (the Prometheus metrics) are sent as they are, everything else as JSON
+        if isinstance(payload, str):
+            body, content_type = payload.encode("utf-8"), "text/plain; version=0.0.4"
+        else:
+            try:
+                body = json.dumps(payload, ensure_ascii=False, allow_nan=False)
+            except ValueError:  # NaN or infinity, which JSON cannot represent
+                status, body = 500, json.dumps({"error": "Result is not a finite number"})
+            body, content_type = body.encode("utf-8"), "application/json"
+        head = (
+            f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}\r\n"
+            f"Content-Type: {content_type}; charset=utf-8\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+        )
+        writer.write(head.encode("latin-1") + body)
+        await writer.drain()
+
+
+def main(argv: Optional[List[str]] = None) -> None:
+    parser = argparse.ArgumentParser(description="Local calculation service for invoCal and medTime")
+    parser.add_argument("--host", default=DEFAULT_HOST)
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT)
+    parser.add_argument("--max-batch", type=int, default=512)
+    parser.add_argument("--max-delay-ms", type=float, default=1.0)
+    args = parser.parse_args(argv)
+
+    server = CalculationServer(args.host, args.port, args.max_batch, args.max_delay_ms / 1000)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        print("\nServer stopped.")
+
+
+if __name__ == "__main__":
+    main()
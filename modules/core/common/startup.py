@@ -0,0 +1,122 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+Startup - Cold-start profiler for the Kivy apps
+-----------------------------------------------
+This module records how long the apps take from process start to the first
+drawn frame, split into phases (imports, KV loading, build, first paint).
+
+Profiling is off unless the MEDCALC_PROFILE_STARTUP environment variable is
+set. With "1" the report is logged and written as startup_profile.json into the
+app's user_data_dir (on Android: the app's private files, readable with
+adb run-as); any other value is used as the JSON output path.
+
+    MEDCALC_PROFILE_STARTUP=1 python -m modules.core.medTime.main
+
+This module is imported first by the app entry points and does not import
+Kivy itself until the first paint is watched.
+"""
+
+import json
+import os
+import time
+from typing import Any, Dict, List, Optional, Tuple
+
+ENV_VARIABLE = "MEDCALC_PROFILE_STARTUP"
+REPORT_FILE = "startup_profile.json"
+
+
+def _process_age() -> Optional[float]:
+    """Return the seconds since the process started, where the OS tells us (Linux, Android)"""
+    try:
+        with open("/proc/self/stat") as handle:
+            # The command name may contain spaces; fields after it are fixed
+            fields = handle.read().rsplit(")", 1)[1].split()
+        with open("/proc/uptime") as handle:
+            uptime = float(handle.read().split()[0])
+        started = int(fields[19]) / os.sysconf("SC_CLK_TCK")
+        return max(0.0, uptime - started)
+    except (OSError, ValueError, IndexError, AttributeError):
+        return None
+
+
+class StartupProfiler:
+    """Collects named, timestamped startup phases"""
+
+    def __init__(self, enabled: Optional[bool] = None):
+        """Start the clock
+
+        Args:
+            enabled: Whether finish() reports; defaults to the environment variable
+        """
+        age = _process_age()
+        self.origin_is_process_start = age is not None
+        self.origin = time.perf_counter() - (age or 0.0)
+        self.enabled = bool(os.environ.get(ENV_VARIABLE)) if enabled is None else enabled
+        self.marks: List[Tuple[str, float]] = []
+        self._finished = False
+        self.mark("profiler")
+
+    def mark(self, phase: str) -> None:
+        """Record the end of a phase; only the first mark of a name counts"""
+        if all(name != phase for name, _ in self.marks):
+            self.marks.append((phase, time.perf_counter() - self.origin))
+
+    def phases(self) -> List[Dict[str, Any]]:
+        """Return every phase with its end time and duration in milliseconds"""
+        result = []
+        previous = 0.0
+        for name, at in self.marks:
+            result.append({"phase": name, "at_ms": round(at * 1000, 1), "duration_ms": round((at - previous) * 1000, 1)})
+            previous = at
+        return result
+
+    def summary(self) -> str:
+        origin = "process start" if self.origin_is_process_start else "profiler import"
+        steps = ", ".join(f"{item['phase']} +{item['duration_ms']:.0f} ms" for item in self.phases())
+        total = self.marks[-1][1] * 1000 if self.marks else 0.0
+        return f"Startup {total:.0f} ms since {origin}: {steps}"
+
+    def watch_first_paint(self, app=None) -> None:
+        """Mark "first_paint" when the window first shows a frame, then report
+
+        Args:
+            app: The running App, used for the default report location
+        """
+        from kivy.core.window import Window
+
+        def on_flip(*args):
+            Window.unbind(on_flip=on_flip)
+            self.mark("first_paint")
+            self.finish(app)
+
+        Window.bind(on_flip=on_flip)
+
+    def finish(self, app=None) -> Optional[str]:
+        """Log the summary and write the JSON report once, if profiling is enabled
+
+        Returns:
+            Optional[str]: Path of the written report
+        """
+        if not self.enabled or self._finished:
+            return None
+        self._finished = True
+
+        target = os.environ.get(ENV_VARIABLE, "1")
+        if target == "1":
+            folder = getattr(app, "user_data_dir", None) or os.getcwd()
+            target = os.path.join(folder, REPORT_FILE)
+        try:
+            from kivy.logger import Logger
+            Logger.info(f"Startup: {self.summary()}")
+        except ImportError:
+            print(self.summary())
+        with open(target, "w", encoding="utf-8") as handle:
+            json.dump({"origin": "process" if self.origin_is_process_start else "import",
+                       "phases": self.phases()}, handle, indent=2)
+        return target
+
+
+# Shared profiler of the running app; import this module before Kivy
+PROFILER = StartupProfiler()
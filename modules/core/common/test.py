@@ -0,0 +1,597 @@
+import unittest
+
+import numpy as np
+
+from .cache import LRUCache
+from .parallel import run_sharded, parallel_invoices, parallel_deadlines
+
+
+def _square(values):
+    return values * values
+
+
+class TestParallel(unittest.TestCase):
+    """Unit tests for the sharded process pool runner."""
+
+    def test_results_keep_input_order(self):
+        """Chunks processed by several workers are merged back in order."""
+        values = np.arange(1000)
+        merged = run_sharded(_square, [values], chunk_size=64, workers=2)
+        np.testing.assert_array_equal(merged, values * values)
+
+    def test_parallel_invoices_match_batch(self):
+        """Sharded invoices equal the single-process batch result."""
+        from modules.core.invoCal.batch import calculate_batch
+        fees = np.linspace(0, 250000, 1001)
+        options = np.arange(1001) % 4 + 1
+        expected = calculate_batch(fees, options)
+        result = parallel_invoices(fees, options, chunk_size=100, workers=2)
+        for line, (tuzel, gercek) in expected.items():
+            np.testing.assert_array_equal(result[line][0], tuzel)
+            np.testing.assert_array_equal(result[line][1], gercek)
+
+    def test_parallel_deadlines(self):
+        """Sharded deadlines match MediationTimeCalculator.calculate_dates."""
+        from datetime import datetime
+        from modules.core.medTime.calculator import MediationTimeCalculator
+        start = datetime(2025, 1, 1)
+        expected = MediationTimeCalculator().calculate_dates(start)
+        result = parallel_deadlines([start] * 10, chunk_size=3, workers=2)
+        for week, target in expected.items():
+            self.assertEqual(result[week][9], np.datetime64(target.date(), "D"))
+
+    def test_mismatched_columns(self):
+        """Columns of different lengths are rejected."""
+        with self.assertRaises(ValueError):
+            run_sharded(_square, [np.arange(3), np.arange(4)])
+
+
+class TestLRUCache(unittest.TestCase):
+    """Unit tests for the memoization cache and its calculator integration."""
+
+    def test_eviction_and_counters(self):
+        """The least recently used entry is evicted and hits/misses are counted."""
+        cache = LRUCache(maxsize=2)
+        cache.get_or_compute("a", lambda: 1)
+        cache.get_or_compute("b", lambda: 2)
+        cache.get_or_compute("a", lambda: 0)  # hit, "b" is now least recent
+        cache.get_or_compute("c", lambda: 3)
+        self.assertEqual(cache.get_or_compute("b", lambda: 20), 20)
+        info = cache.info()
+        self.assertEqual((info.hits, info.misses, info.currsize), (1, 4, 2))
+
+    def test_version_change_invalidates(self):
+        """A new version token empties the cache."""
+        cache = LRUCache()
+        cache.get_or_compute("a", lambda: 1, version=0.20)
+        self.assertEqual(cache.get_or_compute("a", lambda: 2, version=0.18), 2)
+        self.assertEqual(cache.info().invalidations, 1)
+
+    def test_invoice_cache_follows_tax_rate(self):
+        """Cached invoices are recomputed after the tax rate changes."""
+        from modules.core.invoCal.calculator import InvoiceCalculator
+
+        class Calculator(InvoiceCalculator):
+            __slots__ = ()
+
+        Calculator.enable_cache(maxsize=8)
+        first = Calculator(100000, 4).result
+        self.assertIsNotNone(first._lines)  # Cached with its computed lines
+        self.assertIs(Calculator(100000, 4).result, first)
+        Calculator.TAX_RATE = 0.10
+        self.assertAlmostEqual(Calculator(100000, 4).result["KDV (%20)"][0], 10000.0)
+        self.assertEqual(Calculator.cache_info().hits, 1)
+        self.assertIsNone(InvoiceCalculator.cache_info())
+
+    def test_deadline_cache_follows_dispute_types(self):
+        """Cached dates are recomputed after the dispute definitions change."""
+        from modules.core.medTime.calculator import DisputeType, MediationTimeCalculator
+        calculator = MediationTimeCalculator(cache_size=4)
+        calculator.calculate_dates("01.01.2025")
+        calculator.calculate_dates("01.01.2025")
+        self.assertEqual(calculator.cache_info().hits, 1)
+        calculator.set_dispute_types([DisputeType("Test", [1])])
+        self.assertEqual(list(calculator.calculate_dates("01.01.2025")), [1])
+
+    def test_default_start_date_hits_the_cache(self):
+        """Calls without a start date use today at midnight, so they share one entry."""
+        from datetime import datetime
+        from modules.core.medTime.calculator import MediationTimeCalculator
+        calculator = MediationTimeCalculator(cache_size=4)
+        first = calculator.calculate_dates()
+        calculator.calculate_dates()
+        self.assertEqual(calculator.cache_info().hits, 1)
+        today = datetime.combine(datetime.today().date(), datetime.min.time())
+        self.assertEqual(first, calculator.calculate_dates(today))
+
+
+class TestServer(unittest.TestCase):
+    """Unit tests for the local HTTP calculation service."""
+
+    @staticmethod
+    async def _request(reader, writer, method, path, body=None):
+        import json
+        data = json.dumps(body).encode() if body is not None else b""
+        writer.write(f"{method} {path} HTTP/1.1\r\nContent-Length: {len(data)}\r\n\r\n".encode() + data)
+        await writer.drain()
+        head = (await reader.readuntil(b"\r\n\r\n")).decode()
+        length = int(head.lower().split("content-length:")[1].split("\r\n")[0])
+        return int(head.split(" ")[1]), json.loads(await reader.readexactly(length))
+
+    def test_keep_alive_requests_and_stats(self):
+        """Several requests share one connection and are counted in /stats."""
+        import asyncio
+        from .server import CalculationServer
+
+        async def scenario():
+            server = CalculationServer(port=0)
+            await server.start()
+            try:
+                reader, writer = await asyncio.open_connection(server.host, server.port)
+                invoice = await self._request(reader, writer, "POST", "/invoice", {"fee": 100000, "option": 3})
+                invalid = await self._request(reader, writer, "POST", "/invoice", {"fee": 100000, "option": 7})
+                dates = await self._request(reader, writer, "POST", "/deadlines", {"start_date": "01.01.2025"})
+                stats = await self._request(reader, writer, "GET", "/stats")
+                writer.close()
+                return invoice, invalid, dates, stats
+            finally:
+                await server.stop()
+
+        invoice, invalid, dates, stats = asyncio.run(scenario())
+        self.assertEqual(invoice[0], 200)
+        self.assertEqual(invoice[1]["result"]["brut"][0], 125000.0)
+        self.assertEqual(invalid[0], 400)
+        self.assertEqual(dates[1]["disputes"]["İş Hukuku Uyuşmazlıkları"], {"3": "22.01.2025", "4": "29.01.2025"})
+        self.assertEqual(stats[1]["latency"]["/invoice"]["count"], 2)
+
+    def test_rejects_invalid_requests(self):
+        """Bad Content-Length headers, non-finite fees and boolean values get a 400."""
+        import asyncio
+        from .server import CalculationServer
+
+        async def raw_status(server, head):
+            reader, writer = await asyncio.open_connection(server.host, server.port)
+            writer.write(head.encode())
+            await writer.drain()
+            status = int((await reader.readuntil(b"\r\n\r\n")).decode().split(" ")[1])
+            writer.close()
+            return status
+
+        async def scenario():
+            server = CalculationServer(port=0)
+            await server.start()
+            try:
+                statuses = [await raw_status(server, f"POST /invoice HTTP/1.1\r\nContent-Length: {length}\r\n\r\n")
+                            for length in ("abc", "-5")]
+                body = '{"fee": 1e309, "option": 1}'
+                statuses.append(await raw_status(
+                    server, f"POST /invoice HTTP/1.1\r\nContent-Length: {len(body)}\r\n\r\n{body}"))
+                reader, writer = await asyncio.open_connection(server.host, server.port)
+                for body in ({"fee": "nan", "option": 1}, {"fee": "inf", "option": 1},
+                             {"fee": True, "option": 1}, {"fee": 100000, "option": True}):
+                    statuses.append((await self._request(reader, writer, "POST", "/invoice", body))[0])
+                writer.close()
+                return statuses
+            finally:
+                await server.stop()
+
+        self.assertEqual(asyncio.run(scenario()), [400] * 7)
+
+    def test_turkish_fee_text_and_idle_connection_shutdown(self):
+        """Text fees are Turkish amounts, and stop() closes idle keep-alive connections."""
+        import asyncio
+        from .server import CalculationServer
+
+        async def scenario():
+            server = CalculationServer(port=0)
+            await server.start()
+            reader, writer = await asyncio.open_connection(server.host, server.port)
+            try:
+                responses = [await self._request(reader, writer, "POST", "/invoice", body)
+                             for body in ({"fee": "100.000", "option": 4}, {"fee": "1.234,56", "option": 4.0},
+                                          {"fee": "100.000", "option": 1.7})]
+            finally:
+                # The connection is left open, as an idle keep-alive client would leave it
+                await asyncio.wait_for(server.stop(), timeout=5)
+            closed = await reader.read()
+            writer.close()
+            return responses, closed, server._connections
+
+        responses, closed, connections = asyncio.run(scenario())
+        self.assertEqual(responses[0][0], 200)
+        self.assertEqual(responses[0][1]["result"]["brut"][0], 100000.0)
+        self.assertEqual(responses[1][0], 200)
+        self.assertAlmostEqual(responses[1][1]["result"]["brut"][0], 1234.56)
+        self.assertEqual(responses[2][0], 400)
+        self.assertEqual(closed, b"")
+        self.assertEqual(connections, set())
+
+    def test_non_finite_payload_is_not_sent_as_json(self):
+        """NaN in a response body becomes a 500 instead of invalid JSON."""
+        import asyncio
+        import json
+        from .server import CalculationServer
+
+        class Writer:
+            data = b""
+
+            def write(self, data):
+                self.data += data
+
+            async def drain(self):
+                pass
+
+        writer = Writer()
+        asyncio.run(CalculationServer._respond(writer, 200, {"value": float("nan")}, True))
+        head, body = writer.data.decode().split("\r\n\r\n", 1)
+        self.assertTrue(head.startswith("HTTP/1.1 500"))
+        self.assertIn("error", json.loads(body))
+
+    def test_micro_batching_coalesces_concurrent_items(self):
+        """Items submitted together reach the handler as one batch."""
+        import asyncio
+        from .server import MicroBatcher
+
+        async def scenario():
+            batcher = MicroBatcher(lambda items: [item * 2 for item in items], max_delay=0.01)
+            batcher.start()
+            results = await asyncio.gather(*(batcher.submit(value) for value in range(20)))
+            await batcher.stop()
+            return results, batcher.batches
+
+        results, batches = asyncio.run(scenario())
+        self.assertEqual(results, [value * 2 for value in range(20)])
+        self.assertEqual(batches, 1)
+
+
+class TestCli(unittest.TestCase):
+    """Unit tests for the one-shot command line."""
+
+    def run_cli(self, *argv):
+        import io
+        from contextlib import redirect_stdout
+        from .cli import main
+        output = io.StringIO()
+        with redirect_stdout(output):
+            code = main(list(argv))
+        return code, output.getvalue()
+
+    def test_invoice_json(self):
+        """The invoice command prints the calculator result."""
+        import json
+        code, output = self.run_cli("invoice", "100000", "--option", "2", "--json")
+        self.assertEqual(code, 0)
+        lines = json.loads(output)["lines"]
+        self.assertEqual(lines["Brüt (KDV Hariç)"], [100000.0, 83333.33])
+
+    def test_fees_are_turkish_amounts(self):
+        """Fees use the strict Turkish parser: dots group thousands, a comma separates decimals."""
+        import io
+        import json
+        from contextlib import redirect_stderr
+        from .cli import build_parser
+        for text, fee in (("100.000", 100000.0), ("1.000,50", 1000.5), ("250000", 250000.0)):
+            code, output = self.run_cli("invoice", text, "--option", "4", "--json")
+            self.assertEqual((code, json.loads(output)["fee"]), (0, fee))
+        args = build_parser().parse_args(["history", "receipts", "--fee-min", "100.000", "--fee-max", "1.000,50"])
+        self.assertEqual((args.fee_min, args.fee_max), (100000.0, 1000.5))
+        for text in ("12.5", "nan", "1,000.50"):
+            with redirect_stderr(io.StringIO()), self.assertRaises(SystemExit):
+                build_parser().parse_args(["invoice", text])
+
+    def test_deadlines_for_one_dispute(self):
+        """The deadlines command lists the weeks of the selected dispute types."""
+        import json
+        code, output = self.run_cli("deadlines", "09.03.2025", "-d", "2", "--json")
+        self.assertEqual(code, 0)
+        self.assertEqual(json.loads(output)["disputes"],
+                         {"Ticaret Hukuku Uyuşmazlıkları": {"6": "20.04.2025", "8": "04.05.2025"}})
+        code, _ = self.run_cli("deadlines", "09.03.2025", "-d", "99")
+        self.assertEqual(code, 1)
+
+    def test_core_imports_without_kivy(self):
+        """Importing the packages and the CLI never loads Kivy."""
+        import os
+        import subprocess
+        import sys
+        root = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+        code = ("import sys, modules.core.invoCal, modules.core.medTime, modules.core.common.cli; "
+                "print('kivy' in sys.modules)")
+        output = subprocess.run([sys.executable, "-c", code], cwd=root, capture_output=True, text=True).stdout
+        self.assertEqual(output.strip(), "False")
+
+
+class TestStartupProfiler(unittest.TestCase):
+    """Unit tests for the cold-start profiler."""
+
+    def test_phases_and_report(self):
+        """Phases keep their first mark and the JSON report lists them in order."""
+        import json
+        import os
+        import tempfile
+        from unittest import mock
+        from .startup import ENV_VARIABLE, StartupProfiler
+        profiler = StartupProfiler(enabled=True)
+        profiler.mark("import")
+        profiler.mark("build")
+        profiler.mark("import")
+        phases = profiler.phases()
+        self.assertEqual([item["phase"] for item in phases], ["profiler", "import", "build"])
+        self.assertTrue(all(item["duration_ms"] >= 0 for item in phases))
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "profile.json")
+            with mock.patch.dict(os.environ, {ENV_VARIABLE: path}):
+                self.assertEqual(profiler.finish(), path)
+                self.assertIsNone(profiler.finish())
+            with open(path, encoding="utf-8") as handle:
+                self.assertEqual(len(json.load(handle)["phases"]), 3)
+
+    def test_disabled_by_default(self):
+        """Without the environment variable nothing is written."""
+        from .startup import StartupProfiler
+        self.assertIsNone(StartupProfiler(enabled=False).finish())
+
+
+class TestBench(unittest.TestCase):
+    """Unit tests for the benchmark runner and baseline comparison."""
+
+    def test_compare_normalizes_by_calibration(self):
+        """A run on a machine twice as slow is not a regression; a real slowdown is."""
+        from .bench import compare
+        baseline = {"calibration": 1.0, "benchmarks": {"a": 2.0, "b": 2.0}}
+        items = {item.name: item for item in compare({"a": 4.0, "b": 6.0, "c": 1.0}, 2.0, baseline)}
+        self.assertAlmostEqual(items["a"].ratio, 1.0)
+        self.assertFalse(items["a"].regressed(0.3))
+        self.assertTrue(items["b"].regressed(0.3))
+        self.assertIsNone(items["c"].ratio)
+
+    def test_save_and_run(self):
+        """Benchmarks run by name and their results become the baseline."""
+        import os
+        import tempfile
+        from .bench import load_baseline, run_benchmarks, save_baseline
+        results, _ = run_benchmarks("deadlines.should_calculate")
+        self.assertEqual(list(results), ["deadlines.should_calculate"])
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "baseline.json")
+            save_baseline(path, results, 1e-5)
+            save_baseline(path, {"other": 1.0}, 2e-5)
+            saved = load_baseline(path)
+        self.assertEqual(saved["calibration"], 2e-5)
+        self.assertAlmostEqual(saved["benchmarks"]["deadlines.should_calculate"],
+                               results["deadlines.should_calculate"] * 2)
+
+
+class TestFormatting(unittest.TestCase):
+    """Unit tests for the shared Turkish amount parser and formatter."""
+
+    def test_parse_amount(self):
+        """Grouped, plain and ₺ marked amounts parse; ambiguous ones are rejected."""
+        from .formatting import parse_amount
+        self.assertEqual(parse_amount("1.234.567,89"), 1234567.89)
+        self.assertEqual(parse_amount(" ₺ 100000 "), 100000.0)
+        self.assertEqual(parse_amount("12,5 ₺"), 12.5)
+        self.assertEqual(parse_amount("-1.000"), -1000.0)
+        for text in ("12.5", "1.23.456", "1,2,3", "", "abc", "1.000.00"):
+            with self.assertRaises(ValueError):
+                parse_amount(text)
+        with self.assertRaisesRegex(ValueError, "^Geçersiz tutar '12.5'; 1.234,56 biçiminde giriniz$"):
+            parse_amount("12.5")
+
+    def test_parse_amounts_reports_row(self):
+        """A column parses at once and the first bad row is named."""
+        from .formatting import parse_amounts
+        self.assertEqual(parse_amounts(["1.000,5", "₺2", "3,25"]), [1000.5, 2.0, 3.25])
+        self.assertEqual(parse_amounts([]), [])
+        with self.assertRaisesRegex(ValueError, "Satır 3: geçersiz tutar"):
+            parse_amounts(["1", "2", "3.5", "x"])
+        with self.assertRaisesRegex(ValueError, "Satır 2: geçersiz tutar"):
+            parse_amounts(["1", None])
+
+    def test_format_amount(self):
+        """Amounts use dots for thousands and a decimal comma."""
+        from .formatting import format_amount
+        self.assertEqual(format_amount(1234567.891), "1.234.567,89")
+        self.assertEqual(format_amount(-0.5, symbol=True), "-0,50 ₺")
+        self.assertEqual(format_amount(1234.5, decimals=0), "1.234")
+        with self.assertRaises(ValueError):
+            format_amount(float("nan"))
+
+    def test_format_amounts_matches_format_amount(self):
+        """The column formatter gives the same text as the scalar one."""
+        from .formatting import _format_amounts_python, format_amount, format_amounts
+        rng = np.random.default_rng(7)
+        values = np.concatenate([
+            rng.uniform(-1e9, 1e9, 2000), np.round(rng.uniform(0, 1e6, 2000), 2), rng.uniform(-10, 10, 2000),
+            [0.0, -0.0, -0.001, 0.005, 0.125, 2.675, 999.995, 999999.999, 1000.0],
+        ]).tolist()
+        for decimals in (0, 2, 3):
+            for symbol in (False, True):
+                expected = [format_amount(value, decimals, symbol) for value in values]
+                self.assertEqual(format_amounts(values, decimals, symbol), expected)
+                self.assertEqual(_format_amounts_python(values, decimals, symbol), expected)
+        self.assertEqual(format_amounts([1e17, 1.5]), ["100.000.000.000.000.000,00", "1,50"])
+        self.assertEqual(format_amounts([]), [])
+        with self.assertRaises(ValueError):
+            format_amounts([1.0, float("inf")])
+
+
+class TestHistoryStore(unittest.TestCase):
+    """Unit tests for the SQLite calculation history."""
+
+    def setUp(self):
+        from .history import HistoryStore
+        self.store = HistoryStore(":memory:", batch_size=100)
+
+    def tearDown(self):
+        self.store.close()
+
+    def test_pages_cover_every_row_once(self):
+        """Keyset pages follow the sort order and neither skip nor repeat rows."""
+        from datetime import date, timedelta
+        self.store.add_receipt_rows(
+            (date(2024, 1, 1) + timedelta(days=index % 30), 1000 + index % 7, index % 4 + 1, 0.2, 0.2, {})
+            for index in range(1000)
+        )
+        for order, key in (("date", "invoice_date"), ("fee", "fee"), ("id", "id")):
+            for descending in (False, True):
+                rows = [row for page in self.store.iter_pages("receipts", order=order, descending=descending, limit=64)
+                        for row in page.rows]
+                self.assertEqual(sorted(row.id for row in rows), list(range(1, 1001)))
+                keys = [(getattr(row, key), row.id) for row in rows]
+                self.assertEqual(keys, sorted(keys, reverse=descending))
+
+    def test_receipt_filters(self):
+        """Receipts filter by date range, fee range and option."""
+        from datetime import date
+        from modules.core.invoCal.calculator import InvoiceCalculator
+        self.store.add_receipt(InvoiceCalculator(100000, 2), date(2025, 3, 1))
+        self.store.add_receipt(InvoiceCalculator(50000, 1), date(2025, 4, 1))
+        self.store.add_receipt(InvoiceCalculator(150000, 2), date(2025, 5, 1))
+        page = self.store.receipts(date_from=date(2025, 3, 15), fee_min=60000, option=2)
+        self.assertEqual([row.fee for row in page.rows], [150000.0])
+        self.assertIsNone(page.next_cursor)
+        first = self.store.receipts(fee_max=100000).rows[0]
+        self.assertEqual(first.invoice_date, date(2025, 3, 1))
+        self.assertEqual(first.lines["Brüt (KDV Hariç)"], [100000.0, 83333.33])
+        with self.assertRaises(ValueError):
+            self.store.receipts(order="deadline")
+
+    def test_deadlines_by_dispute_and_range(self):
+        """Deadlines of a calculation are stored per applicable dispute type and week."""
+        from datetime import date, datetime
+        from modules.core.medTime.calculator import MediationTimeCalculator
+        calculator = MediationTimeCalculator()
+        start = datetime(2025, 3, 9)
+        self.store.add_deadlines(start, calculator.calculate_dates(start), calculator.registry, case_id="A-1")
+        rows = self.store.deadlines(dispute_id=2).rows
+        self.assertEqual([(row.week, row.deadline) for row in rows], [(6, date(2025, 4, 20)), (8, date(2025, 5, 4))])
+        in_april = self.store.deadlines(date_from=date(2025, 4, 1), date_to=date(2025, 4, 30), case_id="A-1").rows
+        self.assertTrue(in_april and all(row.deadline.month == 4 for row in in_april))
+
+    def test_wal_file_shared_between_connections(self):
+        """A file store uses WAL and its batched rows are visible to other connections after a flush."""
+        import os
+        import tempfile
+        from datetime import date
+        from .history import HistoryStore
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "history.sqlite3")
+            with HistoryStore(path, batch_size=10) as writer, HistoryStore(path) as reader:
+                self.assertEqual(writer.connection.execute("PRAGMA journal_mode").fetchone()[0], "wal")
+                writer.add_deadline_rows([(None, date(2025, 1, 1), 1, 3, date(2025, 1, 22))] * 5)
+                self.assertEqual(reader.deadlines().rows, [])
+                writer.flush()
+                self.assertEqual(len(reader.deadlines().rows), 5)
+
+    def test_cli_records_and_browses(self):
+        """The CLI saves results with --record and pages through them."""
+        import io
+        import json
+        import os
+        import tempfile
+        from contextlib import redirect_stdout
+        from .cli import main
+        with tempfile.TemporaryDirectory() as folder:
+            database = os.path.join(folder, "history.sqlite3")
+            os.environ["MEDCALC_HISTORY"] = database
+            try:
+                with redirect_stdout(io.StringIO()):
+                    main(["invoice", "100000", "--record"])
+                    main(["invoice", "200000", "--record"])
+                output = io.StringIO()
+                with redirect_stdout(output):
+                    main(["history", "receipts", "--order", "fee", "--limit", "1", "--json"])
+                page = json.loads(output.getvalue())
+                self.assertEqual([row["fee"] for row in page["rows"]], [100000.0])
+                output = io.StringIO()
+                with redirect_stdout(output):
+                    main(["history", "receipts", "--order", "fee", "--after", page["next"], "--json"])
+                self.assertEqual([row["fee"] for row in json.loads(output.getvalue())["rows"]], [200000.0])
+            finally:
+                del os.environ["MEDCALC_HISTORY"]
+
+
+class TestMetrics(unittest.TestCase):
+    """Unit tests for the opt-in call metrics."""
+
+    def setUp(self):
+        from .metrics import Metrics
+
+        class Screen:
+            def calculate(self, fail=False):
+                if fail:
+                    raise ValueError("bad")
+                return self.refresh()
+
+            def refresh(self):
+                return "done"
+
+            @staticmethod
+            def parse(text):
+                return float(text)
+
+        self.metrics = Metrics()
+        self.Screen = Screen
+        self.original = Screen.__dict__["calculate"]
+        self.metrics.instrument(Screen, "calculate", "screen.calculate", gui=True)
+        self.metrics.instrument(Screen, "refresh", "screen.refresh", gui=True)
+        self.metrics.instrument(Screen, "parse")
+
+    def test_disabled_leaves_methods_untouched(self):
+        """Registered methods are only replaced while metrics are enabled."""
+        from modules.core.invoCal.calculator import InvoiceCalculator
+        self.assertIs(self.Screen.__dict__["calculate"], self.original)
+        self.assertFalse(hasattr(InvoiceCalculator.calculate, "__wrapped__"))
+        with self.metrics.profile():
+            self.assertIsNot(self.Screen.__dict__["calculate"], self.original)
+            self.assertEqual(self.Screen().calculate(), "done")
+            self.assertEqual(self.Screen.parse("1.5"), 1.5)
+        self.assertIs(self.Screen.__dict__["calculate"], self.original)
+        self.Screen().calculate()
+        self.assertEqual(self.metrics.histograms["screen.calculate"].count, 1)
+
+    def test_counts_errors_and_frame_cost(self):
+        """Calls and errors are counted and nested GUI calls enter the frame cost once."""
+        from .metrics import FRAME_REFRESH
+        self.metrics.enable()
+        screen = self.Screen()
+        screen.calculate()
+        with self.assertRaises(ValueError):
+            screen.calculate(fail=True)
+        with self.metrics.timer("kv_load"):
+            pass
+        calculate = self.metrics.histograms["screen.calculate"]
+        self.assertEqual((calculate.count, calculate.errors), (2, 1))
+        self.assertEqual(self.metrics.histograms["screen.refresh"].count, 1)
+        self.assertEqual(self.metrics._frame_cost, calculate.total)
+        self.metrics._on_frame(0)
+        self.assertEqual(self.metrics.histograms[FRAME_REFRESH].count, 1)
+        self.assertEqual(self.metrics.histograms["kv_load"].count, 1)
+        self.metrics.disable()
+
+    def test_exports(self):
+        """Prometheus text has cumulative buckets and the JSON snapshot every metric."""
+        import json
+        import os
+        import tempfile
+        self.metrics.enable()
+        for _ in range(3):
+            self.Screen.parse("2")
+        self.metrics.disable()
+        text = self.metrics.to_prometheus()
+        self.assertIn('medcalc_call_seconds_bucket{name="Screen.parse",le="+Inf"} 3', text)
+        self.assertIn('medcalc_call_seconds_count{name="Screen.parse"} 3', text)
+        self.assertIn('medcalc_call_errors_total{name="Screen.parse"} 0', text)
+        with tempfile.TemporaryDirectory() as folder:
+            path = self.metrics.write(os.path.join(folder, "metrics.json"))
+            with open(path, encoding="utf-8") as handle:
+                snapshot = json.load(handle)
+        self.assertEqual(snapshot["metrics"]["Screen.parse"]["count"], 3)
+        self.assertEqual(snapshot["metrics"]["Screen.parse"]["buckets"]["+Inf"], 3)
+        self.metrics.reset()
+        self.assertEqual(self.metrics.histograms["Screen.parse"].count, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
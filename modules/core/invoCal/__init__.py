@@ -1,6 +1,16 @@
-"""Initialization file for the invoCal module."""
+"""Initialization file for the invoCal module.
+
+The calculator, demo and terminal program are pure Python. InvoiceApp needs
+Kivy, so it is only imported when it is first accessed.
+"""
 
 from .calculator import InvoiceCalculator, CalculationOption
-from .gui import InvoiceApp
 from .demo import demo_run
 from .main import run_program
+
+
+def __getattr__(name):
+    if name == "InvoiceApp":
+        from .gui import InvoiceApp
+        return InvoiceApp
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
\ No newline at end of file
@@ -1,5 +1,9 @@
 from enum import Enum
 
+from modules.core.common.cache import LRUCache
+from modules.core.common.formatting import format_amount
+from modules.core.common.metrics import METRICS
+
 class CalculationOption(Enum):
     """Enum for calculation options to improve code readability."""
     KDV_STOPAJ_DAHIL = 1
@@ -7,115 +11,290 @@ class CalculationOption(Enum):
     KDV_STOPAJ_HARIC = 3
     KDV_HARIC_STOPAJ_DAHIL = 4
 
+# Receipt lines in the order they are printed on the serbest meslek makbuzu
+RECEIPT_LINES = (
+    "Brüt (KDV Hariç)",
+    "Gelir Vergisi Stopajı (%20)",
+    "Alınan Net Ücret",
+    "KDV (%20)",
+    "Tahsil Edilen Ücret",
+)
+
+# Short ASCII names for the receipt lines, used as column names in exported files
+RECEIPT_FIELDS = ("brut", "stopaj", "net", "kdv", "tahsil")
+
+# Position of each option's row in InvoiceCalculator.unit_table()
+_OPTION_INDEX = {option.value: index for index, option in enumerate(CalculationOption)}
+_LINE_INDEX = {line: index for index, line in enumerate(RECEIPT_LINES)}
+
+# Unit tables per (calculator class, tax rate), filled on first use
+_UNIT_TABLES = {}
+
+# The receipt formulas of each option. They return the (tuzel, gercek) pairs in
+# RECEIPT_LINES order; the calculate_* methods wrap them in a dict and
+# InvoiceResult keeps the tuple.
+
+def _kdv_stopaj_dahil(fee, kdv_rate, stopaj_rate):
+    brut = fee / (1 + kdv_rate)
+    stopaj = brut * stopaj_rate
+    net_tuzel = brut - stopaj
+    net_gercek = brut  # Gerçek Kişi için stopaj olmayacak
+    kdv = brut * kdv_rate
+    tahsil_tuzel = net_tuzel + kdv
+    tahsil_gercek = brut + kdv
+    stopaj_gercek = 0
+    return ((brut, brut), (stopaj, stopaj_gercek), (net_tuzel, net_gercek), (kdv, kdv), (tahsil_tuzel, tahsil_gercek))
+
+def _kdv_dahil_stopaj_haric(fee, kdv_rate, stopaj_rate):
+    # Tüzel kişi pays brüt - stopaj + KDV, which must equal the fee
+    brut_tuzel = fee / (1 - stopaj_rate + kdv_rate)
+    stopaj_tuzel = brut_tuzel * stopaj_rate
+    net_tuzel = brut_tuzel - stopaj_tuzel
+    kdv_tuzel = brut_tuzel * kdv_rate
+    tahsil_tuzel = fee
+
+    brut_gercek = fee / (1 + kdv_rate)
+    stopaj_gercek = 0
+    net_gercek = brut_gercek
+    kdv_gercek = brut_gercek * kdv_rate
+    tahsil_gercek = fee
+    return ((brut_tuzel, brut_gercek), (stopaj_tuzel, stopaj_gercek), (net_tuzel, net_gercek),
+            (kdv_tuzel, kdv_gercek), (tahsil_tuzel, tahsil_gercek))
+
+def _kdv_ve_stopaj_haric(fee, kdv_rate, stopaj_rate):
+    brut_tuzel = fee / (1 - stopaj_rate)
+    stopaj_tuzel = brut_tuzel * stopaj_rate
+    net_tuzel = fee
+    kdv_tuzel = brut_tuzel * kdv_rate
+    tahsil_tuzel = net_tuzel + kdv_tuzel
+
+    brut_gercek = fee
+    stopaj_gercek = 0
+    net_gercek = brut_gercek
+    kdv_gercek = brut_gercek * kdv_rate
+    tahsil_gercek = brut_gercek + kdv_gercek
+    return ((brut_tuzel, brut_gercek), (stopaj_tuzel, stopaj_gercek), (net_tuzel, net_gercek),
+            (kdv_tuzel, kdv_gercek), (tahsil_tuzel, tahsil_gercek))
+
+def _kdv_haric_stopaj_dahil(fee, kdv_rate, stopaj_rate):
+    brut = fee
+    stopaj = brut * stopaj_rate
+    net_tuzel = brut - stopaj
+    net_gercek = brut
+    kdv = brut * kdv_rate
+    tahsil_tuzel = net_tuzel + kdv
+    tahsil_gercek = brut + kdv
+    stopaj_gercek = 0
+    return ((brut, brut), (stopaj, stopaj_gercek), (net_tuzel, net_gercek), (kdv, kdv), (tahsil_tuzel, tahsil_gercek))
+
+_FORMULAS = {
+    CalculationOption.KDV_STOPAJ_DAHIL.value: _kdv_stopaj_dahil,
+    CalculationOption.KDV_DAHIL_STOPAJ_HARIC.value: _kdv_dahil_stopaj_haric,
+    CalculationOption.KDV_STOPAJ_HARIC.value: _kdv_ve_stopaj_haric,
+    CalculationOption.KDV_HARIC_STOPAJ_DAHIL.value: _kdv_haric_stopaj_dahil,
+}
+
+class InvoiceResult:
+    """Compact, read-only view of the receipt lines for one fee and option.
+
+    Only the fee, the option and the two tax rates are stored until a line is
+    first read; the lines are then computed once with the receipt formulas
+    and kept. It behaves like the dict that InvoiceCalculator.result used to
+    be: lines are looked up by their receipt name and items() yields
+    (line, (tuzel, gercek)) pairs in receipt order.
+    """
+
+    __slots__ = ("mediation_fee", "option", "kdv_rate", "stopaj_rate", "_lines")
+
+    def __init__(self, mediation_fee, option, kdv_rate, stopaj_rate):
+        self.mediation_fee = mediation_fee
+        self.option = option
+        self.kdv_rate = kdv_rate
+        self.stopaj_rate = stopaj_rate
+        self._lines = None
+
+    def lines(self):
+        """Returns the (tuzel, gercek) tuples in RECEIPT_LINES order, computing them on first use."""
+        lines = self._lines
+        if lines is None:
+            lines = self._lines = _FORMULAS[self.option](self.mediation_fee, self.kdv_rate, self.stopaj_rate)
+        return lines
+
+    def __getitem__(self, line):
+        return self.lines()[_LINE_INDEX[line]]
+
+    def get(self, line, default=None):
+        return self[line] if line in _LINE_INDEX else default
+
+    def __contains__(self, line):
+        return line in _LINE_INDEX
+
+    def __iter__(self):
+        return iter(RECEIPT_LINES)
+
+    def __len__(self):
+        return len(RECEIPT_LINES)
+
+    def keys(self):
+        return RECEIPT_LINES
+
+    def values(self):
+        return list(self.lines())
+
+    def items(self):
+        return list(zip(RECEIPT_LINES, self.lines()))
+
+    def to_dict(self):
+        """Returns all lines as a plain dict, like the calculate_* methods."""
+        return dict(self.items())
+
+    def __eq__(self, other):
+        if isinstance(other, (InvoiceResult, dict)):
+            return self.to_dict() == dict(other.items())
+        return NotImplemented
+
+    def __repr__(self):
+        return f"InvoiceResult({self.mediation_fee!r}, {self.option!r})"
+
 class InvoiceCalculator:
     """Class for calculating the professional invoice for mediation fees."""
     
     TAX_RATE = 0.20  # 20% VAT and Withholding Tax Rate
 
-    def __init__(self, mediation_fee, option):
+    __slots__ = ("mediation_fee", "option", "regime", "result")
+
+    _cache = None  # Opt-in LRUCache of results, see enable_cache()
+
+    def __init__(self, mediation_fee, option, regime=None):
+        """Calculates the receipt lines for a fee and option.
+
+        regime is an optional object with kdv_rate and stopaj_rate attributes
+        (see regimes.TaxRegime); without it both rates are TAX_RATE.
+        """
         self.mediation_fee = mediation_fee
         self.option = option
-        self.result = {}
+        self.regime = regime
         self.calculate()
 
+    @property
+    def kdv_rate(self):
+        return self.TAX_RATE if self.regime is None else self.regime.kdv_rate
+
+    @property
+    def stopaj_rate(self):
+        return self.TAX_RATE if self.regime is None else self.regime.stopaj_rate
+
     def calculate(self):
+        """Prepares the result for the selected option; lines are computed when first read."""
+        if self.option not in _OPTION_INDEX:
+            raise ValueError("Geçersiz seçenek!")
+        if self._cache is None:
+            self.result = self._new_result()
+        else:
+            # The default tax rate is the cache version: changing it empties the cache
+            self.result = self._cache.get_or_compute(
+                (self.mediation_fee, self.option, self.kdv_rate, self.stopaj_rate),
+                self._computed_result, version=self.TAX_RATE
+            )
+
+    def _new_result(self):
+        return InvoiceResult(self.mediation_fee, self.option, self.kdv_rate, self.stopaj_rate)
+
+    def _computed_result(self):
+        # Cached results hold their lines, so a cache hit never recomputes them
+        result = self._new_result()
+        result.lines()
+        return result
+
+    @classmethod
+    def enable_cache(cls, maxsize=1024):
+        """Turns on memoization of results keyed on (fee, option, tax regime rates)."""
+        cls._cache = LRUCache(maxsize)
+
+    @classmethod
+    def disable_cache(cls):
+        """Turns memoization off and drops the cached results."""
+        cls._cache = None
+
+    @classmethod
+    def cache_info(cls):
+        """Returns the cache counters, or None when caching is off."""
+        return None if cls._cache is None else cls._cache.info()
+
+    def calculate_lines(self):
         """Determines which calculation method to use based on the selected option."""
         if self.option == CalculationOption.KDV_STOPAJ_DAHIL.value:
-            self.result = self.calculate_kdv_stopaj_dahil()
+            return self.calculate_kdv_stopaj_dahil()
         elif self.option == CalculationOption.KDV_DAHIL_STOPAJ_HARIC.value:
-            self.result = self.calculate_kdv_dahil_stopaj_haric()
+            return self.calculate_kdv_dahil_stopaj_haric()
         elif self.option == CalculationOption.KDV_STOPAJ_HARIC.value:
-            self.result = self.calculate_kdv_ve_stopaj_haric()
+            return self.calculate_kdv_ve_stopaj_haric()
         elif self.option == CalculationOption.KDV_HARIC_STOPAJ_DAHIL.value:
-            self.result = self.calculate_kdv_haric_stopaj_dahil()
+            return self.calculate_kdv_haric_stopaj_dahil()
         else:
             raise ValueError("Geçersiz seçenek!")
 
+    @classmethod
+    def unit_table(cls, regime=None):
+        """Returns the receipt lines for a fee of 1 ₺ under every option.
+
+        Every receipt line is linear in the mediation fee, so multiplying these
+        coefficients by a fee gives the result of a full calculation up to float
+        rounding; the vectorized batch paths use them, InvoiceResult does not.
+        The table is indexed by option value - 1, then by RECEIPT_LINES order,
+        and each entry is a (tuzel, gercek) tuple. It is compiled once per
+        calculator class and pair of tax rates.
+        """
+        unit = cls.__new__(cls)
+        unit.regime = regime
+        key = (cls, unit.kdv_rate, unit.stopaj_rate)
+        table = _UNIT_TABLES.get(key)
+        if table is None:
+            # Built without __init__, which itself needs this table
+            unit.mediation_fee = 1.0
+            rows = []
+            for option in CalculationOption:
+                unit.option = option.value
+                lines = unit.calculate_lines()
+                rows.append(tuple(lines[line] for line in RECEIPT_LINES))
+            table = _UNIT_TABLES[key] = tuple(rows)
+        return table
+
     def calculate_kdv_stopaj_dahil(self):
         """Calculates for Option 1: KDV ve Stopaj Dahil"""
-        brut = self.mediation_fee / 1.20
-        stopaj = brut * self.TAX_RATE
-        net_tuzel = brut - stopaj
-        net_gercek = brut  # Gerçek Kişi için stopaj olmayacak
-        kdv = brut * self.TAX_RATE
-        tahsil_tuzel = brut
-        tahsil_gercek = brut + kdv
-        stopaj_gercek = 0
-        
-        return {
-            "Brüt (KDV Hariç)": (brut, brut),
-            "Gelir Vergisi Stopajı (%20)": (stopaj, stopaj_gercek),
-            "Alınan Net Ücret": (net_tuzel, net_gercek),
-            "KDV (%20)": (kdv, kdv),
-            "Tahsil Edilen Ücret": (tahsil_tuzel, tahsil_gercek)
-        }
+        return dict(zip(RECEIPT_LINES, _kdv_stopaj_dahil(self.mediation_fee, self.kdv_rate, self.stopaj_rate)))
 
     def calculate_kdv_dahil_stopaj_haric(self):
         """Calculates for Option 2: KDV Dahil, Stopaj Hariç"""
-        brut_tuzel = self.mediation_fee
-        stopaj_tuzel = brut_tuzel * self.TAX_RATE
-        net_tuzel = brut_tuzel - stopaj_tuzel
-        kdv_tuzel = brut_tuzel * self.TAX_RATE
-        tahsil_tuzel = brut_tuzel
-
-        brut_gercek = self.mediation_fee / 1.20
-        stopaj_gercek = 0
-        net_gercek = brut_gercek
-        kdv_gercek = brut_gercek * self.TAX_RATE
-        tahsil_gercek = self.mediation_fee
-        
-        return {
-            "Brüt (KDV Hariç)": (brut_tuzel, brut_gercek),
-            "Gelir Vergisi Stopajı (%20)": (stopaj_tuzel, stopaj_gercek),
-            "Alınan Net Ücret": (net_tuzel, net_gercek),
-            "KDV (%20)": (kdv_tuzel, kdv_gercek),
-            "Tahsil Edilen Ücret": (tahsil_tuzel, tahsil_gercek)
-        }
+        return dict(zip(RECEIPT_LINES, _kdv_dahil_stopaj_haric(self.mediation_fee, self.kdv_rate, self.stopaj_rate)))
 
     def calculate_kdv_ve_stopaj_haric(self):
         """Calculates for Option 3: KDV ve Stopaj Hariç"""
-        brut_tuzel = self.mediation_fee / (1 - 0.20)
-        stopaj_tuzel = brut_tuzel * self.TAX_RATE
-        net_tuzel = self.mediation_fee
-        kdv_tuzel = brut_tuzel * self.TAX_RATE
-        tahsil_tuzel = brut_tuzel
-
-        brut_gercek = self.mediation_fee
-        stopaj_gercek = 0
-        net_gercek = brut_gercek
-        kdv_gercek = brut_gercek * self.TAX_RATE
-        tahsil_gercek = brut_gercek + kdv_gercek
-        
-        return {
-            "Brüt (KDV Hariç)": (brut_tuzel, brut_gercek),
-            "Gelir Vergisi Stopajı (%20)": (stopaj_tuzel, stopaj_gercek),
-            "Alınan Net Ücret": (net_tuzel, net_gercek),
-            "KDV (%20)": (kdv_tuzel, kdv_gercek),
-            "Tahsil Edilen Ücret": (tahsil_tuzel, tahsil_gercek)
-        }
+        return dict(zip(RECEIPT_LINES, _kdv_ve_stopaj_haric(self.mediation_fee, self.kdv_rate, self.stopaj_rate)))
 
     def calculate_kdv_haric_stopaj_dahil(self):
         """Calculates for Option 4: KDV Hariç, Stopaj Dahil"""
-        brut = self.mediation_fee
-        stopaj = brut * self.TAX_RATE
-        net_tuzel = brut - stopaj
-        net_gercek = brut
-        kdv = brut * self.TAX_RATE
-        tahsil_tuzel = brut
-        tahsil_gercek = brut + kdv
-        stopaj_gercek = 0
-        
-        return {
-            "Brüt (KDV Hariç)": (brut, brut),
-            "Gelir Vergisi Stopajı (%20)": (stopaj, stopaj_gercek),
-            "Alınan Net Ücret": (net_tuzel, net_gercek),
-            "KDV (%20)": (kdv, kdv),
-            "Tahsil Edilen Ücret": (tahsil_tuzel, tahsil_gercek)
-        }
+        return dict(zip(RECEIPT_LINES, _kdv_haric_stopaj_dahil(self.mediation_fee, self.kdv_rate, self.stopaj_rate)))
+
+    def line_label(self, line):
+        """Returns the printed label of a receipt line, showing the tax rates in force.
+
+        The RECEIPT_LINES names stay the keys of the result; only the printed
+        labels change, e.g. "KDV (%18)" under an 18% regime.
+        """
+        if line == RECEIPT_LINES[1]:
+            return f"Gelir Vergisi Stopajı (%{self.stopaj_rate * 100:g})"
+        if line == RECEIPT_LINES[3]:
+            return f"KDV (%{self.kdv_rate * 100:g})"
+        return line
 
     def print_table(self):
         """Prints the invoice table in a structured format."""
         print("\nMakbuz Kalemleri | Tüzel Kişi | Gerçek Kişi")
         print("-" * 40)
         for key, (tuzel, gercek) in self.result.items():
-            print(f"{key:<25} | {tuzel:,.2f} ₺ | {gercek:,.2f} ₺")
\ No newline at end of file
+            print(f"{self.line_label(key):<25} | {format_amount(tuzel, symbol=True)} | {format_amount(gercek, symbol=True)}")
+
+# Timed only while metrics are enabled, see modules/core/common/metrics.py
+METRICS.instrument(InvoiceCalculator, "calculate", "invoice.calculate")
+METRICS.instrument(InvoiceCalculator, "unit_table", "invoice.unit_table")
\ No newline at end of file
@@ -0,0 +1,202 @@
+"""Fixed-point invoice arithmetic on integer kuruş.
+
+The float formulas in InvoiceCalculator can drift by a kuruş from what the
+serbest meslek makbuzu must show. This module computes the same receipt lines on
+integers (1 ₺ = 100 kuruş) with one explicit rounding rule per line:
+
+    Brüt (KDV Hariç)     fee × ratio, rounded half up to the kuruş
+    Gelir Vergisi Stopajı brüt × rate, rounded half up (0 for gerçek kişi)
+    Alınan Net Ücret      brüt - stopaj, exact
+    KDV                   brüt × rate, rounded half up
+    Tahsil Edilen Ücret   brüt - stopaj + KDV, exact
+
+Only the brüt, stopaj and KDV lines are rounded; net and tahsil are derived by
+exact integer addition, so the printed lines always add up on the receipt.
+When the fee includes KDV (options 1 and 2) the receipt total can differ from
+the requested fee by at most one kuruş, because the receipt is built from the
+rounded brüt and not the other way round.
+
+Single calls use plain Python integers. Batch calls need NumPy and work on int64
+arrays; fees up to MAX_BATCH_KURUS (4.6 × 10^14 kuruş) are accepted, larger
+ones raise ValueError instead of overflowing.
+"""
+
+from decimal import Decimal, InvalidOperation, ROUND_HALF_UP
+
+from .calculator import InvoiceCalculator, CalculationOption, RECEIPT_LINES
+
+KURUS_PER_LIRA = 100
+RATE_SCALE = 10000  # Rates are held as integer parts per ten thousand (20% = 2000)
+MAX_BATCH_KURUS = 460_000_000_000_000  # Largest fee whose int64 intermediate products cannot overflow
+
+
+def to_kurus(amount):
+    """Converts a ₺ amount (int, float, str or Decimal) into integer kuruş.
+
+    The amount is rounded half up, so 10.005 ₺ becomes 1001 kuruş.
+
+    Raises:
+        ValueError: If the amount is not a finite number.
+    """
+    if isinstance(amount, float):
+        amount = repr(amount)  # Shortest round-trip form, e.g. 0.1 -> "0.1"
+    try:
+        kurus = Decimal(amount) * KURUS_PER_LIRA
+    except (InvalidOperation, TypeError):
+        raise ValueError(f"Geçersiz tutar: {amount!r}") from None
+    if not kurus.is_finite():
+        raise ValueError(f"Geçersiz tutar: {amount!r}")
+    return int(kurus.quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+def from_kurus(kurus):
+    """Converts integer kuruş back into an exact Decimal ₺ amount."""
+    return Decimal(int(kurus)).scaleb(-2)
+
+
+def rate_to_scaled(rate):
+    """Converts a fractional tax rate (0.20) into parts per RATE_SCALE (2000).
+
+    Raises:
+        ValueError: If the rate has more precision than RATE_SCALE can hold.
+    """
+    scaled = round(rate * RATE_SCALE)
+    if abs(rate * RATE_SCALE - scaled) > 1e-6:
+        raise ValueError(f"Vergi oranı sabit noktada gösterilemiyor: {rate}")
+    return scaled
+
+
+def _scaled_rates(regime):
+    """Returns (kdv, stopaj) in parts per RATE_SCALE for a regime or the default rate."""
+    unit = InvoiceCalculator.__new__(InvoiceCalculator)
+    unit.regime = regime
+    return rate_to_scaled(unit.kdv_rate), rate_to_scaled(unit.stopaj_rate)
+
+
+def brut_ratios(kdv_rate, stopaj_rate=None):
+    """Returns the brüt = fee × num / den ratio for every option and person.
+
+    Each option fixes a different receipt line to the entered fee: brüt + KDV
+    for option 1, tahsil for option 2, net for option 3 and brüt for option 4.
+    stopaj_rate defaults to kdv_rate.
+
+    Returns:
+        Dict[int, Tuple[Tuple[int, int], Tuple[int, int]]]: Option value to
+        ((num, den) for tüzel kişi, (num, den) for gerçek kişi).
+    """
+    kdv = rate_to_scaled(kdv_rate)
+    stopaj = kdv if stopaj_rate is None else rate_to_scaled(stopaj_rate)
+    with_kdv = (RATE_SCALE, RATE_SCALE + kdv)
+    without_stopaj = (RATE_SCALE, RATE_SCALE - stopaj)
+    same = (1, 1)
+    return {
+        CalculationOption.KDV_STOPAJ_DAHIL.value: (with_kdv, with_kdv),
+        # Tüzel kişi pays brüt - stopaj + KDV, which must equal the fee
+        CalculationOption.KDV_DAHIL_STOPAJ_HARIC.value: (
+            (RATE_SCALE, RATE_SCALE - stopaj + kdv), with_kdv),
+        CalculationOption.KDV_STOPAJ_HARIC.value: (without_stopaj, same),
+        CalculationOption.KDV_HARIC_STOPAJ_DAHIL.value: (same, same),
+    }
+
+
+def _div_round_half_up(numerator, denominator):
+    """Integer division rounding halves away from zero (denominator > 0)."""
+    quotient = (2 * abs(numerator) + denominator) // (2 * denominator)
+    return quotient if numerator >= 0 else -quotient
+
+
+def _receipt_lines(brut, kdv_rate, stopaj_rate, withholds):
+    """Derives the five receipt lines from a rounded brüt amount."""
+    stopaj = _div_round_half_up(brut * stopaj_rate, RATE_SCALE) if withholds else 0
+    kdv = _div_round_half_up(brut * kdv_rate, RATE_SCALE)
+    net = brut - stopaj
+    return brut, stopaj, net, kdv, net + kdv
+
+
+def calculate_kurus(fee_kurus, option, regime=None):
+    """Calculates the receipt lines for a single fee in integer kuruş.
+
+    Args:
+        fee_kurus: Mediation fee in kuruş (see to_kurus).
+        option: CalculationOption value (1-4).
+        regime: Optional tax regime (see regimes.TaxRegime); defaults to
+            InvoiceCalculator.TAX_RATE for both taxes.
+
+    Returns:
+        Dict[str, Tuple[int, int]]: Same keys as InvoiceCalculator.result, each
+        holding (tuzel, gercek) amounts in kuruş.
+
+    Raises:
+        ValueError: If the option is not a valid CalculationOption value.
+    """
+    kdv_rate, stopaj_rate = _scaled_rates(regime)
+    ratios = brut_ratios(kdv_rate / RATE_SCALE, stopaj_rate / RATE_SCALE)
+    if option not in ratios:
+        raise ValueError("Geçersiz seçenek!")
+    fee_kurus = int(fee_kurus)
+
+    (num_t, den_t), (num_g, den_g) = ratios[option]
+    tuzel = _receipt_lines(_div_round_half_up(fee_kurus * num_t, den_t), kdv_rate, stopaj_rate, True)
+    gercek = _receipt_lines(_div_round_half_up(fee_kurus * num_g, den_g), kdv_rate, stopaj_rate, False)
+    return dict(zip(RECEIPT_LINES, zip(tuzel, gercek)))
+
+
+def calculate_kurus_batch(fees_kurus, options, regime=None):
+    """Calculates the receipt lines for arrays of fees in integer kuruş.
+
+    Applies exactly the same rounding as calculate_kurus, so every row matches
+    the single-call result.
+
+    Args:
+        fees_kurus: Array-like of fees in kuruş.
+        options: Array-like of CalculationOption values (1-4), broadcast
+            against fees_kurus.
+        regime: Optional tax regime, as for calculate_kurus.
+
+    Returns:
+        Dict[str, Tuple[np.ndarray, np.ndarray]]: Same keys as
+        InvoiceCalculator.result, each holding (tuzel, gercek) int64 arrays.
+
+    Raises:
+        ValueError: If any option code is not a valid CalculationOption value,
+            or a fee is beyond MAX_BATCH_KURUS in either direction.
+    """
+    import numpy as np
+
+    def div_round_half_up(numerator, denominator):
+        quotient = (2 * np.abs(numerator) + denominator) // (2 * denominator)
+        return np.where(numerator < 0, -quotient, quotient)
+
+    kdv_rate, stopaj_rate = _scaled_rates(regime)
+    ratios = brut_ratios(kdv_rate / RATE_SCALE, stopaj_rate / RATE_SCALE)
+    try:
+        fees = np.asarray(fees_kurus, dtype=np.int64)
+    except OverflowError:
+        fees = None
+    if fees is None or (fees.size and (fees.max() > MAX_BATCH_KURUS or fees.min() < -MAX_BATCH_KURUS)):
+        raise ValueError(f"Ücret sabit noktada hesaplanamayacak kadar büyük (en fazla {MAX_BATCH_KURUS} kuruş)")
+    fees, options = np.broadcast_arrays(fees, np.asarray(options))
+    index = options.astype(np.intp) - 1
+    if index.size and (
+        np.any(index != options - 1) or index.min() < 0 or index.max() >= len(ratios)
+    ):
+        raise ValueError("Geçersiz seçenek!")
+
+    # (option, person, num/den) lookup table, gathered once per person
+    table = np.array(
+        [ratios[option.value] for option in CalculationOption], dtype=np.int64
+    )
+    columns = []
+    for person, withholds in ((0, True), (1, False)):
+        num = table[:, person, 0].take(index)
+        den = table[:, person, 1].take(index)
+        brut = div_round_half_up(fees * num, den)
+        stopaj = div_round_half_up(brut * stopaj_rate, RATE_SCALE) if withholds else np.zeros_like(brut)
+        kdv = div_round_half_up(brut * kdv_rate, RATE_SCALE)
+        net = brut - stopaj
+        columns.append((brut, stopaj, net, kdv, net + kdv))
+
+    return {
+        line: (columns[0][line_no], columns[1][line_no])
+        for line_no, line in enumerate(RECEIPT_LINES)
+    }
@@ -3,66 +3,149 @@ from kivy.uix.boxlayout import BoxLayout
 from kivy.uix.label import Label
 from kivy.uix.textinput import TextInput
 from kivy.lang import Builder
+from kivy.clock import Clock
 import os
-from .calculator import InvoiceCalculator
+from .calculator import InvoiceCalculator, RECEIPT_LINES
+from .regimes import DEFAULT_REGISTRY
+from modules.core.common.metrics import METRICS
+from modules.core.common.startup import PROFILER
+from modules.core.common.formatting import format_amount, format_amounts, parse_amount
 from kivy.graphics import Color, Rectangle
 
 current_dir = os.path.dirname(os.path.abspath(__file__))
 # Builder.load_file(f"{current_dir}/mediationinvoice.kv")
 
-# Converts a Turkish-formatted number string (e.g., "1.000,50") into a float (e.g., 1000.50)
+# Converts a Turkish-formatted number string (e.g., "1.000,50") into a float (e.g., 1000.50); malformed input such as "12.5" raises ValueError
 def parse_turkish_number(value: str) -> float:
-    value = value.strip()
-    cleaned = value.replace(".", "").replace(",", ".")
-    return float(cleaned)
+    return parse_amount(value)
 
 # Formats a float number into Turkish currency format with dot as thousand separator and comma as decimal (e.g., 1000.50 -> "1.000,50")
 def format_turkish_currency(value: float) -> str:
-    formatted = f"{value:,.2f}"
-    return formatted.replace(",", "X").replace(".", ",").replace("X", ".")
+    return format_amount(value)
+
+OPTION_MAP = {
+    "KDV ve Stopaj Dahil": 1,
+    "KDV Dahil, Stopaj Hariç": 2,
+    "KDV ve Stopaj Hariç": 3,
+    "KDV Hariç, Stopaj Dahil": 4,
+}
+ROW_COLORS = [(0.9, 0.95, 1, 1), (0.8, 0.85, 0.95, 1)]
 
 class InvoiceScreen(BoxLayout):
+    def __init__(self, **kwargs):
+        # Set before the KV rules run, since they build the rows and bind on_text
+        self.value_labels = []
+        self.line_labels = []
+        # Keystrokes within one frame are collapsed into a single recalculation
+        self._live_trigger = Clock.create_trigger(self._live_calculate)
+        # (fee, option) of the last receipt saved to the history, so repeated presses save it once
+        self._last_recorded = None
+        super().__init__(**kwargs)
+
+    # Builds the result rows once; calculations only change their text afterwards.
+    def on_kv_post(self, base_widget):
+        table = self.ids.result_table
+        table.clear_widgets()
+        self.value_labels = []
+        self.line_labels = []
+        for index, key in enumerate(RECEIPT_LINES):
+            row_color = ROW_COLORS[index % 2]
+            row = []
+            for text in [key, "", ""]:
+                label = Label(text=text, color=(0, 0, 0, 1))
+                with label.canvas.before:
+                    Color(*row_color)
+                    rect = Rectangle(size=label.size, pos=label.pos)
+                label.bind(size=lambda instance, value, rect=rect: setattr(rect, "size", value),
+                           pos=lambda instance, value, rect=rect: setattr(rect, "pos", value))
+                table.add_widget(label)
+                row.append(label)
+            self.line_labels.append(row[0])
+            self.value_labels.append((row[1], row[2]))
+
+    # Recalculates on the next frame while the user types or changes the option.
+    def schedule_calculate(self, *args):
+        self._live_trigger()
+
+    def _live_calculate(self, dt):
+        self.calculate(live=True)
+
     # Calculates the invoice values based on the user's input and selected option, then updates the result table with formatted values.
-    def calculate(self):
-        self.ids.result_table.clear_widgets()
+    # In live mode incomplete input is ignored instead of reported.
+    def calculate(self, live=False):
         try:
             fee_input = self.ids.fee_input.text
             mediation_fee = parse_turkish_number(fee_input)
+        except ValueError:
+            if not live:
+                self.ids.result_label.text = "Geçersiz giriş! Tutarı 1.234,56 biçiminde giriniz."
+                self.clear_values()
+            return
+
+        option = self.ids.option_spinner.text
+        if option not in OPTION_MAP:
+            if not live:
+                self.ids.result_label.text = "Lütfen KDV ve Stopaj seçimi yapınız."
+                self.clear_values()
+            return
 
-            option = self.ids.option_spinner.text
-            option_map = {
-                "KDV ve Stopaj Dahil": 1,
-                "KDV Dahil, Stopaj Hariç": 2,
-                "KDV ve Stopaj Hariç": 3,
-                "KDV Hariç, Stopaj Dahil": 4,
-            }
+        self.ids.result_label.text = (
+            f"₺{format_turkish_currency(mediation_fee)} için {option} Serbest Meslek Makbuzu Hesabı"
+        )
 
-            invoice = InvoiceCalculator(mediation_fee, option_map[option])
+        # The tax rates in force today apply, as for the receipts saved to the history
+        calculator = InvoiceCalculator(mediation_fee, OPTION_MAP[option], DEFAULT_REGISTRY.regime_for())
+        texts = format_amounts([amount for pair in calculator.result.values() for amount in pair], symbol=True)
+        for index, (tuzel_label, gercek_label) in enumerate(self.value_labels):
+            tuzel_label.text = texts[2 * index]
+            gercek_label.text = texts[2 * index + 1]
+        # Shows the rates of the regime, e.g. "KDV (%18)"
+        for line_label, line in zip(self.line_labels, RECEIPT_LINES):
+            line_label.text = calculator.line_label(line)
+        if not live:
+            self.record(calculator)
 
-            self.ids.result_label.text = (
-                f"₺{format_turkish_currency(mediation_fee)} için {option} Serbest Meslek Makbuzu Hesabı"
-            )
+    # Empties the result rows, so no stale amounts are shown next to an error message.
+    def clear_values(self):
+        for tuzel_label, gercek_label in self.value_labels:
+            tuzel_label.text = ""
+            gercek_label.text = ""
 
-            colors = [(0.9, 0.95, 1, 1), (0.8, 0.85, 0.95, 1)]
-            for index, (key, (tuzel, gercek)) in enumerate(invoice.result.items()):
-                row_color = colors[index % 2]
+    # Saves an explicitly calculated receipt to the history store.
+    def record(self, calculator):
+        key = (calculator.mediation_fee, calculator.option)
+        if self._last_recorded == key:
+            return
+        from modules.core.common.history_view import app_history_store
+        store = app_history_store()
+        store.add_receipt(calculator)
+        store.flush()
+        self._last_recorded = key
 
-                for text in [key, f"{tuzel:,.2f} ₺", f"{gercek:,.2f} ₺"]:
-                    label = Label(text=text, color=(0, 0, 0, 1))
-                    with label.canvas.before:
-                        Color(*row_color)
-                        rect = Rectangle(size=label.size, pos=label.pos)
-                        label.bind(size=lambda instance, value, rect=rect: setattr(rect, "size", value),
-                                   pos=lambda instance, value, rect=rect: setattr(rect, "pos", value))
-                    self.ids.result_table.add_widget(label)
+    # Opens the recorded receipts, newest first, loading pages while scrolling.
+    def show_history(self):
+        from modules.core.common.history_view import app_history_store, open_history, receipt_text
+        store = app_history_store()
+        open_history("Makbuz Geçmişi",
+                     lambda after, limit: store.receipts(order="id", descending=True, after=after, limit=limit),
+                     receipt_text)
 
-        except ValueError as e:
-            self.ids.result_label.text = f"Geçersiz giriş! Noktalama olmadan değer giriniz.{e}"
+# Timed only while metrics are enabled, see modules/core/common/metrics.py
+METRICS.instrument(InvoiceScreen, "calculate", "gui.invoice.calculate", gui=True)
 
 class InvoiceApp(App):
+    # Loads invoice.kv (found by the app name) before build().
+    def load_kv(self, filename=None):
+        with METRICS.timer("gui.invoice.kv_load"):
+            return super().load_kv(filename)
+
     # Initializes and returns the main application layout.
     def build(self):
-        return InvoiceScreen()
+        screen = InvoiceScreen()
+        PROFILER.mark("build")
+        PROFILER.watch_first_paint(self)
+        METRICS.watch_frames()
+        return screen
 
 if __name__ == "__main__":
     InvoiceApp().run()
\ No newline at end of file
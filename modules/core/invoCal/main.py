@@ -1,4 +1,5 @@
 from .calculator import InvoiceCalculator, CalculationOption
+from modules.core.common.formatting import format_amount, parse_amount
 
 def run_program():
     """Run the program in a loop until the user chooses to exit.
@@ -9,7 +10,7 @@ def run_program():
     while True:
         try:
             # Get user input for mediation fee
-            mediation_fee = float(input("\033[1;34mTahsil edilecek arabuluculuk ücretini girin (₺): \033[0m").replace(",", "."))
+            mediation_fee = parse_amount(input("\033[1;34mTahsil edilecek arabuluculuk ücretini girin (₺): \033[0m"))
 
             # Display available options
             print("\n\033[1;32mSeçenekler:\033[0m")
@@ -25,7 +26,7 @@ def run_program():
 
             # Display dynamic header
             option_text = list(CalculationOption)[option - 1].name.replace('_', ' ')
-            print(f"\n\033[1;36m₺{mediation_fee:,.2f} için {option_text} Serbest Meslek Makbuzu Hesabı\033[0m")
+            print(f"\n\033[1;36m₺{format_amount(mediation_fee)} için {option_text} Serbest Meslek Makbuzu Hesabı\033[0m")
 
             # Print table headers
             print("\n\033[1;37m{:30} {:>15} {:>15}".format("Makbuza Yazılacak", "Tüzel Kişi", "Gerçek Kişi"))
@@ -33,7 +34,7 @@ def run_program():
 
             # Print formatted results
             for key, (tuzel, gercek) in invoice.result.items():
-                print("\033[1;37m{:30} {:>15,.2f} ₺ {:>15,.2f} ₺\033[0m".format(key, tuzel, gercek))
+                print("\033[1;37m{:30} {:>17} {:>17}\033[0m".format(invoice.line_label(key), format_amount(tuzel, symbol=True), format_amount(gercek, symbol=True)))
 
             # Ask if the user wants to continue
             continue_choice = input("\n\033[1;34mBaşka bir hesaplama yapmak istiyor musunuz? (E/H): \033[0m").strip().upper()
@@ -44,4 +45,9 @@ def run_program():
             print(f"\033[1;31mHata: {e}. Lütfen tekrar deneyin.\033[0m")
 
 if __name__ == "__main__":
+    import sys
+    if len(sys.argv) > 1:
+        # Any argument switches to the headless streaming mode (see stream.py)
+        from .stream import main
+        sys.exit(main(sys.argv[1:]))
     run_program()
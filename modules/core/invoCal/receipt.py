@@ -0,0 +1,506 @@
+"""Printable serbest meslek makbuzu rendering as HTML or PDF.
+
+Turns InvoiceCalculator results into receipts: one HTML or PDF file holding
+every receipt (one page each), or a zip with one file per receipt.
+
+Everything that does not change between receipts is prepared once per
+renderer: the HTML template is parsed and compiled into str.format strings
+(and cached per file), and the PDF renderer builds its page frame, grid and
+fixed labels as one byte string and writes the font objects once per file.
+Rendering a receipt is then filling in its own values, and receipts are
+written as they are rendered, so thousands of them go out in one streaming
+pass with flat memory.
+
+The PDF uses the standard Helvetica fonts with the Windows Turkish (cp1254)
+code page, so no font file is needed; the ₺ sign, which these fonts lack, is
+written as "TL" there.
+
+Input rows need fee and option columns; number, date (GG.AA.YYYY), client,
+client_tax_id, client_address, client_type (tuzel/gercek) and description
+are optional.
+
+    python -m modules.core.invoCal.receipt receipts.csv -o makbuzlar.pdf --mediator "Av. Ayşe Yılmaz"
+    python -m modules.core.invoCal.receipt receipts.csv -o makbuzlar.zip --format html
+"""
+
+import argparse
+import csv
+import html
+import io
+import os
+import re
+import sys
+import zipfile
+import zlib
+from contextlib import contextmanager
+from dataclasses import dataclass
+from datetime import date, datetime
+
+from modules.core.common.formatting import format_amount, parse_amount
+from .calculator import RECEIPT_LINES
+from .regimes import DEFAULT_REGISTRY
+
+DEFAULT_TEMPLATE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates", "receipt.html")
+DATE_FORMAT = "%d.%m.%Y"
+FORMATS = ("html", "pdf")
+
+_TAG = re.compile(r"\{\{\s*([#/]?)(\w+)\s*\}\}")
+_TEMPLATES = {}  # Compiled templates by path, with the file's modification time
+
+
+@dataclass
+class Issuer:
+    """The mediator issuing the receipts."""
+    name: str = ""
+    address: str = ""
+    tax_office: str = ""
+    tax_id: str = ""
+    registry_no: str = ""
+
+
+@dataclass
+class ReceiptDetails:
+    """Per-receipt data besides the amounts."""
+    number: str = ""
+    date: date = None  # Today if None; also selects the tax rates in force
+    client: str = ""
+    client_tax_id: str = ""
+    client_address: str = ""
+    legal_entity: bool = True  # Tüzel kişi (withholds stopaj) or gerçek kişi
+    description: str = "Arabuluculuk hizmet bedeli"
+
+
+class Template:
+    """A template compiled once into str.format strings.
+
+    Fields are written as {{name}}; a block between {{#name}} and {{/name}} is
+    repeated for every item of the list value called name.
+    """
+
+    def __init__(self, text, escape=html.escape):
+        self.escape = escape
+        # Each chunk is ("text", format string, field names) or ("section", name, Template)
+        self.chunks = []
+        self.fields = set()
+        position = 0
+        literal, names = [], []
+        while True:
+            match = _TAG.search(text, position)
+            if match is None:
+                break
+            literal.append(_escape_braces(text[position:match.start()]))
+            kind, name = match.groups()
+            if kind == "/":
+                raise ValueError(f"Şablonda eşleşmeyen kapanış: {{{{/{name}}}}}")
+            if kind == "#":
+                end = text.find("{{/" + name + "}}", match.end())
+                if end < 0:
+                    raise ValueError(f"Şablonda kapanmayan blok: {{{{#{name}}}}}")
+                self._add_text(literal, names)
+                literal, names = [], []
+                self.chunks.append(("section", name, Template(text[match.end():end], escape)))
+                position = end + len("{{/" + name + "}}")
+                continue
+            literal.append("{" + name + "}")
+            names.append(name)
+            self.fields.add(name)
+            position = match.end()
+        literal.append(_escape_braces(text[position:]))
+        self._add_text(literal, names)
+
+    def _add_text(self, literal, names):
+        text = "".join(literal)
+        if text:
+            self.chunks.append(("text", text, tuple(names)))
+
+    def render(self, values):
+        """Returns the template filled with values (section values are lists of dicts)."""
+        return "".join(self.stream(values))
+
+    def stream(self, values, section=None, items=None):
+        """Yields the rendered template piece by piece.
+
+        When section is given, its block is rendered once per item of the
+        iterable items as they are consumed, instead of from values.
+        """
+        escape = self.escape
+        for kind, body, extra in self.chunks:
+            if kind == "text":
+                try:
+                    yield body.format_map({name: escape(str(values[name])) for name in extra})
+                except KeyError as e:
+                    raise ValueError(f"Şablon alanı için değer yok: {e.args[0]}")
+            elif body == section:
+                for item in items:
+                    yield extra.render(item)
+            else:
+                for item in values.get(body, ()):
+                    yield extra.render(item)
+
+
+def _escape_braces(text):
+    return text.replace("{", "{{").replace("}", "}}")
+
+
+def load_template(path=DEFAULT_TEMPLATE):
+    """Returns the compiled template of a file, compiling it only when the file changed."""
+    modified = os.path.getmtime(path)
+    cached = _TEMPLATES.get(path)
+    if cached is None or cached[0] != modified:
+        with open(path, encoding="utf-8") as handle:
+            cached = _TEMPLATES[path] = (modified, Template(handle.read()))
+    return cached[1]
+
+
+def receipt_lines(calculator, legal_entity=True):
+    """Returns (label, amount) pairs of the receipt for a tüzel or gerçek kişi client.
+
+    The labels show the rates of the calculator's tax regime.
+    """
+    column = 0 if legal_entity else 1
+    return [(calculator.line_label(line), amounts[column]) for line, amounts in calculator.result.items()]
+
+
+def _receipt_date(details):
+    return details.date or date.today()
+
+
+class HtmlReceiptRenderer:
+    """Renders receipts with a compiled HTML template."""
+
+    extension = "html"
+    binary = False
+
+    def __init__(self, issuer=None, template_path=DEFAULT_TEMPLATE):
+        self.template = load_template(template_path)
+        issuer = issuer or Issuer()
+        self._issuer = {
+            "issuer_name": issuer.name,
+            "issuer_address": issuer.address,
+            "issuer_tax_office": issuer.tax_office,
+            "issuer_tax_id": issuer.tax_id,
+            "issuer_registry_no": issuer.registry_no,
+        }
+
+    def values(self, calculator, details):
+        """Returns the template values of one receipt."""
+        lines = receipt_lines(calculator, details.legal_entity)
+        values = dict(self._issuer)
+        values.update(
+            number=details.number,
+            date=_receipt_date(details).strftime(DATE_FORMAT),
+            client=details.client,
+            client_tax_id=details.client_tax_id,
+            client_address=details.client_address,
+            client_type="Tüzel kişi" if details.legal_entity else "Gerçek kişi",
+            description=details.description,
+            lines=[
+                {"label": label, "amount": format_amount(amount, symbol=True),
+                 "css_class": "total" if index == len(lines) - 1 else ""}
+                for index, (label, amount) in enumerate(lines)
+            ],
+        )
+        return values
+
+    def render(self, calculator, details):
+        """Returns one receipt as a standalone HTML document."""
+        return "".join(self.template.stream({}, "receipts", [self.values(calculator, details)]))
+
+    def write(self, stream, receipts):
+        """Writes (calculator, details) pairs into one HTML document; returns the count."""
+        count = 0
+
+        def items():
+            nonlocal count
+            for calculator, details in receipts:
+                count += 1
+                yield self.values(calculator, details)
+
+        for part in self.template.stream({}, "receipts", items()):
+            stream.write(part)
+        return count
+
+
+# Helvetica advance widths (1/1000 em) of the characters in amounts, for right alignment
+_AMOUNT_WIDTHS = dict.fromkeys("0123456789", 556)
+_AMOUNT_WIDTHS.update({".": 278, ",": 278, " ": 278, "-": 333, "T": 611, "L": 556})
+
+# cp1254 puts the six Turkish letters missing from WinAnsiEncoding on these codes
+_TURKISH_DIFFERENCES = b"[208 /Gbreve 221 /Idotaccent 222 /Scedilla 240 /gbreve 253 /dotlessi 254 /scedilla]"
+
+PAGE_WIDTH, PAGE_HEIGHT = 595, 842  # A4 in points
+_LEFT, _AMOUNT_COLUMN, _RIGHT = 50, 400, 545
+_TABLE_TOP, _ROW_HEIGHT = 600, 22
+
+
+def _pdf_text(text):
+    """Encodes text as a PDF string literal in cp1254."""
+    data = str(text).replace("₺", "TL").encode("cp1254", "replace")
+    return b"(" + data.replace(b"\\", b"\\\\").replace(b"(", b"\\(").replace(b")", b"\\)") + b")"
+
+
+def _text_op(x, y, text, font=b"F1", size=10):
+    return b"BT /%b %d Tf %.2f %.2f Td %b Tj ET\n" % (font, size, x, y, _pdf_text(text))
+
+
+class _PdfWriter:
+    """Writes a PDF object by object, keeping only the offsets in memory."""
+
+    CATALOG, PAGES, FONT, BOLD_FONT = 1, 2, 3, 4
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.position = 0
+        self.offsets = {}
+        self.pages = []
+        self.next_object = 5
+        self._write(b"%PDF-1.4\n%\xe2\xe3\xcf\xd3\n")
+        for number, name in ((self.FONT, b"Helvetica"), (self.BOLD_FONT, b"Helvetica-Bold")):
+            self._object(number, b"<< /Type /Font /Subtype /Type1 /BaseFont /" + name +
+                         b" /Encoding << /Type /Encoding /BaseEncoding /WinAnsiEncoding /Differences " +
+                         _TURKISH_DIFFERENCES + b" >> >>")
+
+    def _write(self, data):
+        self.stream.write(data)
+        self.position += len(data)
+
+    def _object(self, number, body):
+        self.offsets[number] = self.position
+        self._write(b"%d 0 obj\n%b\nendobj\n" % (number, body))
+
+    def add_page(self, content, compress=True):
+        """Adds a page with the given content stream."""
+        contents, page = self.next_object, self.next_object + 1
+        self.next_object += 2
+        if compress:
+            content = zlib.compress(content)
+            header = b"<< /Length %d /Filter /FlateDecode >>" % len(content)
+        else:
+            header = b"<< /Length %d >>" % len(content)
+        self._object(contents, header + b"\nstream\n" + content + b"\nendstream")
+        self._object(page, b"<< /Type /Page /Parent %d 0 R /MediaBox [0 0 %d %d] /Contents %d 0 R "
+                           b"/Resources << /Font << /F1 %d 0 R /F2 %d 0 R >> >> >>"
+                     % (self.PAGES, PAGE_WIDTH, PAGE_HEIGHT, contents, self.FONT, self.BOLD_FONT))
+        self.pages.append(page)
+
+    def close(self):
+        """Writes the page tree, catalog and cross-reference table."""
+        kids = b" ".join(b"%d 0 R" % page for page in self.pages)
+        self._object(self.PAGES, b"<< /Type /Pages /Kids [%b] /Count %d >>" % (kids, len(self.pages)))
+        self._object(self.CATALOG, b"<< /Type /Catalog /Pages %d 0 R >>" % self.PAGES)
+        start = self.position
+        count = self.next_object
+        entries = [b"0000000000 65535 f \n"]
+        entries += [b"%010d 00000 n \n" % self.offsets[number] for number in range(1, count)]
+        self._write(b"xref\n0 %d\n%b" % (count, b"".join(entries)))
+        self._write(b"trailer\n<< /Size %d /Root %d 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (count, self.CATALOG, start))
+        self.stream.flush()
+
+
+class PdfReceiptRenderer:
+    """Renders receipts as A4 PDF pages with a precomputed page frame."""
+
+    extension = "pdf"
+    binary = True
+
+    def __init__(self, issuer=None, compress=True):
+        self.compress = compress
+        self._static = self._build_static(issuer or Issuer())
+
+    @staticmethod
+    def _build_static(issuer):
+        """Returns the content stream part shared by every page: title, issuer, grid and headings."""
+        ops = [_text_op(_LEFT, 790, "SERBEST MESLEK MAKBUZU", b"F2", 16)]
+        y = 740
+        for text, font in ((issuer.name, b"F2"), (issuer.address, b"F1"),
+                           (f"Vergi Dairesi: {issuer.tax_office}", b"F1"), (f"Vergi No: {issuer.tax_id}", b"F1"),
+                           (f"Arabulucu Sicil No: {issuer.registry_no}", b"F1")):
+            ops.append(_text_op(_LEFT, y, text, font))
+            y -= 14
+        rows = 2 + len(RECEIPT_LINES)  # Heading, description and one row per receipt line
+        bottom = _TABLE_TOP - rows * _ROW_HEIGHT
+        grid = [b"0.8 w"]
+        for row in range(rows + 1):
+            y = _TABLE_TOP - row * _ROW_HEIGHT
+            grid.append(b"%d %d m %d %d l S" % (_LEFT, y, _RIGHT, y))
+        for x in (_LEFT, _RIGHT):
+            grid.append(b"%d %d m %d %d l S" % (x, _TABLE_TOP, x, bottom))
+        # The description row spans both columns
+        grid.append(b"%d %d m %d %d l S" % (_AMOUNT_COLUMN, _TABLE_TOP, _AMOUNT_COLUMN, _TABLE_TOP - _ROW_HEIGHT))
+        grid.append(b"%d %d m %d %d l S" % (_AMOUNT_COLUMN, _TABLE_TOP - 2 * _ROW_HEIGHT, _AMOUNT_COLUMN, bottom))
+        ops.append(b"\n".join(grid) + b"\n")
+        baseline = _TABLE_TOP - _ROW_HEIGHT + 7
+        ops.append(_text_op(_LEFT + 6, baseline, "Açıklama", b"F2"))
+        ops.append(_text_op(_AMOUNT_COLUMN + 6, baseline, "Tutar", b"F2"))
+        ops.append(_text_op(_RIGHT - 150, bottom - 60, "Tahsil eden", b"F1"))
+        ops.append(_text_op(_RIGHT - 150, bottom - 74, issuer.name, b"F2"))
+        return b"".join(ops)
+
+    def page(self, calculator, details):
+        """Returns the content stream of one receipt page."""
+        ops = [
+            self._static,
+            _text_op(400, 790, f"No: {details.number}"),
+            _text_op(400, 776, f"Tarih: {_receipt_date(details).strftime(DATE_FORMAT)}"),
+            _text_op(310, 740, f"Sayın {details.client}", b"F2"),
+            _text_op(310, 726, details.client_address),
+            _text_op(310, 712, f"Vergi/T.C. Kimlik No: {details.client_tax_id}"),
+            _text_op(310, 698, "Tüzel kişi" if details.legal_entity else "Gerçek kişi"),
+            _text_op(_LEFT + 6, _TABLE_TOP - 2 * _ROW_HEIGHT + 7, details.description),
+        ]
+        lines = receipt_lines(calculator, details.legal_entity)
+        y = _TABLE_TOP - 3 * _ROW_HEIGHT + 7
+        for index, (label, amount) in enumerate(lines):
+            font = b"F2" if index == len(lines) - 1 else b"F1"
+            text = format_amount(amount) + " TL"
+            width = sum(_AMOUNT_WIDTHS.get(character, 556) for character in text) * 10 / 1000
+            ops.append(_text_op(_LEFT + 6, y, label, font))
+            ops.append(_text_op(_RIGHT - 6 - width, y, text, font))
+            y -= _ROW_HEIGHT
+        return b"".join(ops)
+
+    def render(self, calculator, details):
+        """Returns one receipt as a one-page PDF document."""
+        buffer = io.BytesIO()
+        self.write(buffer, [(calculator, details)])
+        return buffer.getvalue()
+
+    def write(self, stream, receipts):
+        """Writes (calculator, details) pairs into one PDF, a page each; returns the count."""
+        writer = _PdfWriter(stream)
+        for calculator, details in receipts:
+            writer.add_page(self.page(calculator, details), self.compress)
+        writer.close()
+        return len(writer.pages)
+
+
+RENDERERS = {"html": HtmlReceiptRenderer, "pdf": PdfReceiptRenderer}
+
+
+def write_zip(stream, renderer, receipts):
+    """Writes one file per receipt into a zip archive; returns the count.
+
+    Files are named after the receipt number (or their position when it is
+    missing or repeated).
+    """
+    names = set()
+    count = 0
+    with zipfile.ZipFile(stream, "w", zipfile.ZIP_DEFLATED) as archive:
+        for calculator, details in receipts:
+            count += 1
+            name = re.sub(r"[^\w.-]", "_", details.number) if details.number else str(count)
+            if name in names:
+                name = f"{name}_{count}"
+            names.add(name)
+            archive.writestr(f"{name}.{renderer.extension}", renderer.render(calculator, details))
+    return count
+
+
+def _parse_date(value):
+    try:
+        return datetime.strptime(value.strip(), DATE_FORMAT).date()
+    except ValueError:
+        raise ValueError(f"Geçersiz tarih '{value}', GG.AA.YYYY bekleniyor")
+
+
+def read_receipts(stream):
+    """Yields (calculator, details) pairs from a CSV with a header row.
+
+    The calculator uses the tax rates in force on each receipt's date.
+
+    Raises:
+        ValueError: On a missing column or a malformed row, with its line number.
+    """
+    reader = csv.DictReader(stream)
+    if not reader.fieldnames or not {"fee", "option"} <= {name.strip().lower() for name in reader.fieldnames}:
+        raise ValueError("Başlık satırında fee ve option sütunları gerekli")
+    reader.fieldnames = [name.strip().lower() for name in reader.fieldnames]
+    for line_number, row in enumerate(reader, start=2):
+        try:
+            fee = parse_amount(row["fee"])
+            option = int(row["option"])
+            invoice_date = _parse_date(row["date"]) if (row.get("date") or "").strip() else date.today()
+            details = ReceiptDetails(
+                number=(row.get("number") or "").strip(),
+                date=invoice_date,
+                client=(row.get("client") or "").strip(),
+                client_tax_id=(row.get("client_tax_id") or "").strip(),
+                client_address=(row.get("client_address") or "").strip(),
+                legal_entity=(row.get("client_type") or "tuzel").strip().lower() != "gercek",
+                description=(row.get("description") or "").strip() or ReceiptDetails.description,
+            )
+            yield DEFAULT_REGISTRY.calculator(fee, option, invoice_date), details
+        except (ValueError, AttributeError) as e:
+            raise ValueError(f"Satır {line_number}: {e}")
+
+
+@contextmanager
+def _replacing(output, binary):
+    """Opens a temporary file next to output that replaces it only if the block succeeds."""
+    temporary = f"{output}.{os.getpid()}.tmp"
+    stream = open(temporary, "wb") if binary else open(temporary, "w", encoding="utf-8")
+    try:
+        with stream:
+            yield stream
+        os.replace(temporary, output)
+    except BaseException:
+        if os.path.exists(temporary):
+            os.remove(temporary)
+        raise
+
+
+def render_receipts(receipts, output, fmt=None, issuer=None):
+    """Renders receipts into a .html, .pdf or .zip file; returns the count.
+
+    fmt picks the document format inside a zip (default: pdf); for other
+    outputs it defaults to the file extension. Receipts are streamed into a
+    temporary file that replaces output only once every row has been rendered,
+    so a malformed row leaves an existing output file untouched.
+    """
+    extension = os.path.splitext(output)[1].lower().lstrip(".")
+    if extension == "zip":
+        renderer = RENDERERS[fmt or "pdf"](issuer)
+        with _replacing(output, True) as stream:
+            return write_zip(stream, renderer, receipts)
+    fmt = fmt or extension
+    if fmt not in RENDERERS:
+        raise ValueError(f"Bilinmeyen biçim: {fmt} (html, pdf veya zip)")
+    renderer = RENDERERS[fmt](issuer)
+    with _replacing(output, renderer.binary) as stream:
+        return renderer.write(stream, receipts)
+
+
+def main(argv=None):
+    """Command line entry point; returns the process exit code."""
+    parser = argparse.ArgumentParser(description="Serbest meslek makbuzlarını HTML veya PDF olarak toplu oluşturur.")
+    parser.add_argument("input", nargs="?", default="-", help="Girdi CSV dosyası (varsayılan: stdin)")
+    parser.add_argument("-o", "--output", required=True, help="Çıktı dosyası (.html, .pdf veya .zip)")
+    parser.add_argument("--format", choices=FORMATS, help="Belge biçimi (varsayılan: uzantıdan, zip içinde pdf)")
+    parser.add_argument("--mediator", default="", help="Arabulucunun adı soyadı")
+    parser.add_argument("--address", default="", help="Arabulucunun adresi")
+    parser.add_argument("--tax-office", default="", help="Vergi dairesi")
+    parser.add_argument("--tax-id", default="", help="Vergi numarası")
+    parser.add_argument("--registry-no", default="", help="Arabulucu sicil numarası")
+    args = parser.parse_args(argv)
+
+    issuer = Issuer(args.mediator, args.address, args.tax_office, args.tax_id, args.registry_no)
+    try:
+        source = sys.stdin if args.input == "-" else open(args.input, newline="", encoding="utf-8")
+    except OSError as e:
+        print(f"Hata: {e}", file=sys.stderr)
+        return 1
+    try:
+        count = render_receipts(read_receipts(source), args.output, args.format, issuer)
+    except (ValueError, OSError) as e:
+        print(f"Hata: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if source is not sys.stdin:
+            source.close()
+
+    print(f"{count} makbuz yazıldı: {args.output}", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
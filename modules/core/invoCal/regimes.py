@@ -0,0 +1,137 @@
+"""Effective-dated tax regimes for recomputing historical receipts.
+
+A TaxRegime holds the KDV and gelir vergisi stopajı rates that applied from its
+effective date until the next regime. TaxRegimeRegistry finds the regime for an
+invoice date with a binary search and compiles every regime once into the
+(option, line, person) coefficient matrix of InvoiceCalculator.unit_table.
+Because every receipt line is linear in the fee, a batch over mixed invoice
+dates is then a lookup of each row's regime and option plus one multiply.
+
+The receipt line names keep their "(%20)" labels for compatibility with
+existing callers, whatever the regime's rates are.
+"""
+
+from bisect import bisect_right
+from dataclasses import dataclass
+from datetime import date, datetime
+
+from modules.core.common.metrics import METRICS
+from .calculator import InvoiceCalculator, CalculationOption, RECEIPT_LINES
+
+
+@dataclass(frozen=True)
+class TaxRegime:
+    """Tax rates in force from effective_from until the next regime."""
+    effective_from: date
+    kdv_rate: float
+    stopaj_rate: float
+    name: str = ""
+
+
+class TaxRegimeRegistry:
+    """Sorted collection of tax regimes keyed by their effective date."""
+
+    def __init__(self, regimes=()):
+        self._regimes = []
+        self._starts = []
+        self._compiled = None
+        for regime in regimes:
+            self.register(regime)
+
+    def register(self, regime):
+        """Adds a regime, replacing any regime with the same effective date."""
+        position = bisect_right(self._starts, regime.effective_from)
+        if position and self._starts[position - 1] == regime.effective_from:
+            self._regimes[position - 1] = regime
+        else:
+            self._starts.insert(position, regime.effective_from)
+            self._regimes.insert(position, regime)
+        self._compiled = None
+
+    @property
+    def regimes(self):
+        return tuple(self._regimes)
+
+    def regime_for(self, invoice_date=None):
+        """Returns the regime in force on invoice_date (today if omitted).
+
+        Raises:
+            ValueError: If the date is before the first registered regime.
+        """
+        if invoice_date is None:
+            invoice_date = date.today()
+        elif isinstance(invoice_date, datetime):
+            invoice_date = invoice_date.date()
+        position = bisect_right(self._starts, invoice_date)
+        if position == 0:
+            raise ValueError(f"{invoice_date} tarihinde geçerli vergi oranı tanımlı değil")
+        return self._regimes[position - 1]
+
+    def calculator(self, mediation_fee, option, invoice_date=None):
+        """Returns an InvoiceCalculator using the rates in force on invoice_date."""
+        return InvoiceCalculator(mediation_fee, option, regime=self.regime_for(invoice_date))
+
+    def compile(self):
+        """Returns (start dates, coefficients) for vectorized lookups.
+
+        Start dates are a datetime64[D] array; coefficients have shape
+        (regime, option, line, person). Both are built once and reused until a
+        regime is registered.
+        """
+        if self._compiled is None:
+            import numpy as np
+            starts = np.array(self._starts, dtype="datetime64[D]")
+            table = np.array(
+                [InvoiceCalculator.unit_table(regime) for regime in self._regimes],
+                dtype=np.float64,
+            ).reshape(len(self._regimes), len(CalculationOption), len(RECEIPT_LINES), 2)
+            starts.setflags(write=False)
+            table.setflags(write=False)
+            self._compiled = (starts, table)
+        return self._compiled
+
+    def calculate_batch(self, fees, options, invoice_dates):
+        """Calculates receipt lines for rows with different invoice dates.
+
+        Args:
+            fees: Array-like of mediation fees in ₺.
+            options: Array-like of CalculationOption values (1-4).
+            invoice_dates: Array-like of invoice dates (datetime64, date or
+                ISO strings), broadcast against fees and options.
+
+        Returns:
+            Dict[str, Tuple[np.ndarray, np.ndarray]]: Same layout as
+            batch.calculate_batch.
+
+        Raises:
+            ValueError: If an option is invalid or a date precedes every regime.
+        """
+        import numpy as np
+        from .batch import _option_index
+
+        starts, table = self.compile()
+        dates = np.asarray(invoice_dates, dtype="datetime64[D]")
+        fees, option_index, dates = np.broadcast_arrays(
+            np.asarray(fees, dtype=np.float64), _option_index(options), dates
+        )
+        regime_index = np.searchsorted(starts, dates, side="right") - 1
+        if regime_index.size and regime_index.min() < 0:
+            raise ValueError("Bazı tarihlerde geçerli vergi oranı tanımlı değil")
+
+        # One flat row per (regime, option) pair, so each line is a single gather
+        flat = table.reshape(-1, len(RECEIPT_LINES), 2)
+        row = regime_index * len(CalculationOption) + option_index
+        return {
+            line: tuple(fees * flat[:, line_no, person].take(row) for person in (0, 1))
+            for line_no, line in enumerate(RECEIPT_LINES)
+        }
+
+
+METRICS.instrument(TaxRegimeRegistry, "calculate_batch", "invoice.calculate_batch")
+
+# Rates for serbest meslek makbuzu since mediation (6325 sayılı Kanun) took effect.
+# KDV rose from 18% to 20% on 10.07.2023; the stopaj rate stayed at 20%.
+DEFAULT_REGISTRY = TaxRegimeRegistry([
+    TaxRegime(date(2013, 6, 22), kdv_rate=0.18, stopaj_rate=0.20, name="KDV %18"),
+    TaxRegime(date(2023, 7, 10), kdv_rate=0.20, stopaj_rate=0.20, name="KDV %20"),
+])
@@ -0,0 +1,87 @@
+"""Reverse pricing: the mediation fee that produces a target receipt line.
+
+Every receipt line is the fee times a constant that depends only on the option,
+the line and the person type (see InvoiceCalculator.unit_table). The fee that
+makes a line equal a target amount is therefore target / coefficient, with no
+trial and error. Lines that are always zero (stopaj for gerçek kişi) cannot be
+solved for.
+
+    fee = solve_fee(50000, CalculationOption.KDV_STOPAJ_HARIC.value, "net", "tuzel")
+    InvoiceCalculator(fee, CalculationOption.KDV_STOPAJ_HARIC.value)
+"""
+
+from .calculator import InvoiceCalculator, CalculationOption, RECEIPT_LINES, RECEIPT_FIELDS
+
+PERSONS = ("tuzel", "gercek")
+
+
+def _line_number(line):
+    """Accepts a receipt line name ("Alınan Net Ücret") or its short field name ("net")."""
+    if line in RECEIPT_LINES:
+        return RECEIPT_LINES.index(line)
+    if line in RECEIPT_FIELDS:
+        return RECEIPT_FIELDS.index(line)
+    raise ValueError(f"Bilinmeyen makbuz kalemi: {line}")
+
+
+def _person_number(person):
+    """Accepts "tuzel"/"gercek" or the tuple position 0/1."""
+    if person in PERSONS:
+        return PERSONS.index(person)
+    if person in (0, 1):
+        return person
+    raise ValueError(f"Bilinmeyen kişi türü: {person}")
+
+
+def solve_fee(target, option, line="Alınan Net Ücret", person="tuzel", regime=None):
+    """Returns the mediation fee for which a receipt line equals target.
+
+    Args:
+        target: Desired amount of the receipt line in ₺.
+        option: CalculationOption value (1-4).
+        line: Receipt line name or short field name (brut, stopaj, net, kdv, tahsil).
+        person: "tuzel" or "gercek".
+        regime: Optional tax regime (see regimes.TaxRegime).
+
+    Returns:
+        float: The fee to enter into InvoiceCalculator.
+
+    Raises:
+        ValueError: If the option, line or person is unknown, or the line is
+            always zero for this option and person.
+    """
+    options = [item.value for item in CalculationOption]
+    if option not in options:
+        raise ValueError("Geçersiz seçenek!")
+    coefficient = InvoiceCalculator.unit_table(regime)[options.index(option)][_line_number(line)][_person_number(person)]
+    if coefficient == 0:
+        raise ValueError(f"{line} bu seçenekte her zaman sıfırdır, ücret bulunamaz")
+    return target / coefficient
+
+
+def solve_fee_batch(targets, options, line="Alınan Net Ücret", person="tuzel", regime=None):
+    """Vectorized solve_fee over arrays of targets and options.
+
+    Args:
+        targets: Array-like of desired line amounts in ₺.
+        options: Array-like of CalculationOption values (1-4), broadcast
+            against targets.
+        line: Receipt line name or short field name.
+        person: "tuzel" or "gercek".
+        regime: Optional tax regime applied to every row.
+
+    Returns:
+        np.ndarray: float64 fees; NaN where the line is always zero for the
+        row's option.
+
+    Raises:
+        ValueError: If an option code, the line or the person is unknown.
+    """
+    import numpy as np
+    from .batch import coefficient_table, _option_index
+
+    coefficients = coefficient_table(regime)[:, _line_number(line), _person_number(person)]
+    targets, index = np.broadcast_arrays(np.asarray(targets, dtype=np.float64), _option_index(options))
+    divisor = coefficients.take(index)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        return np.where(divisor != 0, targets / np.where(divisor != 0, divisor, 1.0), np.nan)
@@ -0,0 +1,258 @@
+"""Headless streaming pipeline for bulk invoice calculations.
+
+Reads fees and calculation options from CSV or JSONL (a file or stdin), runs
+them through InvoiceCalculator chunk by chunk and writes each chunk of result
+rows out before reading the next, so memory stays flat on very large ledgers.
+
+Input rows need a fee and an option column (CSV header ``fee,option`` or JSON
+keys ``"fee"`` and ``"option"``). A CSV without a header is read as fee, option.
+
+    python -m modules.core.invoCal.stream ledger.csv -o receipts.csv
+    cat ledger.jsonl | python -m modules.core.invoCal.stream --format jsonl
+"""
+
+import argparse
+import csv
+import json
+import math
+import sys
+import time
+from dataclasses import dataclass
+from itertools import islice
+
+from modules.core.common.formatting import parse_amount
+from .calculator import InvoiceCalculator, CalculationOption, RECEIPT_LINES, RECEIPT_FIELDS
+
+FORMATS = ("csv", "jsonl")
+DEFAULT_CHUNK_SIZE = 10000
+VALID_OPTIONS = frozenset(option.value for option in CalculationOption)
+
+OUTPUT_FIELDS = ["fee", "option"] + [
+    f"{field}_{person}" for field in RECEIPT_FIELDS for person in ("tuzel", "gercek")
+]
+
+
+@dataclass
+class StreamStats:
+    """Counters reported at the end of a streaming run"""
+    rows: int = 0
+    skipped: int = 0
+    seconds: float = 0.0
+
+    @property
+    def rows_per_second(self) -> float:
+        return self.rows / self.seconds if self.seconds > 0 else 0.0
+
+    def summary(self) -> str:
+        return (
+            f"{self.rows} satır işlendi, {self.skipped} satır atlandı, "
+            f"{self.seconds:.2f} sn ({self.rows_per_second:,.0f} satır/sn)"
+        )
+
+
+def detect_format(path, default="csv"):
+    """Guesses the file format from its extension, falling back to default."""
+    if path and path != "-" and path.lower().endswith((".jsonl", ".ndjson")):
+        return "jsonl"
+    if path and path != "-" and path.lower().endswith(".csv"):
+        return "csv"
+    return default
+
+
+def _parse_fee(value):
+    """Parses a JSON number or a Turkish formatted amount ("1.000,50"), as the terminal program does."""
+    if isinstance(value, bool):
+        raise ValueError(f"Geçersiz ücret: {value!r}")
+    if isinstance(value, (int, float)):
+        if not math.isfinite(value):
+            raise ValueError(f"Geçersiz ücret: {value!r}")
+        return float(value)
+    return parse_amount(value)
+
+
+def _parse_option(value):
+    """Parses an option code; a fractional JSON number such as 1.7 is rejected, not truncated."""
+    if isinstance(value, bool):
+        raise ValueError(f"Geçersiz seçenek: {value!r}")
+    if isinstance(value, float):
+        if not value.is_integer():
+            raise ValueError(f"Geçersiz seçenek: {value!r}")
+        return int(value)
+    return int(value)
+
+
+def read_rows(stream, fmt="csv"):
+    """Yields (line_number, fee, option) tuples from a CSV or JSONL stream.
+
+    Malformed rows are yielded with the exception in place of the fee so that
+    the caller decides whether to skip them or stop.
+    """
+    if fmt == "jsonl":
+        for line_number, line in enumerate(stream, start=1):
+            if not line.strip():
+                continue
+            try:
+                record = json.loads(line)
+                yield line_number, _parse_fee(record["fee"]), _parse_option(record["option"])
+            except (ValueError, KeyError, TypeError) as e:
+                yield line_number, e, None
+        return
+
+    reader = csv.reader(stream)
+    first = next(reader, None)
+    if first is None:
+        return
+    header = [column.strip().lower() for column in first]
+    if "fee" in header and "option" in header:
+        fee_col, option_col = header.index("fee"), header.index("option")
+        start = 2
+    else:
+        fee_col, option_col = 0, 1
+        reader = _prepend(first, reader)
+        start = 1
+
+    for line_number, row in enumerate(reader, start=start):
+        if not row:
+            continue
+        try:
+            yield line_number, _parse_fee(row[fee_col]), _parse_option(row[option_col])
+        except (ValueError, IndexError) as e:
+            yield line_number, e, None
+
+
+def _prepend(first, rows):
+    yield first
+    yield from rows
+
+
+def calculate_rows(rows):
+    """Runs (fee, option) pairs through InvoiceCalculator and yields output rows."""
+    for fee, option in rows:
+        result = InvoiceCalculator(fee, option).result
+        row = [fee, option]
+        for line in RECEIPT_LINES:
+            row += result[line]
+        yield row
+
+
+class _CsvWriter:
+    # Output rows only hold numbers, so one format string per row is enough
+    # and is much faster than csv.writer with a float format per cell.
+    ROW_FORMAT = "{},{}," + ",".join(["{:.2f}"] * (len(OUTPUT_FIELDS) - 2)) + "\n"
+
+    def __init__(self, stream):
+        self.stream = stream
+        self.stream.write(",".join(OUTPUT_FIELDS) + "\n")
+
+    def write(self, rows):
+        row_format = self.ROW_FORMAT.format
+        self.stream.write("".join(row_format(*row) for row in rows))
+
+
+class _JsonlWriter:
+    def __init__(self, stream):
+        self.stream = stream
+
+    def write(self, rows):
+        self.stream.write("".join(
+            json.dumps(dict(zip(OUTPUT_FIELDS, [row[0], row[1]] + [round(value, 2) for value in row[2:]])),
+                       ensure_ascii=False) + "\n"
+            for row in rows
+        ))
+
+
+def stream_invoices(source, sink, input_format="csv", output_format="csv",
+                    chunk_size=DEFAULT_CHUNK_SIZE, skip_errors=False):
+    """Streams fees from source to receipt rows in sink, one chunk at a time.
+
+    Args:
+        source: Text stream with the input rows.
+        sink: Text stream the result rows are written to.
+        input_format: "csv" or "jsonl".
+        output_format: "csv" or "jsonl".
+        chunk_size: Number of rows calculated and written per chunk.
+        skip_errors: Skip and count malformed rows instead of stopping.
+
+    Returns:
+        StreamStats: Row counts and elapsed time.
+
+    Raises:
+        ValueError: On a malformed row or invalid option when skip_errors is False.
+    """
+    if input_format not in FORMATS or output_format not in FORMATS:
+        raise ValueError(f"Desteklenmeyen biçim. Seçenekler: {', '.join(FORMATS)}")
+    if chunk_size < 1:
+        raise ValueError("chunk_size en az 1 olmalı")
+
+    writer = _CsvWriter(sink) if output_format == "csv" else _JsonlWriter(sink)
+    stats = StreamStats()
+    started = time.perf_counter()
+    rows = read_rows(source, input_format)
+
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            break
+        valid = []
+        for line_number, fee, option in chunk:
+            if isinstance(fee, Exception) or option not in VALID_OPTIONS:
+                if not skip_errors:
+                    reason = fee if isinstance(fee, Exception) else "Geçersiz seçenek!"
+                    raise ValueError(f"Satır {line_number}: {reason}")
+                stats.skipped += 1
+                continue
+            valid.append((fee, option))
+        writer.write(calculate_rows(valid))
+        stats.rows += len(valid)
+
+    sink.flush()
+    stats.seconds = time.perf_counter() - started
+    return stats
+
+
+def main(argv=None):
+    """Command line entry point; returns the process exit code."""
+    parser = argparse.ArgumentParser(
+        description="Arabuluculuk ücretlerini CSV/JSONL dosyasından toplu hesaplar."
+    )
+    parser.add_argument("input", nargs="?", default="-", help="Girdi dosyası (varsayılan: stdin)")
+    parser.add_argument("-o", "--output", default="-", help="Çıktı dosyası (varsayılan: stdout)")
+    parser.add_argument("--format", choices=FORMATS, help="Girdi biçimi (varsayılan: uzantıdan)")
+    parser.add_argument("--output-format", choices=FORMATS, help="Çıktı biçimi (varsayılan: uzantıdan)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    parser.add_argument("--skip-errors", action="store_true", help="Hatalı satırları atla")
+    args = parser.parse_args(argv)
+
+    input_format = args.format or detect_format(args.input)
+    output_format = args.output_format or detect_format(args.output, default=input_format)
+
+    try:
+        source = sys.stdin if args.input == "-" else open(args.input, newline="", encoding="utf-8")
+    except OSError as e:
+        print(f"Hata: {e}", file=sys.stderr)
+        return 1
+    try:
+        sink = sys.stdout if args.output == "-" else open(args.output, "w", newline="", encoding="utf-8")
+    except OSError as e:
+        print(f"Hata: {e}", file=sys.stderr)
+        if source is not sys.stdin:
+            source.close()
+        return 1
+    try:
+        stats = stream_invoices(source, sink, input_format, output_format,
+                                args.chunk_size, args.skip_errors)
+    except ValueError as e:
+        print(f"Hata: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if source is not sys.stdin:
+            source.close()
+        if sink is not sys.stdout:
+            sink.close()
+
+    print(stats.summary(), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
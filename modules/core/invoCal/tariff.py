@@ -0,0 +1,386 @@
+"""Mediation fees from the Arabuluculuk Asgari Ücret Tarifesi.
+
+A Tariff is one year's table. Its first part gives hourly fees by dispute
+subject and number of parties, used when the parties do not agree or agree on
+something other than money. Its second part gives marginal percentage brackets
+over the agreed amount, and that fee is never less than the hourly fee for the
+minimum number of hours. TariffRegistry keeps the tables by their effective
+date, like regimes.TaxRegimeRegistry does for tax rates. Unlike tax rates, a
+tariff is published for one year only, so each table also has a last date and
+dates after it are refused until the next year's table is added.
+
+Bracket limits are precomputed into sorted tuples together with the fee accrued
+below each limit, so a fee is one bisect, one multiply and one add; fee_batch
+does the same for whole columns with searchsorted. Tariff fees exclude KDV and
+include stopaj, so they feed InvoiceCalculator as option 4.
+
+The bundled tables are in tariffs.json and follow the tariff published in the
+Resmî Gazete each year.
+
+    python -m modules.core.invoCal.tariff ticari 1.250.000 --parties 3
+    python -m modules.core.invoCal.tariff isci_isveren --hours 3 --date 15.03.2025
+"""
+
+import argparse
+import json
+import os
+import sys
+from bisect import bisect_right
+from dataclasses import dataclass
+from datetime import date, datetime
+
+from modules.core.common.formatting import format_amount, parse_amount
+from modules.core.common.metrics import METRICS
+from .calculator import CalculationOption
+from .regimes import DEFAULT_REGISTRY
+
+DEFAULT_TARIFF_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "tariffs.json")
+DATE_FORMAT = "%d.%m.%Y"
+
+# Tariff fees are the brüt amount before KDV, with stopaj included
+FEE_OPTION = CalculationOption.KDV_HARIC_STOPAJ_DAHIL.value
+
+_default_registry = None
+
+
+@dataclass(frozen=True)
+class Subject:
+    """A dispute subject with its hourly fee for each party group."""
+    id: str
+    name: str
+    hourly: tuple
+
+
+class Tariff:
+    """One year's tariff with its brackets compiled for lookups."""
+
+    def __init__(self, effective_from, subjects, party_groups, brackets, minimum_hours=2, name="",
+                 effective_to=None):
+        """Validates and indexes a tariff.
+
+        Args:
+            effective_from: First date the tariff applies to.
+            subjects: Subject entries; each has one hourly fee per party group.
+            party_groups: Smallest party count of each group in increasing
+                order, e.g. (2, 3, 6, 11) for 2, 3-5, 6-10 and 11+ parties.
+            brackets: (upper limit, rate) pairs of the agreed amount in
+                increasing order; the last limit is None.
+            minimum_hours: Hours billed when there is no agreement, and the
+                hourly fee they make is the least any fee can be.
+            name: Display name.
+            effective_to: Last date the tariff applies to; None if open ended.
+
+        Raises:
+            ValueError: If the dates, groups, hourly fees or brackets are inconsistent.
+        """
+        if effective_to is not None and effective_to < effective_from:
+            raise ValueError("Tarifenin bitiş tarihi başlangıç tarihinden önce olamaz")
+        self.effective_from = effective_from
+        self.effective_to = effective_to
+        self.name = name
+        self.minimum_hours = minimum_hours
+        self.subjects = tuple(subjects)
+        self.party_groups = tuple(int(parties) for parties in party_groups)
+        if not self.party_groups or list(self.party_groups) != sorted(set(self.party_groups)):
+            raise ValueError("Taraf grupları artan sırada olmalı")
+        for subject in self.subjects:
+            if len(subject.hourly) != len(self.party_groups):
+                raise ValueError(f"{subject.id}: her taraf grubu için bir saat ücreti gerekli")
+
+        brackets = list(brackets)
+        if not brackets or brackets[-1][0] is not None:
+            raise ValueError("Son dilimin üst sınırı olmamalı")
+        limits = [limit for limit, _ in brackets[:-1]]
+        if any(low >= high for low, high in zip([0] + limits, limits)):
+            raise ValueError("Dilim sınırları artan sırada olmalı")
+        # Lower limit, rate and fee accrued below the limit of every bracket
+        self.starts = (0.0,) + tuple(float(limit) for limit in limits)
+        self.rates = tuple(float(rate) for _, rate in brackets)
+        accrued = [0.0]
+        for position in range(1, len(self.starts)):
+            width = self.starts[position] - self.starts[position - 1]
+            accrued.append(accrued[-1] + width * self.rates[position - 1])
+        self.accrued = tuple(accrued)
+
+        self._index = {}
+        for position, subject in enumerate(self.subjects):
+            for key in (subject.id, subject.name):
+                if key in self._index:
+                    raise ValueError(f"Uyuşmazlık konusu iki kez tanımlı: {key}")
+                self._index[key] = position
+        self._compiled = None
+
+    def subject_index(self, subject):
+        """Returns the position of a subject given by id or name."""
+        try:
+            return self._index[subject]
+        except (KeyError, TypeError):
+            raise ValueError(f"Bilinmeyen uyuşmazlık konusu: {subject}")
+
+    def party_group(self, parties):
+        """Returns the position of the party group a party count belongs to."""
+        position = bisect_right(self.party_groups, parties) - 1
+        if position < 0:
+            raise ValueError(f"En az {self.party_groups[0]} taraf gerekli")
+        return position
+
+    def hourly_fee(self, subject, parties=2):
+        """Returns the hourly fee of a subject for a number of parties."""
+        return self.subjects[self.subject_index(subject)].hourly[self.party_group(parties)]
+
+    def bracket_fee(self, amount):
+        """Returns the second part fee of an agreed amount, without the minimum."""
+        if not amount >= 0:  # Also true for NaN
+            raise ValueError("Anlaşma tutarı negatif olamaz")
+        position = bisect_right(self.starts, amount) - 1
+        return self.accrued[position] + (amount - self.starts[position]) * self.rates[position]
+
+    def fee(self, subject, amount=None, parties=2, hours=None):
+        """Returns the mediation fee (KDV hariç) for one case.
+
+        Args:
+            subject: Dispute subject id or name.
+            amount: Agreed amount in ₺; None when there is no agreement or the
+                agreement is not about money.
+            parties: Number of parties.
+            hours: Hours spent, used when amount is None; fewer than the
+                minimum hours are billed as the minimum.
+
+        Raises:
+            ValueError: On an unknown subject, too few parties or a negative or NaN amount.
+        """
+        hourly = self.hourly_fee(subject, parties)
+        minimum = hourly * self.minimum_hours
+        if amount is None:
+            return max(hourly * hours, minimum) if hours else minimum
+        return max(self.bracket_fee(amount), minimum)
+
+    def compile(self):
+        """Returns the lookup arrays as (starts, accrued, rates, party groups, hourly).
+
+        hourly has shape (subject, party group). The arrays are built once.
+        """
+        if self._compiled is None:
+            import numpy as np
+            arrays = (
+                np.array(self.starts), np.array(self.accrued), np.array(self.rates),
+                np.array(self.party_groups),
+                np.array([subject.hourly for subject in self.subjects], dtype=np.float64),
+            )
+            for array in arrays:
+                array.setflags(write=False)
+            self._compiled = arrays
+        return self._compiled
+
+    def fee_batch(self, subjects, amounts, parties=2, hours=None):
+        """Returns the fees of many cases as a float64 array.
+
+        Args:
+            subjects: Array-like of subject ids or names.
+            amounts: Array-like of agreed amounts; NaN where there is no
+                monetary agreement.
+            parties: Array-like of party counts, or one count for every case.
+            hours: Optional array-like of hours for the cases without a
+                monetary agreement; NaN or missing means the minimum hours.
+
+        Raises:
+            ValueError: On an unknown subject, too few parties or a negative amount.
+        """
+        import numpy as np
+        starts, accrued, rates, party_groups, hourly_table = self.compile()
+
+        keys, inverse = np.unique(np.asarray(subjects), return_inverse=True)
+        subject_index = np.array([self.subject_index(key.item()) for key in keys], dtype=np.intp)[inverse]
+        amounts = np.asarray(amounts, dtype=np.float64)
+        subject_index, amounts, parties = np.broadcast_arrays(
+            subject_index.reshape(np.shape(subjects)), amounts, np.asarray(parties)
+        )
+        group = np.searchsorted(party_groups, parties, side="right") - 1
+        if group.size and group.min() < 0:
+            raise ValueError(f"En az {self.party_groups[0]} taraf gerekli")
+        if np.any(amounts < 0):
+            raise ValueError("Anlaşma tutarı negatif olamaz")
+
+        hourly = hourly_table[subject_index, group]
+        minimum = hourly * self.minimum_hours
+        agreed = ~np.isnan(amounts)
+        # NaN amounts sort past the last limit; their bracket fee is discarded below
+        position = np.searchsorted(starts, amounts, side="right") - 1
+        bracket = accrued[position] + (amounts - starts[position]) * rates[position]
+        if hours is None:
+            unagreed = minimum
+        else:
+            unagreed = hourly * np.fmax(np.asarray(hours, dtype=np.float64), self.minimum_hours)
+        return np.where(agreed, np.maximum(bracket, minimum), unagreed)
+
+
+class TariffRegistry:
+    """Tariffs keyed by their effective date."""
+
+    def __init__(self, tariffs=()):
+        self._tariffs = []
+        self._starts = []
+        for tariff in tariffs:
+            self.register(tariff)
+
+    def register(self, tariff):
+        """Adds a tariff, replacing any tariff with the same effective date."""
+        position = bisect_right(self._starts, tariff.effective_from)
+        if position and self._starts[position - 1] == tariff.effective_from:
+            self._tariffs[position - 1] = tariff
+        else:
+            self._starts.insert(position, tariff.effective_from)
+            self._tariffs.insert(position, tariff)
+
+    @property
+    def tariffs(self):
+        return tuple(self._tariffs)
+
+    @classmethod
+    def load(cls, path=DEFAULT_TARIFF_FILE):
+        """Loads a registry from a JSON data file.
+
+        Raises:
+            ValueError: If the file does not have the expected structure.
+        """
+        with open(path, encoding="utf-8") as handle:
+            data = json.load(handle)
+
+        def parse_date(text):
+            return datetime.strptime(text, "%Y-%m-%d").date() if text else None
+
+        try:
+            return cls(
+                Tariff(
+                    parse_date(entry["effective_from"]),
+                    [Subject(item["id"], item["name"], tuple(float(fee) for fee in item["hourly"]))
+                     for item in entry["subjects"]],
+                    entry["party_groups"],
+                    [(item["up_to"], item["rate"]) for item in entry["brackets"]],
+                    entry.get("minimum_hours", 2),
+                    entry.get("name", ""),
+                    parse_date(entry.get("effective_to")),
+                )
+                for entry in data["tariffs"]
+            )
+        except (KeyError, TypeError) as e:
+            raise ValueError(f"Geçersiz tarife dosyası {path}: {e}") from e
+
+    @classmethod
+    def default(cls):
+        """Returns the registry of the bundled tariffs.json, loaded once."""
+        global _default_registry
+        if _default_registry is None:
+            _default_registry = cls.load()
+        return _default_registry
+
+    def tariff_for(self, on=None):
+        """Returns the tariff in force on a date (today if omitted).
+
+        Raises:
+            ValueError: If the date is before the first registered tariff or
+                after the last date of the tariff that precedes it.
+        """
+        if on is None:
+            on = date.today()
+        elif isinstance(on, datetime):
+            on = on.date()
+        position = bisect_right(self._starts, on)
+        tariff = self._tariffs[position - 1] if position else None
+        if tariff is None or (tariff.effective_to is not None and on > tariff.effective_to):
+            raise ValueError(f"{on} tarihinde geçerli arabuluculuk ücret tarifesi yok")
+        return tariff
+
+    def fee(self, subject, amount=None, parties=2, hours=None, on=None):
+        """Returns the fee of one case under the tariff in force on a date; see Tariff.fee."""
+        return self.tariff_for(on).fee(subject, amount, parties, hours)
+
+    def calculator(self, subject, amount=None, parties=2, hours=None, on=None, tax_registry=None):
+        """Returns an InvoiceCalculator for the tariff fee, with the tax rates in force on the date."""
+        fee = self.fee(subject, amount, parties, hours, on)
+        return (tax_registry or DEFAULT_REGISTRY).calculator(fee, FEE_OPTION, on)
+
+    def fee_batch(self, subjects, amounts, parties=2, hours=None, dates=None):
+        """Returns the fees of many cases, each under the tariff in force on its date.
+
+        Args:
+            subjects, amounts, parties, hours: As in Tariff.fee_batch.
+            dates: Optional array-like of dates (datetime64, date or ISO
+                strings); today's tariff is used for every case when omitted.
+
+        Raises:
+            ValueError: As Tariff.fee_batch, or if no tariff is in force on a date.
+        """
+        import numpy as np
+        if dates is None:
+            return self.tariff_for().fee_batch(subjects, amounts, parties, hours)
+
+        dates = np.asarray(dates, dtype="datetime64[D]")
+        subjects, amounts, parties, dates = np.broadcast_arrays(
+            np.asarray(subjects), np.asarray(amounts, dtype=np.float64), np.asarray(parties), dates
+        )
+        hours = None if hours is None else np.broadcast_to(np.asarray(hours, dtype=np.float64), amounts.shape)
+        version = np.searchsorted(np.array(self._starts, dtype="datetime64[D]"), dates, side="right") - 1
+        ends = np.array([tariff.effective_to or date.max for tariff in self._tariffs], dtype="datetime64[D]")
+        if version.size and (version.min() < 0 or np.any(dates > ends[version])):
+            raise ValueError("Bazı tarihlerde geçerli arabuluculuk ücret tarifesi yok")
+        if version.size and version.min() == version.max():
+            return self._tariffs[int(version.flat[0])].fee_batch(subjects, amounts, parties, hours)
+        fees = np.empty(amounts.shape, dtype=np.float64)
+        # A docket spans a few tariff years, so each version prices its rows at once
+        for position in np.unique(version).tolist():
+            rows = version == position
+            fees[rows] = self._tariffs[position].fee_batch(
+                subjects[rows], amounts[rows], parties[rows], None if hours is None else hours[rows]
+            )
+        return fees
+
+    def invoice_batch(self, subjects, amounts, parties=2, hours=None, dates=None, tax_registry=None):
+        """Returns the receipt lines of many cases' tariff fees.
+
+        Same layout as regimes.TaxRegimeRegistry.calculate_batch; the tax
+        rates and the tariff both follow each case's date (today if omitted).
+        """
+        import numpy as np
+        fees = self.fee_batch(subjects, amounts, parties, hours, dates)
+        if dates is None:
+            dates = np.datetime64(date.today(), "D")
+        return (tax_registry or DEFAULT_REGISTRY).calculate_batch(fees, FEE_OPTION, dates)
+
+
+METRICS.instrument(TariffRegistry, "fee_batch", "tariff.fee_batch")
+
+
+def main(argv=None):
+    """Command line entry point; returns the process exit code."""
+    parser = argparse.ArgumentParser(description="Arabuluculuk Asgari Ücret Tarifesine göre ücret ve makbuz hesaplar.")
+    parser.add_argument("subject", nargs="?", help="Uyuşmazlık konusu (ör. ticari, isci_isveren)")
+    parser.add_argument("amount", nargs="?", help="Anlaşma tutarı (ör. 1.250.000); anlaşma yoksa boş bırakın")
+    parser.add_argument("-p", "--parties", type=int, default=2, help="Taraf sayısı (varsayılan: 2)")
+    parser.add_argument("--hours", type=float, help="Parasal olmayan anlaşmada harcanan saat")
+    parser.add_argument("--date", help="Tarife ve vergi tarihi, GG.AA.YYYY (varsayılan: bugün)")
+    parser.add_argument("--list", action="store_true", help="Uyuşmazlık konularını listeler")
+    args = parser.parse_args(argv)
+
+    try:
+        on = datetime.strptime(args.date, DATE_FORMAT).date() if args.date else None
+        registry = TariffRegistry.default()
+        tariff = registry.tariff_for(on)
+        if args.list or not args.subject:
+            print(tariff.name)
+            for subject in tariff.subjects:
+                print(f"{subject.id:<14} {subject.name}")
+            return 0
+        amount = parse_amount(args.amount) if args.amount else None
+        calculator = registry.calculator(args.subject, amount, args.parties, args.hours, on)
+    except ValueError as e:
+        print(f"Hata: {e}", file=sys.stderr)
+        return 1
+
+    print(f"{tariff.name}: arabuluculuk ücreti {format_amount(calculator.mediation_fee, symbol=True)} (KDV hariç)")
+    calculator.print_table()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
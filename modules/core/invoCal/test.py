@@ -1,5 +1,5 @@
 import unittest
-from .calculator import InvoiceCalculator, CalculationOption
+from .calculator import InvoiceCalculator, CalculationOption, RECEIPT_LINES
 
 class TestInvoiceCalculator(unittest.TestCase):
     """Unit tests for InvoiceCalculator."""
@@ -33,5 +33,540 @@ class TestInvoiceCalculator(unittest.TestCase):
         self.assertAlmostEqual(calculator.result["Brüt (KDV Hariç)"][0], 100000.00, places=2)
         self.assertAlmostEqual(calculator.result["KDV (%20)"][0], 20000.00, places=2)
 
+class TestInvoiceResult(unittest.TestCase):
+    """Unit tests for the compact result type."""
+
+    def test_result_behaves_like_the_old_dict(self):
+        """The result keeps dict-style access for print_table and the GUI."""
+        calculator = InvoiceCalculator(100000, CalculationOption.KDV_STOPAJ_HARIC.value)
+        self.assertEqual(list(calculator.result.keys()), list(RECEIPT_LINES))
+        self.assertEqual(calculator.result, calculator.calculate_lines())
+        for key, (tuzel, gercek) in calculator.result.items():
+            expected = calculator.calculate_lines()[key]
+            self.assertAlmostEqual(tuzel, expected[0], places=6)
+            self.assertAlmostEqual(gercek, expected[1], places=6)
+
+    def test_result_equals_formulas_exactly(self):
+        """Every line is the calculate_* formula output, without unit-coefficient drift."""
+        import random
+        from .regimes import DEFAULT_REGISTRY
+        generator = random.Random(5)
+        fees = [35224.58, 0.01, 1, 100000] + [round(generator.uniform(0, 10000000), 2) for _ in range(500)]
+        self.assertEqual(InvoiceCalculator(35224.58, 3).result["Brüt (KDV Hariç)"][0], 35224.58 / 0.8)
+        for regime in (None, DEFAULT_REGISTRY.regimes[0]):
+            for fee in fees:
+                for option in CalculationOption:
+                    calculator = InvoiceCalculator(fee, option.value, regime)
+                    self.assertEqual(calculator.result.to_dict(), calculator.calculate_lines())
+
+    def test_invalid_option(self):
+        """An unknown option still raises ValueError on construction."""
+        with self.assertRaises(ValueError):
+            InvoiceCalculator(100000, 5)
+
+    def test_lazy_batch_and_records(self):
+        """InvoiceBatch columns, rows and records agree with calculate_batch."""
+        import numpy as np
+        from .batch import InvoiceBatch, calculate_batch
+        fees, options = [100000, 2500.5, 42], [1, 3, 4]
+        batch = InvoiceBatch(fees, options)
+        expected = calculate_batch(fees, options)
+        np.testing.assert_array_equal(batch["KDV (%20)"][1], expected["KDV (%20)"][1])
+        self.assertAlmostEqual(batch.row(1)["Brüt (KDV Hariç)"][0], expected["Brüt (KDV Hariç)"][0][1])
+        records = batch.to_records()
+        np.testing.assert_array_equal(records["tahsil_gercek"], expected["Tahsil Edilen Ücret"][1])
+        self.assertEqual(records["option"].tolist(), options)
+
+class TestBatchCalculation(unittest.TestCase):
+    """Unit tests for the vectorized batch API."""
+
+    def test_batch_matches_single_calculation(self):
+        """Every batch row matches an InvoiceCalculator built for the same fee and option."""
+        from .batch import calculate_batch
+        fees = [100000, 25000, 1234.56, 0]
+        for option in CalculationOption:
+            batch = calculate_batch(fees, option.value)
+            for row, fee in enumerate(fees):
+                single = InvoiceCalculator(fee, option.value).result
+                for line in RECEIPT_LINES:
+                    self.assertAlmostEqual(batch[line][0][row], single[line][0], places=6)
+                    self.assertAlmostEqual(batch[line][1][row], single[line][1], places=6)
+
+    def test_batch_broadcasts_fees_against_options(self):
+        """A column of fees and a row of options prices every combination."""
+        import numpy as np
+        from .batch import calculate_batch
+        batch = calculate_batch(np.array([[100000.0], [50000.0]]), [1, 2, 3, 4])
+        self.assertEqual(batch["KDV (%20)"][0].shape, (2, 4))
+        self.assertAlmostEqual(batch["Brüt (KDV Hariç)"][0][0, 2], 125000.00, places=2)
+
+    def test_batch_rejects_invalid_option(self):
+        """Option codes outside 1-4 raise the same error as the single calculator."""
+        from .batch import calculate_batch
+        with self.assertRaises(ValueError):
+            calculate_batch([100000, 100000], [1, 5])
+
+class TestFixedPoint(unittest.TestCase):
+    """Unit tests for the integer kuruş engine."""
+
+    def test_matches_float_calculation_to_the_kurus(self):
+        """Rounded lines (brüt, stopaj, KDV) equal the float lines rounded to two decimals."""
+        from .fixedpoint import calculate_kurus
+        for option in CalculationOption:
+            exact = calculate_kurus(10000000, option.value)
+            approx = InvoiceCalculator(100000, option.value).result
+            for line in (RECEIPT_LINES[0], RECEIPT_LINES[1], RECEIPT_LINES[3]):
+                self.assertEqual(exact[line][0], round(approx[line][0] * 100))
+                self.assertEqual(exact[line][1], round(approx[line][1] * 100))
+
+    def test_receipt_lines_add_up(self):
+        """Net and tahsil are always derived exactly from the rounded lines."""
+        from .fixedpoint import calculate_kurus
+        result = calculate_kurus(10000000, CalculationOption.KDV_STOPAJ_DAHIL.value)
+        self.assertEqual(result["Alınan Net Ücret"][0], 8333333 - 1666667)
+        for fee in (1, 99, 12345, 100001, 987654321):
+            for option in CalculationOption:
+                result = calculate_kurus(fee, option.value)
+                for person in (0, 1):
+                    brut, stopaj, net, kdv, tahsil = (result[line][person] for line in RECEIPT_LINES)
+                    self.assertEqual(net, brut - stopaj)
+                    self.assertEqual(tahsil, net + kdv)
+
+    def test_half_kurus_rounds_up(self):
+        """Exact halves of a kuruş are rounded up, not to even."""
+        from datetime import date
+        from .fixedpoint import calculate_kurus, to_kurus
+        from .regimes import TaxRegime
+        self.assertEqual(to_kurus("10.005"), 1001)
+        self.assertEqual(to_kurus("0.025"), 3)
+        # 3 kuruş with KDV included is a brüt of exactly 2.5 kuruş
+        result = calculate_kurus(3, CalculationOption.KDV_STOPAJ_DAHIL.value)
+        self.assertEqual(result["Brüt (KDV Hariç)"], (3, 3))
+        # At 10% KDV, brüts of 5 and 25 kuruş carry exactly 0.5 and 2.5 kuruş of KDV
+        regime = TaxRegime(date(2020, 1, 1), kdv_rate=0.10, stopaj_rate=0.20)
+        for brut, kdv in ((5, 1), (25, 3)):
+            result = calculate_kurus(brut, CalculationOption.KDV_HARIC_STOPAJ_DAHIL.value, regime)
+            self.assertEqual(result["KDV (%20)"], (kdv, kdv))
+
+    def test_invalid_amounts_raise_value_error(self):
+        """Unparsable and non-finite amounts raise ValueError, not a decimal signal."""
+        from .fixedpoint import to_kurus
+        for amount in ("abc", "", "nan", "inf", float("inf"), float("nan"), None):
+            with self.assertRaises(ValueError):
+                to_kurus(amount)
+
+    def test_batch_matches_single_calls(self):
+        """The int64 batch path applies the same rounding as single calls."""
+        import numpy as np
+        from .fixedpoint import calculate_kurus, calculate_kurus_batch
+        fees = np.array([1, 99, 12345, 100001, 987654321, -12345], dtype=np.int64)
+        for option in CalculationOption:
+            batch = calculate_kurus_batch(fees, option.value)
+            for row, fee in enumerate(fees):
+                single = calculate_kurus(int(fee), option.value)
+                for line in RECEIPT_LINES:
+                    self.assertEqual((int(batch[line][0][row]), int(batch[line][1][row])), single[line])
+
+    def test_batch_rejects_fees_beyond_int64_range(self):
+        """Fees whose intermediate products would overflow int64 raise instead of wrapping."""
+        from .fixedpoint import MAX_BATCH_KURUS, calculate_kurus, calculate_kurus_batch
+        batch = calculate_kurus_batch([MAX_BATCH_KURUS], 3)
+        self.assertEqual(int(batch["Brüt (KDV Hariç)"][0][0]), calculate_kurus(MAX_BATCH_KURUS, 3)["Brüt (KDV Hariç)"][0])
+        for fee in (MAX_BATCH_KURUS + 1, -MAX_BATCH_KURUS - 1, 2 ** 63):
+            with self.assertRaises(ValueError):
+                calculate_kurus_batch([100, fee], 1)
+
+class TestReverseSolver(unittest.TestCase):
+    """Unit tests for the fee-from-target solver."""
+
+    def test_round_trip_for_every_line(self):
+        """Solving for a line and calculating forward gives the target back."""
+        from .reverse import solve_fee
+        for option in CalculationOption:
+            for line in RECEIPT_LINES:
+                for person in (0, 1):
+                    if InvoiceCalculator(1.0, option.value).result[line][person] == 0:
+                        continue
+                    fee = solve_fee(50000, option.value, line, person)
+                    result = InvoiceCalculator(fee, option.value).result
+                    self.assertAlmostEqual(result[line][person], 50000, places=6)
+
+    def test_zero_line_cannot_be_solved(self):
+        """Stopaj for gerçek kişi is always zero and has no solution."""
+        from .reverse import solve_fee, solve_fee_batch
+        with self.assertRaises(ValueError):
+            solve_fee(1000, 1, "stopaj", "gercek")
+        fees = solve_fee_batch([1000, 1000], [1, 2], "stopaj", "gercek")
+        self.assertTrue(all(fee != fee for fee in fees))  # NaN
+
+    def test_batch_matches_single(self):
+        """The vectorized solver agrees with solve_fee."""
+        from .reverse import solve_fee, solve_fee_batch
+        fees = solve_fee_batch([100000, 100000, 100000, 100000], [1, 2, 3, 4], "tahsil", "tuzel")
+        for option, fee in zip((1, 2, 3, 4), fees):
+            self.assertAlmostEqual(fee, solve_fee(100000, option, "tahsil", "tuzel"))
+
+class TestTaxRegimes(unittest.TestCase):
+    """Unit tests for effective-dated tax regimes."""
+
+    def test_regime_lookup_by_date(self):
+        """The regime in force on the invoice date is used."""
+        from datetime import date
+        from .regimes import DEFAULT_REGISTRY
+        self.assertEqual(DEFAULT_REGISTRY.regime_for(date(2023, 7, 9)).kdv_rate, 0.18)
+        self.assertEqual(DEFAULT_REGISTRY.regime_for(date(2023, 7, 10)).kdv_rate, 0.20)
+        with self.assertRaises(ValueError):
+            DEFAULT_REGISTRY.regime_for(date(2000, 1, 1))
+
+    def test_historical_rates(self):
+        """An 18% KDV regime changes KDV but not stopaj."""
+        from datetime import date
+        from .regimes import DEFAULT_REGISTRY
+        result = DEFAULT_REGISTRY.calculator(100000, 4, date(2020, 1, 1)).result
+        self.assertAlmostEqual(result["KDV (%20)"][0], 18000.00, places=2)
+        self.assertAlmostEqual(result["Gelir Vergisi Stopajı (%20)"][0], 20000.00, places=2)
+        self.assertAlmostEqual(result["Tahsil Edilen Ücret"][1], 118000.00, places=2)
+
+    def test_labels_show_the_rates_in_force(self):
+        """Printed labels follow the regime's rates while the result keys stay the same."""
+        import io
+        from contextlib import redirect_stdout
+        from datetime import date
+        from .regimes import DEFAULT_REGISTRY
+        calculator = DEFAULT_REGISTRY.calculator(100000, 4, date(2020, 1, 1))
+        self.assertEqual([calculator.line_label(line) for line in RECEIPT_LINES], [
+            "Brüt (KDV Hariç)", "Gelir Vergisi Stopajı (%20)", "Alınan Net Ücret", "KDV (%18)", "Tahsil Edilen Ücret",
+        ])
+        output = io.StringIO()
+        with redirect_stdout(output):
+            calculator.print_table()
+        self.assertIn("KDV (%18)", output.getvalue())
+        self.assertNotIn("KDV (%20)", output.getvalue())
+
+    def test_inclusive_option_collects_the_fee(self):
+        """With different rates option 2 still collects exactly the fee from both."""
+        from .regimes import TaxRegime
+        from datetime import date
+        regime = TaxRegime(date(2020, 1, 1), kdv_rate=0.18, stopaj_rate=0.20)
+        result = InvoiceCalculator(100000, 2, regime=regime).result
+        self.assertAlmostEqual(result["Tahsil Edilen Ücret"][0], 100000.00, places=6)
+        self.assertAlmostEqual(result["Tahsil Edilen Ücret"][1], 100000.00, places=6)
+
+    def test_mixed_date_batch_matches_single(self):
+        """A batch over mixed invoice dates matches per-row calculators."""
+        from .regimes import DEFAULT_REGISTRY
+        dates = ["2019-03-01", "2023-07-09", "2023-07-10", "2025-01-01"]
+        fees = [100000, 50000, 75000, 1234.5]
+        options = [1, 2, 3, 4]
+        batch = DEFAULT_REGISTRY.calculate_batch(fees, options, dates)
+        for row, (fee, option, day) in enumerate(zip(fees, options, dates)):
+            from datetime import date
+            single = DEFAULT_REGISTRY.calculator(fee, option, date.fromisoformat(day)).result
+            for line in RECEIPT_LINES:
+                self.assertAlmostEqual(batch[line][0][row], single[line][0], places=6)
+                self.assertAlmostEqual(batch[line][1][row], single[line][1], places=6)
+
+    def test_fixed_point_with_regime(self):
+        """The kuruş engine honours separate KDV and stopaj rates."""
+        from datetime import date
+        from .fixedpoint import calculate_kurus
+        from .regimes import TaxRegime
+        regime = TaxRegime(date(2020, 1, 1), kdv_rate=0.18, stopaj_rate=0.20)
+        result = calculate_kurus(10000000, 4, regime)
+        self.assertEqual(result["KDV (%20)"], (1800000, 1800000))
+        self.assertEqual(result["Gelir Vergisi Stopajı (%20)"], (2000000, 0))
+
+class TestStreaming(unittest.TestCase):
+    """Unit tests for the headless CSV/JSONL pipeline."""
+
+    def test_csv_to_jsonl(self):
+        """CSV input rows come out as JSONL result rows in the same order."""
+        import io, json
+        from .stream import stream_invoices
+        source = io.StringIO("fee,option\n100000,3\n\"1000,50\",4\n")
+        sink = io.StringIO()
+        stats = stream_invoices(source, sink, "csv", "jsonl", chunk_size=1)
+        rows = [json.loads(line) for line in sink.getvalue().splitlines()]
+        self.assertEqual(stats.rows, 2)
+        self.assertEqual(rows[0]["brut_tuzel"], 125000.00)
+        self.assertEqual(rows[1]["fee"], 1000.5)
+
+    def test_malformed_rows(self):
+        """Malformed rows stop the run with their line number unless skipped."""
+        import io
+        from .stream import stream_invoices
+        data = '{"fee": 100, "option": 1}\n{"fee": "abc", "option": 1}\n{"fee": 100, "option": 7}\n'
+        with self.assertRaisesRegex(ValueError, "Satır 2"):
+            stream_invoices(io.StringIO(data), io.StringIO(), "jsonl", "csv")
+        sink = io.StringIO()
+        stats = stream_invoices(io.StringIO(data), sink, "jsonl", "csv", skip_errors=True)
+        self.assertEqual((stats.rows, stats.skipped), (1, 2))
+        self.assertEqual(len(sink.getvalue().splitlines()), 2)
+
+    def test_strict_fees_and_options(self):
+        """Turkish amounts are parsed strictly; non-finite fees and fractional options are rejected."""
+        import io
+        from .stream import read_rows
+        data = 'fee,option\n"1.000,50",3\n100.000,1\n"100.000,1",2\nnan,1\n12.5,1\n100,1.0\n'
+        rows = list(read_rows(io.StringIO(data)))
+        self.assertEqual([row[1:] for row in rows[:3]], [(1000.5, 3), (100000.0, 1), (100000.1, 2)])
+        for line_number, fee, option in rows[3:]:
+            self.assertIsInstance(fee, ValueError, line_number)
+        data = ('{"fee": NaN, "option": 1}\n{"fee": 1e309, "option": 1}\n{"fee": true, "option": 1}\n'
+                '{"fee": 100, "option": 1.7}\n{"fee": 100, "option": 2.0}\n')
+        rows = list(read_rows(io.StringIO(data), "jsonl"))
+        for line_number, fee, option in rows[:4]:
+            self.assertIsInstance(fee, ValueError, line_number)
+        self.assertEqual(rows[4], (5, 100.0, 2))
+
+    def test_missing_input_file(self):
+        """A missing input file is reported as an error message and exit code 1."""
+        import contextlib, io, os, tempfile
+        from .stream import main
+        missing = os.path.join(tempfile.mkdtemp(), "yok.csv")
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            self.assertEqual(main([missing]), 1)
+        self.assertIn("Hata:", stderr.getvalue())
+
+class TestReceiptRendering(unittest.TestCase):
+    """Unit tests for the HTML/PDF serbest meslek makbuzu renderers."""
+
+    def setUp(self):
+        from datetime import date
+        from .receipt import ReceiptDetails
+        from .regimes import DEFAULT_REGISTRY
+        self.receipts = [
+            (DEFAULT_REGISTRY.calculator(12000, 1, date(2024, 3, 15)),
+             ReceiptDetails(number="A-1", date=date(2024, 3, 15), client="ACME <Ltd> Şti.")),
+            (DEFAULT_REGISTRY.calculator(2500, 3, date(2024, 3, 16)),
+             ReceiptDetails(number="A-1", date=date(2024, 3, 16), client="Ali Çağ", legal_entity=False)),
+        ]
+
+    def test_template(self):
+        """Templates fill and escape fields, repeat sections and report missing values."""
+        from .receipt import Template
+        template = Template("<p>{{name}} {x}</p>{{#rows}}<i>{{v}}</i>{{/rows}}")
+        self.assertEqual(template.render({"name": "a&b", "rows": [{"v": 1}, {"v": "<2>"}]}),
+                         "<p>a&amp;b {x}</p><i>1</i><i>&lt;2&gt;</i>")
+        with self.assertRaisesRegex(ValueError, "name"):
+            template.render({})
+        with self.assertRaises(ValueError):
+            Template("{{#rows}}open")
+
+    def test_template_cache(self):
+        """A template file is compiled once and again only after it changes."""
+        import os, tempfile
+        from .receipt import load_template
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "t.html")
+            with open(path, "w", encoding="utf-8") as handle:
+                handle.write("{{a}}")
+            first = load_template(path)
+            self.assertIs(load_template(path), first)
+            with open(path, "w", encoding="utf-8") as handle:
+                handle.write("[{{a}}]")
+            os.utime(path, (0, os.path.getmtime(path) + 1))
+            self.assertEqual(load_template(path).render({"a": 1}), "[1]")
+
+    def test_html(self):
+        """One HTML document holds every receipt with its client column."""
+        import io
+        from .receipt import HtmlReceiptRenderer, Issuer
+        sink = io.StringIO()
+        self.assertEqual(HtmlReceiptRenderer(Issuer("Av. Ayşe")).write(sink, self.receipts), 2)
+        text = sink.getvalue()
+        self.assertEqual(text.count('<section class="receipt">'), 2)
+        self.assertIn("ACME &lt;Ltd&gt; Şti.", text)
+        self.assertIn("10.000,00 ₺", text)  # Tüzel kişi brüt of 12.000 with KDV and stopaj included
+        self.assertIn("Gerçek kişi", text)
+
+    def test_pdf(self):
+        """The PDF has a page per receipt and a cross-reference table pointing at its objects."""
+        import io, re
+        from .receipt import PdfReceiptRenderer
+        sink = io.BytesIO()
+        self.assertEqual(PdfReceiptRenderer(compress=False).write(sink, self.receipts), 2)
+        data = sink.getvalue()
+        self.assertTrue(data.startswith(b"%PDF-1.4"))
+        self.assertIn(b"/Count 2", data)
+        self.assertIn(b"(10.000,00 TL)", data)
+        start = int(data.rsplit(b"startxref\n", 1)[1].split()[0])
+        self.assertTrue(data[start:].startswith(b"xref"))
+        for offset in re.findall(rb"(\d{10}) 00000 n", data):
+            self.assertRegex(data[int(offset):int(offset) + 12], rb"^\d+ 0 obj")
+
+    def test_zip(self):
+        """A zip holds one file per receipt with unique names."""
+        import io, zipfile
+        from .receipt import PdfReceiptRenderer, write_zip
+        sink = io.BytesIO()
+        self.assertEqual(write_zip(sink, PdfReceiptRenderer(), self.receipts), 2)
+        self.assertEqual(zipfile.ZipFile(sink).namelist(), ["A-1.pdf", "A-1_2.pdf"])
+
+    def test_read_receipts_parses_amounts_strictly(self):
+        """Fees are Turkish amounts; malformed and non-finite ones name their line."""
+        import io
+        from .receipt import read_receipts
+        rows = list(read_receipts(io.StringIO('fee,option,date\n"100.000,1",4,01.03.2025\n100.000,4,01.03.2025\n')))
+        self.assertEqual([calculator.mediation_fee for calculator, _ in rows], [100000.1, 100000.0])
+        for fee in ("nan", "12.5", "inf"):
+            with self.assertRaisesRegex(ValueError, "Satır 2"):
+                list(read_receipts(io.StringIO(f"fee,option\n{fee},1\n")))
+
+    def test_failed_render_keeps_existing_output(self):
+        """A malformed row leaves the previous output file and no temporary file behind."""
+        import io, os, tempfile
+        from .receipt import read_receipts, render_receipts
+        with tempfile.TemporaryDirectory() as folder:
+            output = os.path.join(folder, "makbuzlar.html")
+            source = io.StringIO("fee,option\n100.000,1\n200.000,2\n")
+            self.assertEqual(render_receipts(read_receipts(source), output), 2)
+            with open(output, encoding="utf-8") as handle:
+                rendered = handle.read()
+            source = io.StringIO("fee,option\n100.000,1\nnan,2\n")
+            with self.assertRaisesRegex(ValueError, "Satır 3"):
+                render_receipts(read_receipts(source), output)
+            with open(output, encoding="utf-8") as handle:
+                self.assertEqual(handle.read(), rendered)
+            self.assertEqual(os.listdir(folder), ["makbuzlar.html"])
+
+class TestTariff(unittest.TestCase):
+    """Unit tests for the minimum mediation fee tariff engine."""
+
+    def setUp(self):
+        from datetime import date
+        from .tariff import Subject, Tariff, TariffRegistry
+        subjects = [Subject("ticari", "Ticari uyuşmazlıklar", (1000.0, 1100.0)),
+                    Subject("aile", "Aile uyuşmazlıkları", (500.0, 550.0))]
+        self.old = Tariff(date(2024, 1, 1), subjects, (2, 3), [(100000, 0.06), (None, 0.05)], name="2024")
+        self.new = Tariff(date(2025, 1, 1), subjects, (2, 3), [(200000, 0.06), (None, 0.04)], name="2025")
+        self.registry = TariffRegistry([self.new, self.old])
+
+    def test_brackets_and_minimum(self):
+        """Brackets are marginal and no fee is below the minimum hours."""
+        self.assertAlmostEqual(self.old.fee("ticari", 100000), 6000)
+        self.assertAlmostEqual(self.old.fee("ticari", 150000), 6000 + 2500)
+        self.assertEqual(self.old.fee("ticari", 1000), 2000)  # Two hours of 1000 ₺
+        self.assertEqual(self.old.fee("Aile uyuşmazlıkları", None, parties=4), 1100)
+        self.assertEqual(self.old.fee("aile", None, hours=3), 1500)
+        with self.assertRaisesRegex(ValueError, "Bilinmeyen"):
+            self.old.fee("kira", 1000)
+        with self.assertRaises(ValueError):
+            self.old.fee("aile", None, parties=1)
+        for amount in (-1, float("nan")):
+            with self.assertRaisesRegex(ValueError, "negatif"):
+                self.old.fee("ticari", amount)
+
+    def test_versions_by_date(self):
+        """Each date uses the tariff in force on it."""
+        from datetime import date
+        self.assertIs(self.registry.tariff_for(date(2024, 12, 31)), self.old)
+        self.assertAlmostEqual(self.registry.fee("ticari", 150000, on=date(2025, 6, 1)), 9000)
+        with self.assertRaises(ValueError):
+            self.registry.tariff_for(date(2023, 12, 31))
+
+    def test_no_tariff_after_the_last_date(self):
+        """A table with a last date is not stretched over the following years."""
+        from datetime import date
+        from .tariff import Tariff, TariffRegistry
+        ended = Tariff(date(2025, 1, 1), self.new.subjects, (2, 3), [(None, 0.04)], effective_to=date(2025, 12, 31))
+        registry = TariffRegistry([self.old, ended])
+        self.assertIs(registry.tariff_for(date(2025, 12, 31)), ended)
+        with self.assertRaisesRegex(ValueError, "tarifesi yok"):
+            registry.tariff_for(date(2026, 1, 1))
+        with self.assertRaisesRegex(ValueError, "tarifesi yok"):
+            registry.fee_batch(["ticari", "ticari"], [1000, 1000], dates=["2025-06-01", "2026-01-01"])
+        with self.assertRaises(ValueError):
+            Tariff(date(2025, 1, 1), self.new.subjects, (2, 3), [(None, 0.04)], effective_to=date(2024, 12, 31))
+
+    def test_batch_matches_single_fees(self):
+        """The batch API gives the single case fees across tariff versions."""
+        from datetime import date
+        import numpy as np
+        subjects = ["ticari", "aile", "ticari", "aile"]
+        amounts = [150000, np.nan, 250000, 10]
+        parties = [2, 3, 5, 2]
+        dates = ["2024-06-01", "2025-02-01", "2025-02-01", "2024-01-01"]
+        fees = self.registry.fee_batch(subjects, amounts, parties, hours=[1, 4, 1, 1], dates=dates)
+        expected = [self.registry.fee("ticari", 150000, on=date(2024, 6, 1)),
+                    self.registry.fee("aile", None, parties=3, hours=4, on=date(2025, 2, 1)),
+                    self.registry.fee("ticari", 250000, parties=5, on=date(2025, 2, 1)),
+                    self.registry.fee("aile", 10, on=date(2024, 1, 1))]
+        np.testing.assert_allclose(fees, expected)
+
+    def test_feeds_invoice_calculator(self):
+        """Tariff fees are the brüt amount of the receipt."""
+        from datetime import date
+        calculator = self.registry.calculator("ticari", 150000, on=date(2024, 6, 1))
+        self.assertAlmostEqual(calculator.result["Brüt (KDV Hariç)"][0], 8500)
+        lines = self.registry.invoice_batch(["ticari"], [150000], dates=["2024-06-01"])
+        self.assertAlmostEqual(lines["Tahsil Edilen Ücret"][1][0], calculator.result["Tahsil Edilen Ücret"][1])
+
+    def test_bundled_tariff_loads(self):
+        """The bundled data file has a tariff with every subject priced."""
+        from .tariff import TariffRegistry
+        from datetime import date
+        registry = TariffRegistry.default()
+        tariff = registry.tariffs[-1]
+        self.assertTrue(tariff.subjects)
+        self.assertEqual(tariff.starts[0], 0.0)
+        self.assertEqual([registry.tariff_for(date(year, 6, 1)).effective_from.year for year in (2025, 2026)],
+                         [2025, 2026])
+        self.assertTrue(all(tariff.effective_to is not None for tariff in registry.tariffs))
+
+class TestInvoiceGui(unittest.TestCase):
+    """Headless tests for the invoice screen."""
+
+    @classmethod
+    def setUpClass(cls):
+        import importlib.util
+        import os
+        if importlib.util.find_spec("kivy") is None:
+            raise unittest.SkipTest("Kivy is not installed")
+        os.environ.setdefault("KIVY_NO_ARGS", "1")  # Keep Kivy away from the test runner's arguments
+        from kivy.lang import Builder
+        kv_path = os.path.join(os.path.dirname(os.path.abspath(__file__)), "invoice.kv")
+        if kv_path not in Builder.files:
+            Builder.load_file(kv_path)
+
+    def setUp(self):
+        from .gui import InvoiceScreen
+        self.screen = InvoiceScreen()
+
+    def shown(self):
+        return [(tuzel.text, gercek.text) for tuzel, gercek in self.screen.value_labels]
+
+    def test_label_pool_shows_calculator_result(self):
+        """The pooled labels show the InvoiceCalculator lines under today's regime."""
+        from modules.core.common.formatting import format_amount
+        from .gui import OPTION_MAP
+        from .regimes import DEFAULT_REGISTRY
+        for option, value in OPTION_MAP.items():
+            self.screen.ids.option_spinner.text = option
+            self.screen.ids.fee_input.text = "35.224,58"
+            self.screen.calculate(live=True)  # Live mode, so nothing is saved to the history
+            calculator = InvoiceCalculator(35224.58, value, DEFAULT_REGISTRY.regime_for())
+            self.assertEqual(self.shown(), [
+                (format_amount(tuzel, symbol=True), format_amount(gercek, symbol=True))
+                for tuzel, gercek in calculator.result.values()
+            ])
+            self.assertEqual([label.text for label in self.screen.line_labels],
+                             [calculator.line_label(line) for line in RECEIPT_LINES])
+
+    def test_invalid_input_clears_the_pool(self):
+        """Explicit invalid input clears the amounts; live incomplete input keeps them."""
+        self.screen.ids.option_spinner.text = "KDV ve Stopaj Hariç"
+        self.screen.ids.fee_input.text = "100.000"
+        self.screen.calculate(live=True)
+        self.assertEqual(self.shown()[0], ("125.000,00 ₺", "100.000,00 ₺"))
+        self.screen.ids.fee_input.text = "100.00"
+        self.screen.calculate(live=True)
+        self.assertEqual(self.shown()[0], ("125.000,00 ₺", "100.000,00 ₺"))
+        self.screen.calculate()
+        self.assertEqual(self.shown(), [("", "")] * len(RECEIPT_LINES))
+        self.assertTrue(self.screen.ids.result_label.text.startswith("Geçersiz giriş"))
+
+
 if __name__ == "__main__":
     unittest.main()
@@ -5,9 +5,21 @@
 MedTime - Mediation Timeline Calculator Module
 ----------------------------------------------
 This module handles timeline calculations for mediation procedures.
+
+The calculator is pure Python; the Kivy GUI classes are only imported (and
+their KV file loaded) when they are first accessed.
 """
 
 from .calculator import MediationTimeCalculator
-from .gui import MediationTimeGUI, MediationTimeApp
+
+_GUI_NAMES = ('MediationTimeGUI', 'MediationTimeApp')
+
+
+def __getattr__(name):
+    if name in _GUI_NAMES:
+        from . import gui
+        return getattr(gui, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 __all__ = ['MediationTimeCalculator', 'MediationTimeGUI', 'MediationTimeApp']
\ No newline at end of file
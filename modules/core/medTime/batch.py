@@ -0,0 +1,343 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+MedTime Batch - Vectorized deadline calculations
+------------------------------------------------
+This module computes mediation deadlines for many start dates at once using
+NumPy datetime64 arrays. NumPy is only needed here; the GUI does not import it.
+
+Case lists can also be streamed from CSV (start_date and dispute columns) to a
+CSV with one deadline column per week:
+
+    python -m modules.core.medTime.batch cases.csv -o deadlines.csv
+"""
+
+import argparse
+import csv
+import sys
+from itertools import islice
+from typing import Dict, Iterable, List, Optional, Tuple
+
+import numpy as np
+
+from .calculator import MediationTimeCalculator
+
+DEFAULT_CHUNK_SIZE = 100000
+
+
+def to_datetime64(start_dates) -> np.ndarray:
+    """Convert start dates into a datetime64[D] array
+
+    Args:
+        start_dates: datetime64 array, or an iterable of datetime/date objects
+            or "DD.MM.YYYY" strings
+
+    Returns:
+        np.ndarray: Array of dtype datetime64[D]
+    """
+    if isinstance(start_dates, np.ndarray) and np.issubdtype(start_dates.dtype, np.datetime64):
+        return start_dates.astype("datetime64[D]")
+
+    if isinstance(start_dates, (list, tuple, np.ndarray)) and len(start_dates) and isinstance(start_dates[0], str):
+        parsed = _parse_dotted_dates(start_dates)
+        if parsed is not None:
+            return parsed
+
+    days = []
+    for value in start_dates:
+        if isinstance(value, str):
+            day, month, year = value.strip().split(".")
+            if len(year) != 4 or not year.isdigit():
+                raise ValueError(f"Invalid date {value!r}. Expected format: DD.MM.YYYY")
+            value = f"{year}-{int(month):02d}-{int(day):02d}"
+        elif hasattr(value, "date"):
+            value = value.date()
+        days.append(np.datetime64(value, "D"))
+    return np.array(days, dtype="datetime64[D]")
+
+
+def _parse_dotted_dates(values) -> Optional[np.ndarray]:
+    """Parse "DD.MM.YYYY" strings without a Python loop per date
+
+    Returns:
+        Optional[np.ndarray]: datetime64[D] array, or None when some value is not
+        exactly in the zero padded DD.MM.YYYY form
+    """
+    text = np.asarray(values, dtype=str)
+    if text.dtype.itemsize > np.dtype("U10").itemsize:
+        return None  # Some value is longer than 10 characters; casting to S10 would truncate it
+    try:
+        raw = text.astype("S10")
+    except UnicodeEncodeError:
+        return None
+    chars = raw.view(np.uint8).reshape(len(raw), 10)
+    if not (np.all(chars[:, 2] == ord(".")) and np.all(chars[:, 5] == ord("."))):
+        return None
+    digits = chars[:, [0, 1, 3, 4, 6, 7, 8, 9]].astype(np.int64) - ord("0")
+    if digits.min() < 0 or digits.max() > 9:
+        return None
+
+    # Swap DD.MM.YYYY into YYYY-MM-DD bytes and let NumPy validate the dates
+    iso = np.empty((len(raw), 10), dtype=np.uint8)
+    iso[:, :4] = chars[:, 6:10]
+    iso[:, 4] = iso[:, 7] = ord("-")
+    iso[:, 5:7] = chars[:, 3:5]
+    iso[:, 8:10] = chars[:, 0:2]
+    return iso.view("S10").ravel().astype("datetime64[D]")
+
+
+def calculate_dates_batch(start_dates, weeks: Optional[Iterable[int]] = None,
+                          work_calendar=None) -> Dict[int, np.ndarray]:
+    """Calculate target dates for many start dates at once
+
+    Args:
+        start_dates: Start dates accepted by to_datetime64
+        weeks: Week numbers to calculate (defaults to all weeks of the calculator)
+        work_calendar: Optional workdays.WorkCalendar applied to every target date
+
+    Returns:
+        Dict[int, np.ndarray]: Week number to a datetime64[D] column of target dates,
+        the columnar counterpart of MediationTimeCalculator.calculate_dates
+    """
+    start_days = to_datetime64(start_dates)
+    if weeks is None:
+        weeks = MediationTimeCalculator().get_all_weeks()
+
+    dates = {
+        week: start_days + np.timedelta64(7 * week, "D")
+        for week in weeks if isinstance(week, int) and week > 0
+    }
+    if work_calendar is not None:
+        dates = {week: work_calendar.adjust_datetime64(target) for week, target in dates.items()}
+    return dates
+
+
+def dispute_week_mask(calculator: Optional[MediationTimeCalculator] = None) -> Tuple[np.ndarray, np.ndarray]:
+    """Return the dispute x week applicability matrix indexed by dispute id
+
+    Args:
+        calculator: Calculator whose dispute registry is used (a default one if None)
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (weeks, mask) where mask[dispute_id, j]
+        is True if weeks[j] applies to that dispute type. Rows of unused ids
+        are all False
+    """
+    registry = (calculator or MediationTimeCalculator()).registry
+    weeks = np.array(registry.all_weeks, dtype=np.int64)
+    mask = np.zeros((max(registry.ids, default=0) + 1, len(weeks)), dtype=bool)
+    if len(registry):
+        mask[list(registry.ids)] = np.array(registry.mask, dtype=bool)
+    return weeks, mask
+
+
+def dispute_codes(disputes, calculator: Optional[MediationTimeCalculator] = None) -> np.ndarray:
+    """Convert dispute ids or names into an array of dispute ids
+
+    Args:
+        disputes: Iterable of dispute ids (ints or digit strings) or dispute
+            type names
+        calculator: Calculator whose dispute registry is used (a default one if None)
+
+    Returns:
+        np.ndarray: int64 array of dispute ids
+
+    Raises:
+        ValueError: If a name or id is unknown
+    """
+    registry = (calculator or MediationTimeCalculator()).registry
+    if isinstance(disputes, np.ndarray) and np.issubdtype(disputes.dtype, np.integer):
+        codes = disputes.astype(np.int64)
+        unknown = ~np.isin(codes, registry.ids)
+        if unknown.any():
+            raise ValueError(f"Unknown dispute type id: {codes[unknown][0]}")
+        return codes
+
+    # Case lists repeat a handful of values, so each distinct value is resolved once
+    lookup = {dispute.name: dispute.id for dispute in registry}
+
+    def resolve(value):
+        try:
+            return lookup[value]
+        except KeyError:
+            pass
+        text = str(value).strip()
+        if text in lookup:
+            code = lookup[text]
+        elif text.isdigit() and registry.get(int(text)) is not None:
+            code = int(text)
+        else:
+            raise ValueError(f"Unknown dispute type: {value}")
+        lookup[value] = code
+        return code
+
+    return np.fromiter(map(resolve, disputes), dtype=np.int64)
+
+
+def calculate_case_deadlines(start_dates, disputes, calculator: Optional[MediationTimeCalculator] = None,
+                             work_calendar=None) -> Dict[int, np.ndarray]:
+    """Calculate only the deadlines that apply to each case
+
+    Args:
+        start_dates: Start dates accepted by to_datetime64
+        disputes: Dispute ids or names accepted by dispute_codes, broadcast
+            against start_dates
+        calculator: Calculator whose dispute registry is used (a default one if None)
+        work_calendar: Optional workdays.WorkCalendar; defaults to the
+            calculator's calendar
+
+    Returns:
+        Dict[int, np.ndarray]: Week number to a datetime64[D] column, NaT where
+        the week does not apply to the case's dispute type. Weeks that apply to
+        no case in the input are left out
+
+    Raises:
+        ValueError: If a dispute id or name is unknown
+    """
+    calculator = calculator or MediationTimeCalculator()
+    if work_calendar is None:
+        work_calendar = calculator.work_calendar
+    weeks, mask = dispute_week_mask(calculator)
+
+    codes = dispute_codes(disputes, calculator)
+    start_days, codes = np.broadcast_arrays(to_datetime64(start_dates), codes)
+    applicable = mask[codes]
+
+    deadlines = {}
+    for column, week in enumerate(weeks):
+        rows = applicable[:, column]
+        if not rows.any():
+            continue
+        target = np.full(start_days.shape, np.datetime64("NaT"), dtype="datetime64[D]")
+        days = start_days[rows] + np.timedelta64(7 * int(week), "D")
+        target[rows] = days if work_calendar is None else work_calendar.adjust_datetime64(days)
+        deadlines[int(week)] = target
+    return deadlines
+
+
+def format_dates(days: np.ndarray) -> np.ndarray:
+    """Format a datetime64[D] column as "DD.MM.YYYY" strings, NaT as ""
+
+    Args:
+        days: datetime64[D] array
+
+    Returns:
+        np.ndarray: Array of str
+    """
+    days = np.asarray(days, dtype="datetime64[D]")
+    missing = np.isnat(days)
+    days = np.where(missing, np.datetime64("2000-01-01"), days)
+    months = days.astype("datetime64[M]")
+    year = months.astype(np.int64) // 12 + 1970
+    month = months.astype(np.int64) % 12 + 1
+    day = (days - months).astype(np.int64) + 1
+
+    # Write the ASCII digits straight into a fixed width byte buffer
+    chars = np.full((len(days), 10), ord("."), dtype=np.uint8)
+    digits = ((0, day, 10), (1, day, 1), (3, month, 10), (4, month, 1),
+              (6, year, 1000), (7, year, 100), (8, year, 10), (9, year, 1))
+    for column, value, divisor in digits:
+        chars[:, column] = value // divisor % 10 + ord("0")
+    text = chars.view("S10").ravel().astype(str)
+    text[missing] = ""
+    return text
+
+
+def _read_cases(stream) -> Iterable[Tuple[int, str, str]]:
+    """Yield (line number, start date, dispute) from a CSV case list
+
+    A header with start_date and dispute columns selects them by name; without
+    one the first two columns are used.
+    """
+    reader = csv.reader(stream)
+    first = next(reader, None)
+    if first is None:
+        return
+    header = [column.strip().lower() for column in first]
+    if "start_date" in header and "dispute" in header:
+        date_col, dispute_col = header.index("start_date"), header.index("dispute")
+        start = 2
+    else:
+        date_col, dispute_col = 0, 1
+        yield 1, first[date_col].strip(), first[dispute_col]
+        start = 2
+    for line_number, row in enumerate(reader, start=start):
+        if not row:
+            continue
+        if len(row) <= max(date_col, dispute_col):
+            raise ValueError(f"Row {line_number}: expected start_date and dispute columns")
+        yield line_number, row[date_col].strip(), row[dispute_col]
+
+
+def stream_case_deadlines(source, sink, calculator: Optional[MediationTimeCalculator] = None,
+                          chunk_size: int = DEFAULT_CHUNK_SIZE) -> int:
+    """Read a CSV case list and write the applicable deadlines as CSV
+
+    Args:
+        source: Text stream with start_date and dispute columns
+        sink: Text stream receiving start_date, dispute and one column per week
+        calculator: Calculator whose dispute types and calendar are used
+        chunk_size: Number of cases calculated and written at once
+
+    Returns:
+        int: Number of cases written
+
+    Raises:
+        ValueError: On a malformed date, unknown dispute or missing column
+    """
+    calculator = calculator or MediationTimeCalculator()
+    weeks: List[int] = [int(week) for week in dispute_week_mask(calculator)[0]]
+    sink.write(",".join(["start_date", "dispute"] + [f"week_{week}" for week in weeks]) + "\n")
+
+    rows = _read_cases(stream=source)
+    total = 0
+    while True:
+        chunk = list(islice(rows, chunk_size))
+        if not chunk:
+            break
+        line_numbers, starts, disputes = zip(*chunk)
+        try:
+            codes = dispute_codes(disputes, calculator)
+            deadlines = calculate_case_deadlines(list(starts), codes, calculator)
+        except ValueError as e:
+            raise ValueError(f"Rows {line_numbers[0]}-{line_numbers[-1]}: {e}") from e
+        empty = [""] * len(chunk)
+        columns = [format_dates(deadlines[week]) if week in deadlines else empty for week in weeks]
+        sink.write("".join(
+            ",".join(values) + "\n"
+            for values in zip(starts, map(str, codes), *columns)
+        ))
+        total += len(chunk)
+    sink.flush()
+    return total
+
+
+def main(argv=None) -> int:
+    """Command line entry point; returns the process exit code"""
+    parser = argparse.ArgumentParser(description="Calculate mediation deadlines for a CSV case list.")
+    parser.add_argument("input", nargs="?", default="-", help="Input CSV (default: stdin)")
+    parser.add_argument("-o", "--output", default="-", help="Output CSV (default: stdout)")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    source = sink = None
+    try:
+        source = sys.stdin if args.input == "-" else open(args.input, newline="", encoding="utf-8")
+        sink = sys.stdout if args.output == "-" else open(args.output, "w", newline="", encoding="utf-8")
+        total = stream_case_deadlines(source, sink, chunk_size=args.chunk_size)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if source not in (None, sys.stdin):
+            source.close()
+        if sink not in (None, sys.stdout):
+            sink.close()
+
+    print(f"{total} cases written", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -8,34 +8,35 @@ This module provides the core calculation functionality for mediation timelines.
 """
 
 from datetime import datetime, timedelta
-from dataclasses import dataclass
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Union
 
-@dataclass
-class DisputeType:
-    """Data class for storing dispute types and their associated timeframes"""
-    name: str
-    week_intervals: List[int]  # These are the only weeks that should be calculated for this dispute type
+from modules.core.common.cache import CacheInfo, LRUCache
+from modules.core.common.metrics import METRICS
+from .disputes import DisputeRegistry, DisputeType
 
 
 class MediationTimeCalculator:
     """Main class for calculating mediation timelines"""
     
-    def __init__(self):
-        """Initialize dispute types and time information"""
-        self.dispute_types = [
-            DisputeType("İş Hukuku Uyuşmazlıkları", [3, 4]),
-            DisputeType("Ticaret Hukuku Uyuşmazlıkları", [6, 8]),
-            DisputeType("Tüketici Hukuku Uyuşmazlıkları", [3, 4]),
-            DisputeType("Kira İlişkisinden Kaynaklanan Uyuşmazlıklar", [3, 4]),
-            DisputeType("Ortaklığın Giderilmesine İlişkin Uyuşmazlıklar", [3, 4]),
-            DisputeType("Kat Mülkiyeti Kanunundan Kaynaklanan Uyuşmazlıklar", [3, 4]),
-            DisputeType("Komşu Hukukundan Kaynaklanan Uyuşmazlıklar", [3, 4]),
-            DisputeType("Tarımsal Üretim Sözleşmesinden Kaynaklanan Uyuşmazlıklar", [2, 3, 4]),
-        ]
-        
-        # Automatically determine all unique week values across all dispute types
-        self.all_weeks = sorted(set(week for dispute in self.dispute_types for week in dispute.week_intervals))
+    def __init__(self, cache_size: Optional[int] = None, work_calendar=None,
+                 registry: Optional[DisputeRegistry] = None):
+        """Initialize dispute types and time information
+
+        Args:
+            cache_size: Enables an LRU cache of calculate_dates results with
+                this many start dates (disabled when None)
+            work_calendar: Optional workdays.WorkCalendar used to move deadlines
+                off weekends, holidays and the judicial recess
+            registry: Dispute types to use (defaults to the bundled
+                dispute_types.json)
+        """
+        self._set_registry(registry or DisputeRegistry.default())
+
+        self.work_calendar = work_calendar
+
+        self._cache = None
+        if cache_size:
+            self.enable_cache(cache_size)
 
     def calculate_dates(self, start_date: Optional[datetime] = None) -> Dict[int, datetime]:
         """Calculate target dates based on the given start date for all possible weeks
@@ -46,8 +47,9 @@ class MediationTimeCalculator:
         Returns:
             Dict[int, datetime]: Dictionary mapping week numbers to target dates
         """
-        # Use today's date if start_date is not provided
-        start_date = datetime.today() if start_date is None else start_date
+        # Use today's date at midnight if start_date is not provided, so repeated calls share a cache key
+        if start_date is None:
+            start_date = datetime.combine(datetime.today().date(), datetime.min.time())
 
         # Convert start_date from string to datetime if needed
         if isinstance(start_date, str):
@@ -56,11 +58,60 @@ class MediationTimeCalculator:
             except ValueError:
                 raise ValueError("Invalid date format. Expected format: DD.MM.YYYY")
 
-        # Calculate dates for all weeks
-        return {
+        if self._cache is None:
+            return self._calculate_dates(start_date)
+
+        # The week set and calendar are the cache version: changing them empties the cache
+        dates = self._cache.get_or_compute(
+            start_date, lambda: self._calculate_dates(start_date),
+            version=(tuple(self.all_weeks), self.work_calendar)
+        )
+        return dict(dates)  # Copy so callers cannot modify the cached entry
+
+    def _calculate_dates(self, start_date: datetime) -> Dict[int, datetime]:
+        """Calculate dates for all weeks from an already parsed start date"""
+        dates = {
             week: start_date + timedelta(weeks=week)
             for week in self.all_weeks if isinstance(week, int) and week > 0
         }
+        if self.work_calendar is not None:
+            dates = {week: self.work_calendar.adjust(target) for week, target in dates.items()}
+        return dates
+
+    def set_dispute_types(self, dispute_types: List[DisputeType]) -> None:
+        """Replace the dispute definitions and recompute the week list
+
+        Any cached dates are invalidated on the next calculation.
+
+        Args:
+            dispute_types: New list of dispute types
+        """
+        self._set_registry(DisputeRegistry(dispute_types))
+
+    def _set_registry(self, registry: DisputeRegistry) -> None:
+        self.registry = registry
+        self.dispute_types = registry.to_list()
+        self.all_weeks = list(registry.all_weeks)
+
+    def enable_cache(self, maxsize: int = 256) -> None:
+        """Turn on memoization of calculate_dates keyed on the start date
+
+        Args:
+            maxsize: Maximum number of start dates kept in the cache
+        """
+        self._cache = LRUCache(maxsize)
+
+    def disable_cache(self) -> None:
+        """Turn memoization off and drop the cached dates"""
+        self._cache = None
+
+    def cache_info(self) -> Optional[CacheInfo]:
+        """Return the cache counters
+
+        Returns:
+            Optional[CacheInfo]: Hit/miss counters, or None when caching is off
+        """
+        return None if self._cache is None else self._cache.info()
     
     def get_dispute_types(self) -> List[DisputeType]:
         """Return the list of dispute types
@@ -78,17 +129,18 @@ class MediationTimeCalculator:
         """
         return self.all_weeks
         
-    def should_calculate(self, dispute_name: str, week: int) -> bool:
+    def should_calculate(self, dispute_name: Union[str, int], week: int) -> bool:
         """Determine if a specific week should be calculated for a dispute type
         
         Args:
-            dispute_name: The name of the dispute type
+            dispute_name: The name or id of the dispute type
             week: The week number to check
             
         Returns:
             bool: True if the week should be calculated for this dispute, False otherwise
         """
-        for dispute in self.dispute_types:
-            if dispute.name == dispute_name and week in dispute.week_intervals:
-                return True
-        return False
\ No newline at end of file
+        return self.registry.should_calculate(dispute_name, week)
+
+
+# Timed only while metrics are enabled, see modules/core/common/metrics.py
+METRICS.instrument(MediationTimeCalculator, "calculate_dates", "deadlines.calculate_dates")
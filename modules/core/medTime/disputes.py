@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+MedTime Disputes - Data-driven dispute type registry
+----------------------------------------------------
+This module loads dispute types from a JSON data file and indexes them so that
+checking whether a week applies to a dispute is a single set lookup.
+
+The data file holds a list of {"id", "name", "weeks"} objects under the
+"dispute_types" key. IDs are stable integers that identify a dispute type in
+stored case lists even if its name or position changes.
+"""
+
+import json
+import os
+from dataclasses import dataclass
+from typing import Dict, FrozenSet, Iterable, Iterator, List, Optional, Tuple, Union
+
+DEFAULT_DISPUTES_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "dispute_types.json")
+
+_default_registry = None
+
+
+@dataclass
+class DisputeType:
+    """Data class for storing dispute types and their associated timeframes"""
+    name: str
+    week_intervals: List[int]  # These are the only weeks that should be calculated for this dispute type
+    id: Optional[int] = None  # Stable identifier used in data files and case lists
+
+
+class DisputeRegistry:
+    """Immutable, indexed collection of dispute types"""
+
+    def __init__(self, dispute_types: Iterable[DisputeType]):
+        """Index the dispute types
+
+        Args:
+            dispute_types: Dispute types; those without an id are numbered
+                after their position in the list, starting from 1
+
+        Raises:
+            ValueError: If two dispute types share an id or a name
+        """
+        self.dispute_types: Tuple[DisputeType, ...] = tuple(
+            dispute if dispute.id is not None
+            else DisputeType(dispute.name, list(dispute.week_intervals), position)
+            for position, dispute in enumerate(dispute_types, start=1)
+        )
+        self.ids: Tuple[int, ...] = tuple(dispute.id for dispute in self.dispute_types)
+        self.names: Tuple[str, ...] = tuple(dispute.name for dispute in self.dispute_types)
+        if len(set(self.ids)) != len(self.ids):
+            raise ValueError("Dispute type ids must be unique")
+        if len(set(self.names)) != len(self.names):
+            raise ValueError("Dispute type names must be unique")
+
+        self.all_weeks: Tuple[int, ...] = tuple(sorted(
+            set(week for dispute in self.dispute_types for week in dispute.week_intervals)
+        ))
+        self.week_index: Dict[int, int] = {week: column for column, week in enumerate(self.all_weeks)}
+
+        # Names and ids both map to the dispute and to its frozenset of weeks
+        self._disputes: Dict[Union[int, str], DisputeType] = {}
+        self._weeks: Dict[Union[int, str], FrozenSet[int]] = {}
+        for dispute in self.dispute_types:
+            weeks = frozenset(dispute.week_intervals)
+            for key in (dispute.id, dispute.name):
+                self._disputes[key] = dispute
+                self._weeks[key] = weeks
+
+        # Dense dispute x week mask, rows in registry order
+        self.mask: Tuple[Tuple[bool, ...], ...] = tuple(
+            tuple(week in self._weeks[dispute.id] for week in self.all_weeks)
+            for dispute in self.dispute_types
+        )
+
+    @classmethod
+    def load(cls, path: str = DEFAULT_DISPUTES_FILE) -> "DisputeRegistry":
+        """Load a registry from a JSON data file
+
+        Args:
+            path: Path of the data file
+
+        Returns:
+            DisputeRegistry: The loaded registry
+
+        Raises:
+            ValueError: If the file does not have the expected structure
+        """
+        with open(path, encoding="utf-8") as handle:
+            data = json.load(handle)
+        try:
+            entries = data["dispute_types"]
+            return cls(
+                DisputeType(entry["name"], [int(week) for week in entry["weeks"]], int(entry["id"]))
+                for entry in entries
+            )
+        except (KeyError, TypeError) as e:
+            raise ValueError(f"Invalid dispute type file {path}: {e}") from e
+
+    @classmethod
+    def default(cls) -> "DisputeRegistry":
+        """Return the registry of the bundled data file, loaded once"""
+        global _default_registry
+        if _default_registry is None:
+            _default_registry = cls.load()
+        return _default_registry
+
+    def __iter__(self) -> Iterator[DisputeType]:
+        return iter(self.dispute_types)
+
+    def __len__(self) -> int:
+        return len(self.dispute_types)
+
+    def weeks_for(self, dispute: Union[int, str]) -> FrozenSet[int]:
+        """Return the weeks of a dispute type given by id or name
+
+        Raises:
+            KeyError: If the dispute type is unknown
+        """
+        return self._weeks[dispute]
+
+    def get(self, dispute: Union[int, str]) -> Optional[DisputeType]:
+        """Return the dispute type with the given id or name, or None"""
+        return self._disputes.get(dispute)
+
+    def should_calculate(self, dispute: Union[int, str], week: int) -> bool:
+        """Return True if the week applies to the dispute type given by id or name"""
+        weeks = self._weeks.get(dispute)
+        return weeks is not None and week in weeks
+
+    def to_list(self) -> List[DisputeType]:
+        """Return the dispute types as a new list"""
+        return list(self.dispute_types)
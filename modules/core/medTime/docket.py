@@ -0,0 +1,303 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+MedTime Docket - Sorted index of upcoming deadlines across cases
+----------------------------------------------------------------
+This module keeps the deadlines of every open case in one index per week
+(3rd, 4th, 6th, 8th...), each a list sorted by deadline date. Adding, closing
+or re-dating a case only inserts or removes that case's entries with a binary
+search, so the index never has to be rebuilt.
+
+Range and "next N" queries bisect to the first matching entry of each
+requested week and merge the weeks lazily, so they cost a logarithmic search
+plus the rows they return, however many cases the docket holds.
+
+    python -m modules.core.medTime.docket cases.csv --from 02.06.2025 --to 06.06.2025 -w 3 -w 4
+    python -m modules.core.medTime.docket cases.csv --next 20
+"""
+
+import argparse
+import heapq
+import sys
+from bisect import bisect_left, insort
+from datetime import date, datetime
+from itertools import islice
+from typing import Any, Dict, Iterable, Iterator, List, NamedTuple, Optional, Tuple, Union
+
+from .calculator import MediationTimeCalculator
+
+DATE_FORMAT = "%d.%m.%Y"
+
+DateLike = Union[date, datetime, str]
+
+
+class Case(NamedTuple):
+    """An open case and its deadlines by week"""
+    case_id: Any
+    start_date: date
+    dispute_id: int
+    deadlines: Dict[int, date]
+
+
+class DocketEntry(NamedTuple):
+    """One deadline of one case"""
+    deadline: date
+    week: int
+    case_id: Any
+    dispute_id: int
+    start_date: date
+
+
+def _to_date(value: DateLike) -> date:
+    if isinstance(value, datetime):
+        return value.date()
+    if isinstance(value, date):
+        return value
+    try:
+        return datetime.strptime(value.strip(), DATE_FORMAT).date()
+    except (AttributeError, ValueError):
+        raise ValueError(f"Invalid date {value!r}. Expected format: DD.MM.YYYY")
+
+
+class Docket:
+    """Open cases with their deadlines indexed by week and date"""
+
+    def __init__(self, calculator: Optional[MediationTimeCalculator] = None):
+        """Create an empty docket
+
+        Args:
+            calculator: Calculator whose dispute types and work calendar give
+                the deadlines (a default one if None)
+        """
+        self.calculator = calculator or MediationTimeCalculator()
+        self._cases: Dict[Any, Case] = {}
+        self._serials: Dict[Any, int] = {}
+        self._by_serial: Dict[int, Case] = {}
+        self._next_serial = 0
+        # Week -> sorted [(deadline ordinal, case serial)]; serials keep case ids of any type out of comparisons
+        self._index: Dict[int, List[Tuple[int, int]]] = {}
+
+    def __len__(self) -> int:
+        return len(self._cases)
+
+    def __contains__(self, case_id: Any) -> bool:
+        return case_id in self._cases
+
+    def __iter__(self) -> Iterator[Case]:
+        return iter(self._cases.values())
+
+    @property
+    def weeks(self) -> Tuple[int, ...]:
+        """Weeks that currently have deadlines in the index"""
+        return tuple(sorted(week for week, keys in self._index.items() if keys))
+
+    def get(self, case_id: Any) -> Optional[Case]:
+        return self._cases.get(case_id)
+
+    def _case(self, case_id: Any, start_date: DateLike, dispute: Union[int, str],
+              memo: Optional[Dict[date, Dict[int, datetime]]] = None) -> Case:
+        """Compute a case's deadlines for the weeks of its dispute type
+
+        memo maps start dates to their calculated dates, shared by the cases of one batch.
+        """
+        registry = self.calculator.registry
+        dispute_type = registry.get(dispute)
+        if dispute_type is None and isinstance(dispute, str) and dispute.strip().isdigit():
+            dispute_type = registry.get(int(dispute))
+        if dispute_type is None:
+            raise ValueError(f"Unknown dispute type: {dispute}")
+        start = _to_date(start_date)
+        dates = None if memo is None else memo.get(start)
+        if dates is None:
+            dates = self.calculator.calculate_dates(datetime.combine(start, datetime.min.time()))
+            if memo is not None:
+                memo[start] = dates
+        weeks = registry.weeks_for(dispute_type.id)
+        deadlines = {week: target.date() for week, target in sorted(dates.items()) if week in weeks}
+        return Case(case_id, start, dispute_type.id, deadlines)
+
+    def _store(self, case: Case) -> int:
+        serial = self._next_serial
+        self._next_serial += 1
+        self._cases[case.case_id] = case
+        self._serials[case.case_id] = serial
+        self._by_serial[serial] = case
+        return serial
+
+    def _insert(self, case: Case, serial: int) -> None:
+        for week, deadline in case.deadlines.items():
+            insort(self._index.setdefault(week, []), (deadline.toordinal(), serial))
+
+    def add(self, case_id: Any, start_date: DateLike, dispute: Union[int, str]) -> Case:
+        """Add a case and index its deadlines
+
+        Args:
+            case_id: Unique, hashable case identifier
+            start_date: Start date (date, datetime or DD.MM.YYYY)
+            dispute: Dispute type id or name
+
+        Returns:
+            Case: The case with its computed deadlines
+
+        Raises:
+            ValueError: If the case is already on the docket, or the date or
+                dispute type is invalid
+        """
+        if case_id in self._cases:
+            raise ValueError(f"Case {case_id} is already on the docket")
+        case = self._case(case_id, start_date, dispute)
+        self._insert(case, self._store(case))
+        return case
+
+    def add_many(self, cases: Iterable[Tuple[Any, DateLike, Union[int, str]]]) -> int:
+        """Add many (case id, start date, dispute) cases, sorting each week's index once
+
+        Returns:
+            int: Number of cases added
+
+        Raises:
+            ValueError: As add; cases before the failing one stay on the docket
+        """
+        added: Dict[int, List[Tuple[int, int]]] = {}
+        memo: Dict[date, Dict[int, datetime]] = {}
+        count = 0
+        try:
+            for case_id, start_date, dispute in cases:
+                if case_id in self._cases:
+                    raise ValueError(f"Case {case_id} is already on the docket")
+                case = self._case(case_id, start_date, dispute, memo)
+                serial = self._store(case)
+                for week, deadline in case.deadlines.items():
+                    added.setdefault(week, []).append((deadline.toordinal(), serial))
+                count += 1
+        finally:
+            for week, keys in added.items():
+                index = self._index.setdefault(week, [])
+                index.extend(keys)
+                index.sort()
+        return count
+
+    def close(self, case_id: Any) -> Case:
+        """Remove a case and its deadlines
+
+        Raises:
+            KeyError: If the case is not on the docket
+        """
+        case = self._cases.pop(case_id)
+        serial = self._serials.pop(case_id)
+        del self._by_serial[serial]
+        for week, deadline in case.deadlines.items():
+            index = self._index[week]
+            del index[bisect_left(index, (deadline.toordinal(), serial))]
+        return case
+
+    def redate(self, case_id: Any, start_date: DateLike, dispute: Union[int, str, None] = None) -> Case:
+        """Move a case to a new start date (and optionally dispute type)
+
+        Raises:
+            KeyError: If the case is not on the docket
+            ValueError: If the date or dispute type is invalid; the case is then unchanged
+        """
+        old = self._cases[case_id]
+        case = self._case(case_id, start_date, old.dispute_id if dispute is None else dispute)
+        self.close(case_id)
+        self._insert(case, self._store(case))
+        return case
+
+    @staticmethod
+    def _entries_from(index: List[Tuple[int, int]], position: int, week: int) -> Iterator[Tuple[int, int, int]]:
+        # Indexed access, so skipping the entries before position costs nothing
+        for offset in range(position, len(index)):
+            ordinal, serial = index[offset]
+            yield ordinal, week, serial
+
+    def _scan(self, start: date, weeks: Optional[Iterable[int]]) -> Iterator[DocketEntry]:
+        """Yield entries of the given weeks from start on, in (date, week) order"""
+        weeks = sorted(self._index if weeks is None else set(weeks))
+        first = start.toordinal()
+        streams = []
+        for week in weeks:
+            index = self._index.get(week)
+            if index:
+                streams.append(self._entries_from(index, bisect_left(index, (first, -1)), week))
+        for ordinal, week, serial in heapq.merge(*streams):
+            case = self._by_serial[serial]
+            yield DocketEntry(date.fromordinal(ordinal), week, case.case_id, case.dispute_id, case.start_date)
+
+    def between(self, date_from: DateLike, date_to: DateLike,
+                weeks: Optional[Iterable[int]] = None) -> List[DocketEntry]:
+        """Return the deadlines from date_from to date_to, both inclusive
+
+        Args:
+            date_from: First deadline date
+            date_to: Last deadline date
+            weeks: Only these weeks (all by default)
+
+        Returns:
+            List[DocketEntry]: Entries ordered by deadline, then week
+        """
+        last = _to_date(date_to)
+        result = []
+        for entry in self._scan(_to_date(date_from), weeks):
+            if entry.deadline > last:
+                break
+            result.append(entry)
+        return result
+
+    def upcoming(self, count: int, after: Optional[DateLike] = None,
+                 weeks: Optional[Iterable[int]] = None) -> List[DocketEntry]:
+        """Return the next count deadlines on or after a date (today by default)
+
+        Args:
+            count: Number of entries to return at most
+            after: First deadline date considered
+            weeks: Only these weeks (all by default)
+        """
+        start = date.today() if after is None else _to_date(after)
+        return list(islice(self._scan(start, weeks), count))
+
+
+def _print_entries(entries: List[DocketEntry], docket: Docket) -> None:
+    registry = docket.calculator.registry
+    for entry in entries:
+        dispute = registry.get(entry.dispute_id)
+        print(f"{entry.deadline.strftime(DATE_FORMAT)}  {entry.week:>2}. week  {entry.case_id}  "
+              f"{dispute.name if dispute else entry.dispute_id}  (start {entry.start_date.strftime(DATE_FORMAT)})")
+
+
+def main(argv=None) -> int:
+    """Command line entry point; returns the process exit code"""
+    parser = argparse.ArgumentParser(description="Query upcoming mediation deadlines of a CSV case list.")
+    parser.add_argument("input", nargs="?", default="-", help="Input CSV with case_id, start_date, dispute (default: stdin)")
+    parser.add_argument("--from", dest="date_from", help="First deadline date (DD.MM.YYYY, default: today)")
+    parser.add_argument("--to", dest="date_to", help="Last deadline date (DD.MM.YYYY)")
+    parser.add_argument("-n", "--next", type=int, default=20, help="Number of deadlines without --to (default: 20)")
+    parser.add_argument("-w", "--week", type=int, action="append", help="Only this week (repeatable)")
+    args = parser.parse_args(argv)
+
+    from .ics import read_cases
+
+    docket = Docket()
+    source = None
+    try:
+        source = sys.stdin if args.input == "-" else open(args.input, newline="", encoding="utf-8")
+        docket.add_many(read_cases(source))
+        date_from = _to_date(args.date_from) if args.date_from else date.today()
+        if args.date_to:
+            entries = docket.between(date_from, args.date_to, args.week)
+        else:
+            entries = docket.upcoming(args.next, date_from, args.week)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if source not in (None, sys.stdin):
+            source.close()
+
+    _print_entries(entries, docket)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
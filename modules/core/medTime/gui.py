@@ -9,13 +9,7 @@ This module provides the graphical user interface for mediation timeline calcula
 
 from kivy.app import App
 from kivy.uix.boxlayout import BoxLayout
-from kivy.uix.gridlayout import GridLayout
-from kivy.uix.scrollview import ScrollView
-from kivy.uix.label import Label
-from kivy.uix.button import Button
-from kivy.uix.textinput import TextInput
 from kivy.core.window import Window
-from kivy.metrics import dp
 from kivy.clock import Clock
 from kivy.lang import Builder
 
@@ -23,32 +17,44 @@ from datetime import datetime
 from pathlib import Path  # Import pathlib for modern path handling
 from typing import Optional, Dict
 
+from modules.core.common.metrics import METRICS
+from modules.core.common.startup import PROFILER
 from .calculator import MediationTimeCalculator
+from .table import DeadlineTable  # Registers the widget for the KV file
 
-# Import necessary classes for drawing
-from kivy.graphics import Color, Rectangle, Line
+# Cell colors for calculated dates, non-applicable weeks and errors
+DATE_COLOR = (0, 0.5, 0, 1)  # Dark green
+EMPTY_COLOR = (0.5, 0.5, 0.5, 1)  # Gray
+ERROR_COLOR = (0.8, 0, 0, 1)  # Red
 
+# Seconds of typing inactivity before the table is recalculated
+LIVE_CALCULATION_DELAY = 0.15
 
-def add_border_to_widget(widget, color=(1, 1, 1, 1), line_width=1.5):
-    """Add a white border to any widget"""
-    # Function to ensure border is redrawn when widget changes
-    def update_border(*args):
-        widget.canvas.after.clear()
-        with widget.canvas.after:
-            Color(*color)
-            Line(rectangle=(widget.x, widget.y, widget.width, widget.height), width=line_width)
 
-    widget.bind(pos=update_border, size=update_border)
-    update_border()
-    return widget
+def is_complete_date(date_str: str) -> bool:
+    """Check whether typed input is a whole date worth calculating live
+
+    Args:
+        date_str: Stripped text of the date input
+
+    Returns:
+        bool: True for 10 characters ending in a 4-digit year (DD.MM.YYYY)
+        or exactly 8 digits (DDMMYYYY)
+    """
+    if date_str.isdigit():
+        return len(date_str) == 8
+    year = date_str.rpartition(".")[2]
+    return len(date_str) == 10 and len(year) == 4 and year.isdigit()
 
 
 # Load the KV file at module level using pathlib
 try:
     kv_path = Path(__file__).parent / 'mediationtime.kv'
-    Builder.load_file(str(kv_path))  # Convert Path to string for Kivy compatibility
+    with METRICS.timer("gui.medtime.kv_load"):
+        Builder.load_file(str(kv_path))  # Convert Path to string for Kivy compatibility
 except Exception as e:
     print(f"Error loading KV file: {e}")
+PROFILER.mark("kv_load")
 
 
 class MediationTimeGUI(BoxLayout):
@@ -56,132 +62,102 @@ class MediationTimeGUI(BoxLayout):
     
     def __init__(self, **kwargs):
         """Initialize GUI components"""
-        # Initialize parent class first using the old-style call which is more reliable
-        BoxLayout.__init__(self, **kwargs)
-        
         # Initialize calculator
         self.calculator = MediationTimeCalculator()
         
         # Initialize other attributes
-        self.table_layout = None
+        self.deadline_table = None
         self.data_cells = {}
         self.target_dates = None
         self.table_initialized = False
-        
-        # Setup table with a delay to ensure widgets are ready
-        Clock.schedule_once(self._setup_table, 0.1)
-        
-        # Set the date entry to today's date immediately
-        Clock.schedule_once(self._set_today_date, 0.1)
-        
-        # Perform an initial calculation on startup
-        Clock.schedule_once(self.calculate, 0.3)
+
+        # Last (text, color) written to each cell, so refreshes only touch changed cells
+        self._cell_state = {}
+        self._last_start_date = None
+        # Start date last saved to the history, so repeated presses save it once
+        self._last_recorded = None
+
+        # Bursts of keystrokes collapse into one calculation after typing pauses
+        self._live_trigger = Clock.create_trigger(self._live_calculate, LIVE_CALCULATION_DELAY)
+
+        # The KV rule is applied here, so the ids exist once this returns
+        BoxLayout.__init__(self, **kwargs)
+
+        # Build the table and show today's dates before the first frame is drawn
+        self._setup_table(0)
+        self._set_today_date(0)
+        self.calculate()
         
     def _setup_table(self, dt):
-        """Setup the table layout after the widget tree is constructed"""
-        self.table_layout = self.ids.table_layout
+        """Setup the table after the widget tree is constructed"""
+        self.deadline_table = self.ids.deadline_table
 
-        # Ensure the table layout is only created once
+        # Ensure the table is only created once
         if self.table_initialized:
             return
 
-        self.table_layout.clear_widgets()
-        self.table_layout.cols = len(self.calculator.get_all_weeks()) + 1  
-
-        # Add table headers
-        header_dispute = Label(
-            text="Dispute Subject", 
-            size_hint_x=None, width=dp(400),  
-            size_hint_y=None, height=dp(40),
-            bold=True, halign='left',
-            valign='middle',
-            text_size=(dp(390), dp(40)),  
-            color=[0, 0, 0.6, 1]
-        )
-        add_border_to_widget(header_dispute)
-        self.table_layout.add_widget(header_dispute)
-
-        # Add week headers
-        self.week_headers = []
-        for week in self.calculator.get_all_weeks():
-            header_week = Label(
-                text=f"{week}. Hafta", 
-                size_hint_x=None, width=dp(100),
-                size_hint_y=None, height=dp(40),
-                bold=True,
-                color=[0, 0, 0.6, 1]
-            )
-            add_border_to_widget(header_week)
-            self.table_layout.add_widget(header_week)
-            self.week_headers.append(header_week)
-
-        # Store cell references for direct updates
+        weeks = self.calculator.get_all_weeks()
+        header = ["Dispute Subject"] + [f"{week}. Hafta" for week in weeks]
+
+        # Map each (dispute_name, week) cell to its (row, column) in the table
         self.data_cells = {}
+        rows = []
+        for row, dispute in enumerate(self.calculator.get_dispute_types()):
+            for column, week in enumerate(weeks):
+                self.data_cells[(dispute.name, week)] = (row, column)
+                self._cell_state[(dispute.name, week)] = ("-", EMPTY_COLOR)
+            rows.append((dispute.name, [("-", EMPTY_COLOR)] * len(weeks)))
+        self.deadline_table.set_table(header, rows)
 
-        for dispute in self.calculator.get_dispute_types():
-            dispute_label = Label(
-                text=dispute.name, 
-                size_hint_x=None, width=dp(400),
-                size_hint_y=None, height=dp(40),
-                halign='left',
-                valign='middle',
-                text_size=(dp(390), dp(40)),
-                padding_x=dp(10),
-                color=[0, 0, 0.6, 1]
-            )
-            add_border_to_widget(dispute_label)
-            self.table_layout.add_widget(dispute_label)
-
-            for week in self.calculator.get_all_weeks():
-                cell_label = Label(
-                    text="-",
-                    size_hint_x=None, width=dp(100),
-                    size_hint_y=None, height=dp(40),
-                    halign='center',
-                    valign='middle',
-                    color=[0.5, 0.5, 0.5, 1]
-                )
-                add_border_to_widget(cell_label)
-                self.table_layout.add_widget(cell_label)
-
-                # Store cell reference using (dispute_name, week) as key
-                self.data_cells[(dispute.name, week)] = cell_label
-
-        # Ensure dates update properly
         self.table_initialized = True
-        Clock.schedule_once(lambda dt: self.update_table_dates(), 0.3)
+        self.update_table_dates()
+
+    def _apply_cells(self, values: Dict) -> None:
+        """Write (text, color) values to the cells whose value actually changed
+
+        The visible rows are refreshed once per batch of changes, and
+        unchanged labels keep their textures.
+        """
+        changed = False
+        for key, value in values.items():
+            if self._cell_state.get(key) != value:
+                row, column = self.data_cells[key]
+                self.deadline_table.set_cell(row, column, value[0], value[1])
+                self._cell_state[key] = value
+                changed = True
+        if changed:
+            self.deadline_table.refresh_cells()
 
     def update_table_dates(self, dt=None):
         """Update only date values in existing table cells, clearing previous error messages."""
         if not self.target_dates:
             return
-        
-        for (dispute_name, week), cell_label in self.data_cells.items():
+
+        # Format each week's date once instead of once per cell
+        date_texts = {week: target.strftime("%d.%m.%Y") for week, target in self.target_dates.items()}
+        values = {}
+        for (dispute_name, week) in self.data_cells:
             # Check if this cell should show a calculation based on dispute type and week
-            should_calculate = self.calculator.should_calculate(dispute_name, week)
-            
-            if should_calculate and week in self.target_dates:
-                # This is a cell that should be calculated
-                cell_label.text = self.target_dates[week].strftime("%d.%m.%Y")
-                cell_label.color = [0, 0.5, 0, 1]  # Dark green text color
+            if week in date_texts and self.calculator.should_calculate(dispute_name, week):
+                values[(dispute_name, week)] = (date_texts[week], DATE_COLOR)
             else:
-                # This is a cell that should not be calculated
-                cell_label.text = "-"  # Show dash for non-calculated cells
-                cell_label.color = [0.5, 0.5, 0.5, 1]  # Gray color (non-calculated)
+                # Show dash for non-calculated cells
+                values[(dispute_name, week)] = ("-", EMPTY_COLOR)
+        self._apply_cells(values)
 
     def update_error_message(self, error_msg="Invalid date"):
         """Update table cells with error message"""
         if not self.data_cells:
             return
-            
-        for (dispute_name, week), cell_label in self.data_cells.items():
-            # Only show error in cells that should be calculated
-            if self.calculator.should_calculate(dispute_name, week):
-                cell_label.text = error_msg
-                cell_label.color = [0.8, 0, 0, 1]  # Red text color for errors
-            else:
-                cell_label.text = "-"  # Non-calculated cells still show dash
-                cell_label.color = [0.5, 0.5, 0.5, 1]  # Gray color
+
+        # Forget the last date so the next valid input refreshes the table again
+        self._last_start_date = None
+        self._apply_cells({
+            # Only show error in cells that should be calculated; others keep a dash
+            (dispute_name, week): (error_msg, ERROR_COLOR)
+            if self.calculator.should_calculate(dispute_name, week) else ("-", EMPTY_COLOR)
+            for (dispute_name, week) in self.data_cells
+        })
 
     def _set_today_date(self, dt):
         """Set today's date in the date entry field"""
@@ -204,8 +180,13 @@ class MediationTimeGUI(BoxLayout):
         
         return date_str
     
-    def calculate(self, instance=None):
-        """Calculate mediation dates and update the table dynamically"""
+    def calculate(self, instance=None, record=False):
+        """Calculate mediation dates and update the table dynamically
+
+        Args:
+            record: Save the calculated deadlines to the history store (explicit
+                calculations from the button or Enter key)
+        """
         try:
             date_str = self.ids.date_entry.text.strip()
 
@@ -218,12 +199,9 @@ class MediationTimeGUI(BoxLayout):
 
             # Parse input date
             start_date = datetime.strptime(formatted_date, "%d.%m.%Y")
-
-            # Calculate dates and store in `self.target_dates`
-            self.target_dates = self.calculator.calculate_dates(start_date)
-
-            # Only update date values instead of recreating the entire table
-            self.update_table_dates()
+            self._show_dates(start_date)
+            if record:
+                self.record(start_date)
 
         except ValueError as e:
             print(f"Date conversion error: {e}")
@@ -235,6 +213,58 @@ class MediationTimeGUI(BoxLayout):
             # Show general error message in existing cells
             self.update_error_message(f"Error: {str(e)[:10]}")
 
+    def _show_dates(self, start_date: datetime) -> None:
+        """Calculate and display the dates unless they are already shown"""
+        if start_date == self._last_start_date:
+            return
+        # Calculate dates and store in `self.target_dates`
+        self.target_dates = self.calculator.calculate_dates(start_date)
+        self._last_start_date = start_date
+
+        # Only update date values instead of recreating the entire table
+        self.update_table_dates()
+
+    def record(self, start_date: datetime) -> None:
+        """Save the shown deadlines of every dispute type to the history store"""
+        if start_date == self._last_recorded:
+            return
+        from modules.core.common.history_view import app_history_store
+        store = app_history_store()
+        store.add_deadlines(start_date, self.target_dates, self.calculator.registry)
+        store.flush()
+        self._last_recorded = start_date
+
+    def show_history(self):
+        """Open the recorded deadlines, latest deadline first, loading pages while scrolling"""
+        from modules.core.common.history_view import app_history_store, deadline_text, open_history
+        store = app_history_store()
+        open_history("Süre Geçmişi",
+                     lambda after, limit: store.deadlines(descending=True, after=after, limit=limit),
+                     deadline_text)
+
+    def schedule_calculate(self, *args):
+        """Recalculate shortly after the user stops typing (bound to the date input)"""
+        self._live_trigger()
+
+    def _live_calculate(self, dt):
+        """Recalculate from the date input without rewriting it while the user types"""
+        if not self.table_initialized:
+            return
+        date_str = self.ids.date_entry.text.strip()
+        if not is_complete_date(date_str):
+            return  # Still typing: "01.03.2" would otherwise parse as the year 2
+        try:
+            start_date = datetime.strptime(self.format_date_input(date_str), "%d.%m.%Y")
+        except ValueError:
+            return  # Incomplete input; errors are shown when the user presses Enter
+        self._show_dates(start_date)
+
+
+# Timed only while metrics are enabled, see modules/core/common/metrics.py
+METRICS.instrument(MediationTimeGUI, "_setup_table", "gui.medtime.setup_table", gui=True)
+METRICS.instrument(MediationTimeGUI, "update_table_dates", "gui.medtime.update_table_dates", gui=True)
+METRICS.instrument(MediationTimeGUI, "calculate", "gui.medtime.calculate", gui=True)
+
 
 class MediationTimeApp(App):
     """Standalone application class for the Mediation Time Calculator"""
@@ -243,7 +273,11 @@ class MediationTimeApp(App):
         """Build the application"""
         Window.size = (1200, 600)
         Window.clearcolor = (0, 0, 0, 0)  # Completely transparent background
-        return MediationTimeGUI()
+        gui = MediationTimeGUI()
+        PROFILER.mark("build")
+        PROFILER.watch_first_paint(self)
+        METRICS.watch_frames()
+        return gui
 
 
 # Standalone execution
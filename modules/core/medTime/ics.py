@@ -0,0 +1,292 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+MedTime ICS - Streaming calendar export of mediation deadlines
+--------------------------------------------------------------
+This module turns case records (case id, start date, dispute type) into
+RFC 5545 all-day events, one per week that applies to the case's dispute type.
+
+Cases are processed in chunks through the bulk deadline API and events are
+written as soon as a chunk is done, so memory does not grow with the number of
+cases. Every event has a UID derived from the case id, dispute id and week, so
+the same deadline keeps its UID across exports. When a state file from the
+previous export is given, only new or changed events are written, and events
+that disappeared are written once more as cancelled.
+
+    python -m modules.core.medTime.ics cases.csv -o deadlines.ics --state deadlines.state
+"""
+
+import argparse
+import csv
+import hashlib
+import os
+import re
+import sys
+from dataclasses import dataclass
+from datetime import datetime, timezone
+from itertools import islice
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+import numpy as np
+
+from .batch import DEFAULT_CHUNK_SIZE, calculate_case_deadlines, dispute_codes
+from .calculator import MediationTimeCalculator
+
+PRODUCT_ID = "-//ozcotech//Mediation Calculator//TR"
+UID_DOMAIN = "mediationcalculator"
+
+# Control characters would break the content line or the tab separated state file
+_CONTROL_RE = re.compile(r"[\x00-\x1f\x7f]")
+
+# Previous export state: UID -> (content digest, sequence number, YYYYMMDD date)
+State = Dict[str, Tuple[str, int, str]]
+
+
+@dataclass
+class ExportStats:
+    """Counters reported at the end of an export"""
+    cases: int = 0
+    written: int = 0
+    unchanged: int = 0
+    cancelled: int = 0
+
+    def summary(self) -> str:
+        return (
+            f"{self.cases} cases, {self.written} events written, "
+            f"{self.unchanged} unchanged, {self.cancelled} cancelled"
+        )
+
+
+def escape_text(value: str) -> str:
+    """Escape a TEXT property value (RFC 5545 section 3.3.11)"""
+    return (value.replace("\\", "\\\\").replace(";", "\\;")
+            .replace(",", "\\,").replace("\r\n", "\\n").replace("\n", "\\n"))
+
+
+def fold_line(line: str) -> str:
+    """Fold a content line into CRLF terminated lines of at most 75 octets"""
+    encoded = line.encode("utf-8")
+    if len(encoded) <= 75:
+        return line + "\r\n"
+    parts = []
+    limit = 75
+    while encoded:
+        # Never split inside a multi-byte UTF-8 sequence
+        cut = min(limit, len(encoded))
+        while cut < len(encoded) and (encoded[cut] & 0xC0) == 0x80:
+            cut -= 1
+        parts.append(encoded[:cut].decode("utf-8"))
+        encoded = encoded[cut:]
+        limit = 74  # Continuation lines start with a space
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def event_uid(case_id: str, dispute_id: int, week: int) -> str:
+    """Return the stable UID of a deadline event
+
+    Raises:
+        ValueError: If the case id contains a line break or another control character
+    """
+    if _CONTROL_RE.search(case_id):
+        raise ValueError(f"Case id {case_id!r} contains a control character")
+    return f"{escape_text(case_id)}-{dispute_id}-w{week}@{UID_DOMAIN}"
+
+
+def read_cases(stream) -> Iterator[Tuple[str, str, str]]:
+    """Yield (case id, start date, dispute) from a CSV case list
+
+    The CSV needs a header with case_id, start_date and dispute columns.
+
+    Raises:
+        ValueError: If a column is missing
+    """
+    reader = csv.reader(stream)
+    header = [column.strip().lower() for column in next(reader, [])]
+    try:
+        columns = [header.index(name) for name in ("case_id", "start_date", "dispute")]
+    except ValueError:
+        raise ValueError("Expected a header with case_id, start_date and dispute columns")
+    for line_number, row in enumerate(reader, start=2):
+        if not row:
+            continue
+        if len(row) <= max(columns):
+            raise ValueError(f"Row {line_number}: expected case_id, start_date and dispute columns")
+        yield tuple(row[column].strip() for column in columns)
+
+
+def load_state(path: str) -> State:
+    """Load the state written by a previous export (empty if the file is missing)"""
+    state: State = {}
+    if not os.path.exists(path):
+        return state
+    with open(path, encoding="utf-8") as handle:
+        for line in handle:
+            uid, digest, sequence, day = line.rstrip("\n").split("\t")
+            state[uid] = (digest, int(sequence), day)
+    return state
+
+
+def save_state(path: str, state: State) -> None:
+    """Write the export state, replacing the file atomically"""
+    temporary = path + ".tmp"
+    with open(temporary, "w", encoding="utf-8") as handle:
+        handle.writelines(
+            f"{uid}\t{digest}\t{sequence}\t{day}\n" for uid, (digest, sequence, day) in state.items()
+        )
+    os.replace(temporary, path)
+
+
+class IcsWriter:
+    """Writes a VCALENDAR with one all-day VEVENT per deadline"""
+
+    def __init__(self, stream, calendar_name: str = "Arabuluculuk Süreleri"):
+        self.stream = stream
+        self.stamp = datetime.now(timezone.utc).strftime("%Y%m%dT%H%M%SZ")
+        self.stream.write("".join(fold_line(line) for line in (
+            "BEGIN:VCALENDAR",
+            "VERSION:2.0",
+            f"PRODID:{PRODUCT_ID}",
+            "CALSCALE:GREGORIAN",
+            f"X-WR-CALNAME:{escape_text(calendar_name)}",
+        )))
+
+    def event(self, uid: str, day: str, summary: str, sequence: int = 0, cancelled: bool = False) -> str:
+        """Return the text of one event
+
+        Args:
+            uid: Stable event UID
+            day: Date as YYYYMMDD
+            summary: Event title
+            sequence: Revision number, increased on every change
+            cancelled: Mark the event as cancelled
+        """
+        lines = [
+            "BEGIN:VEVENT",
+            f"UID:{uid}",
+            f"DTSTAMP:{self.stamp}",
+            f"DTSTART;VALUE=DATE:{day}",
+            f"SUMMARY:{escape_text(summary)}",
+            f"SEQUENCE:{sequence}",
+            "TRANSP:TRANSPARENT",
+        ]
+        if cancelled:
+            lines.append("STATUS:CANCELLED")
+        lines.append("END:VEVENT")
+        return "".join(fold_line(line) for line in lines)
+
+    def write(self, events: Iterable[str]) -> None:
+        self.stream.write("".join(events))
+
+    def close(self) -> None:
+        self.stream.write(fold_line("END:VCALENDAR"))
+        self.stream.flush()
+
+
+def export_ics(cases: Iterable[Tuple[str, str, str]], sink,
+               calculator: Optional[MediationTimeCalculator] = None,
+               previous: Optional[State] = None,
+               chunk_size: int = DEFAULT_CHUNK_SIZE) -> Tuple[ExportStats, State]:
+    """Stream deadline events for case records into an .ics file
+
+    Args:
+        cases: Iterable of (case id, start date, dispute id or name) tuples;
+            start dates in DD.MM.YYYY form
+        sink: Text stream receiving the calendar
+        calculator: Calculator whose dispute registry and calendar are used
+        previous: State of the previous export (empty for the first one);
+            when given, unchanged events are skipped, vanished events are
+            written as cancelled and the new state is collected
+        chunk_size: Number of cases calculated and written at once
+
+    Returns:
+        Tuple[ExportStats, State]: Counters and the state to store for the next
+        export; the state is empty when no previous state was given
+
+    Raises:
+        ValueError: On a malformed date, unknown dispute type or invalid case id
+    """
+    calculator = calculator or MediationTimeCalculator()
+    registry = calculator.registry
+    # Without a previous state nothing is compared, so no state is kept per event
+    track_state = previous is not None
+    previous = previous or {}
+    state: State = {}
+    stats = ExportStats()
+    writer = IcsWriter(sink)
+
+    cases = iter(cases)
+    while True:
+        chunk = list(islice(cases, chunk_size))
+        if not chunk:
+            break
+        case_ids, starts, disputes = zip(*chunk)
+        codes = dispute_codes(disputes, calculator)
+        deadlines = calculate_case_deadlines(list(starts), codes, calculator)
+        days = {week: np.datetime_as_string(column) for week, column in deadlines.items()}
+
+        events = []
+        for row, (case_id, code) in enumerate(zip(case_ids, codes.tolist())):
+            name = registry.get(code).name
+            for week in sorted(registry.weeks_for(code)):
+                day = days[week][row].replace("-", "")
+                uid = event_uid(case_id, code, week)
+                summary = f"{case_id} - {name} - {week}. hafta son günü"
+                digest = hashlib.blake2b(f"{day}|{summary}".encode("utf-8"), digest_size=8).hexdigest()
+                old = previous.get(uid)
+                if old is not None and old[0] == digest:
+                    state[uid] = old
+                    stats.unchanged += 1
+                    continue
+                sequence = 0 if old is None else old[1] + 1
+                if track_state:
+                    state[uid] = (digest, sequence, day)
+                events.append(writer.event(uid, day, summary, sequence))
+        writer.write(events)
+        stats.cases += len(chunk)
+        stats.written += len(events)
+
+    # Deadlines that no longer exist are cancelled once and then forgotten
+    cancelled = [uid for uid in previous if uid not in state]
+    for start in range(0, len(cancelled), chunk_size):
+        writer.write(
+            writer.event(uid, previous[uid][2], "İptal edildi", previous[uid][1] + 1, cancelled=True)
+            for uid in cancelled[start:start + chunk_size]
+        )
+    stats.cancelled = len(cancelled)
+    writer.close()
+    return stats, state
+
+
+def main(argv=None) -> int:
+    """Command line entry point; returns the process exit code"""
+    parser = argparse.ArgumentParser(description="Export mediation deadlines of a CSV case list as iCalendar.")
+    parser.add_argument("input", nargs="?", default="-", help="Input CSV (default: stdin)")
+    parser.add_argument("-o", "--output", default="-", help="Output .ics file (default: stdout)")
+    parser.add_argument("--state", help="State file for change-only exports")
+    parser.add_argument("--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE)
+    args = parser.parse_args(argv)
+
+    source = sink = None
+    try:
+        previous = load_state(args.state) if args.state else None
+        source = sys.stdin if args.input == "-" else open(args.input, newline="", encoding="utf-8")
+        sink = sys.stdout if args.output == "-" else open(args.output, "w", newline="", encoding="utf-8")
+        stats, state = export_ics(read_cases(source), sink, previous=previous, chunk_size=args.chunk_size)
+        if args.state:
+            save_state(args.state, state)
+    except (OSError, ValueError) as e:
+        print(f"Error: {e}", file=sys.stderr)
+        return 1
+    finally:
+        if source not in (None, sys.stdin):
+            source.close()
+        if sink not in (None, sys.stdout):
+            sink.close()
+
+    print(stats.summary(), file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
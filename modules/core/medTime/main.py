@@ -7,11 +7,17 @@ MedTime - Kivy Application Main File
 This file is used to launch the Kivy application.
 """
 
+# Imported first so startup timings cover the Kivy imports (see common/startup.py)
+from modules.core.common.startup import PROFILER
+from modules.core.common.metrics import METRICS
+
 from kivy.app import App
 from kivy.core.window import Window
 from kivy.config import Config
 import sys
 
+PROFILER.mark("kivy_import")
+
 # UI scaling and window settings
 Config.set('graphics', 'width', '1200')
 Config.set('graphics', 'height', '600')
@@ -29,13 +35,18 @@ except ImportError as e:
     print("Make sure you are running the script from the correct directory.")
     print("Try running: `python3 -m modules.core.medTime.main`\n")
     sys.exit(1)  # Terminate the program safely
+PROFILER.mark("import")
 
 class MediationTimeApp(App):
     """Standalone application class for Mediation Time Calculator"""
 
     def build(self):
         """Build the application"""
-        return MediationTimeGUI()
+        gui = MediationTimeGUI()
+        PROFILER.mark("build")
+        PROFILER.watch_first_paint(self)
+        METRICS.watch_frames()
+        return gui
 
     def get_current_date(self):
         """Returns today's date in DD.MM.YYYY format for KV file"""
@@ -0,0 +1,190 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+MedTime Table - Virtualized deadline table widget
+-------------------------------------------------
+This module provides DeadlineTable, a RecycleView that shows one row per
+dispute type and one column per week.
+
+Only the rows in the viewport have widgets, and those widgets are reused while
+scrolling. Row backgrounds are a single rectangle per recycled row, and all grid
+lines of the visible area are one Mesh in a shared instruction group that is
+rebuilt from the scroll position, so layout and drawing cost stay flat however
+many dispute types the registry holds.
+"""
+
+from typing import List, Sequence, Tuple
+
+from kivy.clock import Clock
+from kivy.graphics import Color, InstructionGroup, Mesh, Rectangle
+from kivy.metrics import dp
+from kivy.uix.boxlayout import BoxLayout
+from kivy.uix.label import Label
+from kivy.uix.recycleboxlayout import RecycleBoxLayout
+from kivy.uix.recycleview import RecycleView
+from kivy.uix.recycleview.views import RecycleDataViewBehavior
+
+from modules.core.common.metrics import METRICS
+
+HEADER_COLOR = (0, 0, 0.6, 1)  # Dark blue
+ROW_BACKGROUNDS = ((0.9, 0.95, 1, 1), (0.85, 0.9, 0.98, 1))
+GRID_COLOR = (1, 1, 1, 1)
+
+Cell = Tuple[str, Tuple[float, float, float, float]]
+
+
+class DeadlineRow(RecycleDataViewBehavior, BoxLayout):
+    """Recycled view for one table row; its labels are reused across rows"""
+
+    def __init__(self, **kwargs):
+        super().__init__(orientation="horizontal", **kwargs)
+        self.cells: List[Label] = []
+        with self.canvas.before:
+            self._background_color = Color(*ROW_BACKGROUNDS[0])
+            self._background = Rectangle(pos=self.pos, size=self.size)
+        self.bind(pos=self._update_background, size=self._update_background)
+
+    def _update_background(self, *args):
+        self._background.pos = self.pos
+        self._background.size = self.size
+
+    def _ensure_cells(self, widths: Sequence[float], height: float) -> None:
+        """Create or drop labels so the row has one per column"""
+        while len(self.cells) > len(widths):
+            self.remove_widget(self.cells.pop())
+        while len(self.cells) < len(widths):
+            first = not self.cells
+            label = Label(
+                size_hint=(None, None),
+                halign="left" if first else "center",
+                valign="middle",
+                padding=(dp(10), 0) if first else (0, 0),
+            )
+            self.cells.append(label)
+            self.add_widget(label)
+        for label, width in zip(self.cells, widths):
+            label.size = (width, height)
+            label.text_size = (width, height)
+
+    def refresh_view_attrs(self, rv, index, data):
+        """Show a row's data; only properties whose value changed are dispatched"""
+        self._ensure_cells(rv.column_widths, rv.row_height)
+        bold = data.get("bold", False)
+        for label, text, color in zip(self.cells, data["texts"], data["colors"]):
+            label.text = text
+            label.color = color
+            label.bold = bold
+        self._background_color.rgba = data.get("background", ROW_BACKGROUNDS[index % 2])
+
+
+class DeadlineTable(RecycleView):
+    """Virtualized dispute x week table with a single shared grid drawing"""
+
+    def __init__(self, dispute_width: float = dp(400), week_width: float = dp(100),
+                 row_height: float = dp(40), **kwargs):
+        super().__init__(**kwargs)
+        self.row_height = row_height
+        self.dispute_width = dispute_width
+        self.week_width = week_width
+        self.column_widths: Tuple[float, ...] = (dispute_width,)
+
+        layout = RecycleBoxLayout(
+            orientation="vertical",
+            size_hint=(None, None),
+            default_size=(None, row_height),
+            default_size_hint=(1, None),
+        )
+        layout.bind(minimum_height=layout.setter("height"))
+        self.add_widget(layout)
+        self.viewclass = DeadlineRow  # Stored on the layout manager, so set after adding it
+
+        # One group holds every grid line of the visible area
+        self._grid = InstructionGroup()
+        self._grid.add(Color(*GRID_COLOR))
+        self._grid_mesh = Mesh(mode="lines")
+        self._grid.add(self._grid_mesh)
+        self.canvas.after.add(self._grid)
+
+        self._grid_trigger = Clock.create_trigger(self._update_grid, -1)
+        self.bind(pos=self._grid_trigger, size=self._grid_trigger,
+                  scroll_x=self._grid_trigger, scroll_y=self._grid_trigger)
+        layout.bind(pos=self._grid_trigger, size=self._grid_trigger)
+
+    def set_table(self, header: Sequence[str], rows: Sequence[Tuple[str, Sequence[Cell]]]) -> None:
+        """Replace the table content
+
+        Args:
+            header: Column titles, the dispute column first
+            rows: (dispute name, [(text, color) per week]) for every row
+        """
+        self.column_widths = (self.dispute_width,) + (self.week_width,) * (len(header) - 1)
+        self.layout_manager.width = sum(self.column_widths)
+        data = [{
+            "texts": list(header),
+            "colors": [HEADER_COLOR] * len(header),
+            "bold": True,
+            "background": ROW_BACKGROUNDS[0],
+        }]
+        for index, (name, cells) in enumerate(rows, start=1):
+            data.append({
+                "texts": [name] + [text for text, _ in cells],
+                "colors": [HEADER_COLOR] + [color for _, color in cells],
+                "background": ROW_BACKGROUNDS[index % 2],
+            })
+        self.data = data
+        self._grid_trigger()
+
+    def set_cell(self, row: int, column: int, text: str, color) -> None:
+        """Change one data cell (0-based, header excluded) without redrawing
+
+        Call refresh_cells once after a batch of changes.
+        """
+        entry = self.data[row + 1]
+        entry["texts"][column + 1] = text
+        entry["colors"][column + 1] = color
+
+    def refresh_cells(self) -> None:
+        """Push changed cell data to the visible rows"""
+        self.refresh_from_data()
+
+    def _update_grid(self, *args) -> None:
+        """Rebuild the grid lines of the visible area in the shared mesh"""
+        layout = self.layout_manager
+        if layout is None or not self.data:
+            self._grid_mesh.vertices, self._grid_mesh.indices = [], []
+            return
+
+        # Visible part of the table in window coordinates
+        left, right = max(self.x, layout.x), min(self.right, layout.x + layout.width)
+        bottom, top = max(self.y, layout.y), min(self.top, layout.top)
+        if left >= right or bottom >= top:
+            self._grid_mesh.vertices, self._grid_mesh.indices = [], []
+            return
+
+        segments = []
+        boundary = layout.x
+        for width in (0,) + self.column_widths:
+            boundary += width
+            if left <= boundary <= right:
+                segments.append((boundary, bottom, boundary, top))
+        first = max(0, int((layout.top - top) // self.row_height))
+        last = min(len(self.data), int((layout.top - bottom) // self.row_height) + 1)
+        for row in range(first, last + 1):
+            y = layout.top - row * self.row_height
+            if bottom <= y <= top:
+                segments.append((left, y, right, y))
+
+        vertices: List[float] = []
+        for x1, y1, x2, y2 in segments:
+            vertices += (x1, y1, 0, 0, x2, y2, 0, 0)
+        self._grid_mesh.vertices = vertices
+        self._grid_mesh.indices = list(range(len(segments) * 2))
+
+    def grid_segment_count(self) -> int:
+        """Number of grid lines currently drawn (for diagnostics)"""
+        return len(self._grid_mesh.indices) // 2
+
+
+METRICS.instrument(DeadlineTable, "set_table", "gui.medtime.set_table", gui=True)
+METRICS.instrument(DeadlineTable, "refresh_cells", "gui.medtime.refresh_cells", gui=True)
@@ -0,0 +1,468 @@
+import unittest
+from datetime import date, datetime
+
+from .calculator import MediationTimeCalculator
+from .workdays import RollPolicy, WorkCalendar
+
+
+class TestWorkCalendar(unittest.TestCase):
+    """Unit tests for holiday and judicial recess aware deadlines."""
+
+    @classmethod
+    def setUpClass(cls):
+        cls.calendar = WorkCalendar(2020, 2030)
+        cls.recess_calendar = WorkCalendar(2020, 2030, judicial_recess=True)
+
+    def test_weekend_rolls_to_monday(self):
+        """A deadline on Saturday moves to the following Monday."""
+        self.assertEqual(self.calendar.adjust(date(2025, 1, 4)), date(2025, 1, 6))
+        self.assertEqual(self.calendar.adjust(date(2025, 1, 6)), date(2025, 1, 6))
+
+    def test_religious_and_fixed_holidays(self):
+        """Ramazan Bayramı and Cumhuriyet Bayramı are skipped; arife is a working day."""
+        self.assertEqual(self.calendar.adjust(date(2025, 3, 31)), date(2025, 4, 2))
+        self.assertEqual(self.calendar.holiday_name(date(2025, 3, 31)), "Ramazan Bayramı")
+        self.assertEqual(self.calendar.adjust(date(2025, 10, 29)), date(2025, 10, 30))
+        self.assertTrue(self.calendar.is_working_day(date(2025, 10, 28)))
+
+    def test_judicial_recess_extension(self):
+        """A deadline in the recess moves to a week after it ends, then to a working day."""
+        self.assertEqual(self.recess_calendar.adjust(date(2025, 7, 25)), date(2025, 9, 8))
+        self.assertEqual(self.calendar.adjust(date(2025, 7, 25)), date(2025, 7, 25))
+
+    def test_previous_working_day_policy(self):
+        """The roll policy can move deadlines backwards instead."""
+        calendar = WorkCalendar(2025, 2025, roll=RollPolicy.PREVIOUS_WORKING_DAY)
+        self.assertEqual(calendar.adjust(date(2025, 1, 4)), date(2025, 1, 3))
+
+    def test_calculator_and_batch_use_the_calendar(self):
+        """calculate_dates and calculate_dates_batch apply the same adjustment."""
+        import numpy as np
+        from .batch import calculate_dates_batch
+        calculator = MediationTimeCalculator(work_calendar=self.calendar)
+        # 3 weeks after 09.03.2025 is Sunday 30.03.2025, the first day of Ramazan Bayramı
+        dates = calculator.calculate_dates("09.03.2025")
+        self.assertEqual(dates[3], datetime(2025, 4, 2))
+        batch = calculate_dates_batch(["09.03.2025"], [3], work_calendar=self.calendar)
+        self.assertEqual(batch[3][0], np.datetime64("2025-04-02"))
+
+    def test_out_of_range(self):
+        """Dates outside the precomputed range are rejected."""
+        with self.assertRaises(ValueError):
+            self.calendar.adjust(date(2040, 1, 1))
+
+
+class TestDisputeRegistry(unittest.TestCase):
+    """Unit tests for the data-driven dispute registry."""
+
+    def test_bundled_file(self):
+        """The bundled data file keeps the original dispute types and ids."""
+        from .disputes import DisputeRegistry
+        registry = DisputeRegistry.default()
+        self.assertEqual(len(registry), 8)
+        self.assertEqual(registry.all_weeks, (2, 3, 4, 6, 8))
+        self.assertEqual(registry.get(2).name, "Ticaret Hukuku Uyuşmazlıkları")
+        self.assertEqual(registry.weeks_for("Ticaret Hukuku Uyuşmazlıkları"), frozenset({6, 8}))
+
+    def test_should_calculate_by_name_and_id(self):
+        """Membership works with names and ids and rejects unknown disputes."""
+        calculator = MediationTimeCalculator()
+        self.assertTrue(calculator.should_calculate("İş Hukuku Uyuşmazlıkları", 3))
+        self.assertFalse(calculator.should_calculate("İş Hukuku Uyuşmazlıkları", 6))
+        self.assertTrue(calculator.should_calculate(8, 2))
+        self.assertFalse(calculator.should_calculate("Bilinmeyen", 3))
+
+    def test_mask_matches_index(self):
+        """The dense mask agrees with the per-dispute week sets."""
+        from .disputes import DisputeRegistry
+        registry = DisputeRegistry.default()
+        for dispute, row in zip(registry, registry.mask):
+            for week, flag in zip(registry.all_weeks, row):
+                self.assertEqual(flag, registry.should_calculate(dispute.id, week))
+
+    def test_load_custom_file(self):
+        """Registries load from other data files; ids and names must be unique."""
+        import json
+        import os
+        import tempfile
+        from .disputes import DisputeRegistry, DisputeType
+        entries = [{"id": 10 + n, "name": f"Alt tür {n}", "weeks": [n % 5 + 1]} for n in range(300)]
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "disputes.json")
+            with open(path, "w", encoding="utf-8") as handle:
+                json.dump({"dispute_types": entries}, handle)
+            registry = DisputeRegistry.load(path)
+        calculator = MediationTimeCalculator(registry=registry)
+        self.assertEqual(calculator.get_all_weeks(), [1, 2, 3, 4, 5])
+        self.assertTrue(calculator.should_calculate(309, 5))
+        self.assertTrue(calculator.should_calculate("Alt tür 299", 5))
+        with self.assertRaises(ValueError):
+            DisputeRegistry([DisputeType("A", [1], 1), DisputeType("B", [2], 1)])
+
+
+class TestCaseDeadlines(unittest.TestCase):
+    """Unit tests for the bulk deadline API."""
+
+    def test_only_applicable_weeks(self):
+        """Weeks that do not apply to a case's dispute type are NaT."""
+        import numpy as np
+        from .batch import calculate_case_deadlines
+        deadlines = calculate_case_deadlines(["09.03.2025", "01.01.2024"], [1, 8])
+        self.assertEqual(sorted(deadlines), [2, 3, 4])
+        self.assertTrue(np.isnat(deadlines[2][0]))
+        self.assertEqual(deadlines[2][1], np.datetime64("2024-01-15"))
+        self.assertEqual(deadlines[3][0], np.datetime64("2025-03-30"))
+
+    def test_matches_scalar_calculator(self):
+        """Bulk results agree with calculate_dates and should_calculate."""
+        import numpy as np
+        from .batch import calculate_case_deadlines
+        calculator = MediationTimeCalculator()
+        names = [dispute.name for dispute in calculator.get_dispute_types()]
+        starts = ["29.02.2024", "31.12.2025", "1.7.2023"]
+        deadlines = calculate_case_deadlines(starts, names[:3], calculator)
+        for row, (start, name) in enumerate(zip(starts, names)):
+            dates = calculator.calculate_dates(datetime.strptime(start, "%d.%m.%Y"))
+            for week, column in deadlines.items():
+                if calculator.should_calculate(name, week):
+                    self.assertEqual(column[row], np.datetime64(dates[week].date()))
+                else:
+                    self.assertTrue(np.isnat(column[row]))
+
+    def test_malformed_start_dates(self):
+        """Overlong and short date strings are rejected instead of truncated or misread."""
+        import numpy as np
+        from .batch import to_datetime64
+        for bad in ("01.03.2025xyz", "01.03.20251", "01.03.202", "1.3.202", "01.03.2025 1"):
+            with self.assertRaises(ValueError, msg=bad):
+                to_datetime64(["09.03.2025", bad])
+            with self.assertRaises(ValueError, msg=bad):
+                to_datetime64([bad])
+        self.assertEqual(to_datetime64(["09.03.2025", " 1.3.2025 "]).tolist(),
+                         to_datetime64(["09.03.2025", "01.03.2025"]).tolist())
+
+    def test_unknown_dispute(self):
+        """Unknown names and out-of-range codes are rejected."""
+        from .batch import calculate_case_deadlines
+        with self.assertRaises(ValueError):
+            calculate_case_deadlines(["09.03.2025"], ["Bilinmeyen"])
+        with self.assertRaises(ValueError):
+            calculate_case_deadlines(["09.03.2025"], [99])
+
+    def test_csv_round_trip(self):
+        """CSV case lists produce one formatted column per week."""
+        import io
+        from .batch import stream_case_deadlines
+        source = io.StringIO("start_date,dispute\n09.03.2025,2\n09.03.2025,8\n")
+        sink = io.StringIO()
+        self.assertEqual(stream_case_deadlines(source, sink), 2)
+        self.assertEqual(sink.getvalue().splitlines(), [
+            "start_date,dispute,week_2,week_3,week_4,week_6,week_8",
+            "09.03.2025,2,,,,20.04.2025,04.05.2025",
+            "09.03.2025,8,23.03.2025,30.03.2025,06.04.2025,,",
+        ])
+
+    def test_main_reports_file_errors(self):
+        """A missing input or output folder ends with an error line, not a traceback."""
+        import contextlib
+        import io
+        import os
+        import tempfile
+        from .batch import main
+        with tempfile.TemporaryDirectory() as folder:
+            cases = os.path.join(folder, "cases.csv")
+            with open(cases, "w", encoding="utf-8") as handle:
+                handle.write("start_date,dispute\n09.03.2025,2\n")
+            output = os.path.join(folder, "out.csv")
+            for argv in ([os.path.join(folder, "missing.csv"), "-o", output],
+                         [cases, "-o", os.path.join(folder, "missing", "out.csv")]):
+                stderr = io.StringIO()
+                with contextlib.redirect_stderr(stderr):
+                    self.assertEqual(main(argv), 1)
+                self.assertTrue(stderr.getvalue().startswith("Error: "))
+            self.assertFalse(os.path.exists(output))
+
+
+class TestIcsExport(unittest.TestCase):
+    """Unit tests for the iCalendar exporter."""
+
+    CASES = [("2025/1", "09.03.2025", "1"), ("2025/2", "09.03.2025", "Ticaret Hukuku Uyuşmazlıkları")]
+
+    def export(self, cases, previous=None):
+        import io
+        from .ics import export_ics
+        sink = io.StringIO()
+        stats, state = export_ics(cases, sink, previous=previous)
+        return sink.getvalue(), stats, state
+
+    def test_one_event_per_applicable_week(self):
+        """Each case gets an all-day event for every week of its dispute type."""
+        text, stats, state = self.export(self.CASES, previous={})
+        self.assertTrue(text.startswith("BEGIN:VCALENDAR\r\n"))
+        self.assertTrue(text.endswith("END:VCALENDAR\r\n"))
+        self.assertEqual(stats.written, 4)
+        self.assertIn("UID:2025/1-1-w3@mediationcalculator\r\n", text)
+        self.assertIn("DTSTART;VALUE=DATE:20250504\r\n", text)
+        self.assertEqual(sorted(state), [
+            "2025/1-1-w3@mediationcalculator", "2025/1-1-w4@mediationcalculator",
+            "2025/2-2-w6@mediationcalculator", "2025/2-2-w8@mediationcalculator",
+        ])
+        self.assertEqual(self.export(self.CASES)[2], {})
+
+    def test_repeated_export_only_emits_changes(self):
+        """Unchanged events are skipped, changed ones get a new sequence, vanished ones are cancelled."""
+        _, _, state = self.export(self.CASES, previous={})
+        text, stats, _ = self.export(self.CASES, previous=state)
+        self.assertEqual((stats.written, stats.unchanged, stats.cancelled), (0, 4, 0))
+        self.assertNotIn("BEGIN:VEVENT", text)
+
+        text, stats, new_state = self.export([("2025/1", "10.03.2025", "1")], previous=state)
+        self.assertEqual((stats.written, stats.unchanged, stats.cancelled), (2, 0, 2))
+        self.assertIn("SEQUENCE:1\r\n", text)
+        self.assertEqual(text.count("STATUS:CANCELLED"), 2)
+        self.assertEqual(len(new_state), 2)
+
+    def test_state_file_round_trip(self):
+        """The state survives a save and load."""
+        import os
+        import tempfile
+        from .ics import load_state, save_state
+        _, _, state = self.export(self.CASES, previous={})
+        with tempfile.TemporaryDirectory() as folder:
+            path = os.path.join(folder, "export.state")
+            self.assertEqual(load_state(path), {})
+            save_state(path, state)
+            self.assertEqual(load_state(path), state)
+
+    def test_lines_are_folded_and_escaped(self):
+        """Long lines are folded at 75 octets without splitting UTF-8 characters."""
+        from .ics import escape_text, fold_line
+        self.assertEqual(escape_text("a,b;c\\d\ne"), "a\\,b\\;c\\\\d\\ne")
+        folded = fold_line("SUMMARY:" + "Ş" * 60)
+        lines = folded.split("\r\n")[:-1]
+        self.assertGreater(len(lines), 1)
+        self.assertTrue(all(len(line.encode("utf-8")) <= 75 for line in lines))
+        self.assertEqual("".join(line[1:] if n else line for n, line in enumerate(lines)), "SUMMARY:" + "Ş" * 60)
+
+
+    def test_case_ids_cannot_break_the_uid(self):
+        """Separators in case ids are escaped and line breaks are rejected."""
+        from .ics import event_uid
+        self.assertEqual(event_uid("2025;1,a", 1, 3), "2025\\;1\\,a-1-w3@mediationcalculator")
+        for case_id in ("2025/1\r\nSTATUS:CANCELLED", "2025/1\r", "2025\t1"):
+            with self.assertRaises(ValueError):
+                event_uid(case_id, 1, 3)
+        with self.assertRaises(ValueError):
+            self.export([("2025/1\nX", "09.03.2025", "1")])
+
+    def test_main_reports_file_errors(self):
+        """Missing input, output folders and malformed state files end with an error, not a traceback."""
+        import contextlib
+        import io
+        import os
+        import tempfile
+        from .ics import main
+        with tempfile.TemporaryDirectory() as folder:
+            cases = os.path.join(folder, "cases.csv")
+            with open(cases, "w", encoding="utf-8") as handle:
+                handle.write("case_id,start_date,dispute\n2025/1,09.03.2025,1\n")
+            state = os.path.join(folder, "export.state")
+            with open(state, "w", encoding="utf-8") as handle:
+                handle.write("not a state line\n")
+            output = os.path.join(folder, "out.ics")
+            for argv in ([os.path.join(folder, "missing.csv"), "-o", output],
+                         [cases, "-o", os.path.join(folder, "missing", "out.ics")],
+                         [cases, "-o", output, "--state", state]):
+                stderr = io.StringIO()
+                with contextlib.redirect_stderr(stderr):
+                    self.assertEqual(main(argv), 1)
+                self.assertTrue(stderr.getvalue().startswith("Error: "))
+            self.assertFalse(os.path.exists(output))
+
+class TestDocket(unittest.TestCase):
+    """Unit tests for the sorted deadline index over open cases."""
+
+    def setUp(self):
+        from .docket import Docket
+        self.docket = Docket()
+        self.docket.add_many([("2025/1", "09.03.2025", 1), ("2025/2", "09.03.2025", "2"),
+                              ("2025/3", date(2025, 5, 12), "Ticaret Hukuku Uyuşmazlıkları")])
+
+    def test_range_by_week(self):
+        """Range queries are inclusive, ordered by date and filtered by week."""
+        entries = self.docket.between("30.03.2025", "04.05.2025")
+        self.assertEqual([(entry.deadline, entry.week, entry.case_id) for entry in entries], [
+            (date(2025, 3, 30), 3, "2025/1"), (date(2025, 4, 6), 4, "2025/1"),
+            (date(2025, 4, 20), 6, "2025/2"), (date(2025, 5, 4), 8, "2025/2"),
+        ])
+        self.assertEqual([entry.case_id for entry in self.docket.between("01.01.2025", "31.12.2025", [8])],
+                         ["2025/2", "2025/3"])
+
+    def test_upcoming(self):
+        """The next N deadlines start at the given date."""
+        entries = self.docket.upcoming(2, date(2025, 4, 7))
+        self.assertEqual([(entry.deadline, entry.case_id) for entry in entries],
+                         [(date(2025, 4, 20), "2025/2"), (date(2025, 5, 4), "2025/2")])
+        self.assertEqual(self.docket.upcoming(5, "01.01.2030"), [])
+
+    def test_close_and_redate(self):
+        """Closed cases leave the index and re-dated ones move in it."""
+        self.docket.close("2025/2")
+        self.assertNotIn("2025/2", self.docket)
+        self.assertEqual(len(self.docket.between("01.01.2025", "31.12.2025", [6, 8])), 2)
+        case = self.docket.redate("2025/1", "01.06.2025")
+        self.assertEqual(case.deadlines, {3: date(2025, 6, 22), 4: date(2025, 6, 29)})
+        self.assertEqual([entry.deadline for entry in self.docket.upcoming(10, "01.01.2025", [3])],
+                         [date(2025, 6, 22)])
+        with self.assertRaises(KeyError):
+            self.docket.close("2025/2")
+
+    def test_invalid_cases(self):
+        """Duplicate ids, unknown dispute types and bad dates are rejected."""
+        with self.assertRaises(ValueError):
+            self.docket.add("2025/1", "01.01.2025", 1)
+        with self.assertRaises(ValueError):
+            self.docket.add("2025/9", "01.01.2025", "Bilinmeyen")
+        with self.assertRaises(ValueError):
+            self.docket.redate("2025/1", "2025-01-01")
+        self.assertEqual(self.docket.get("2025/1").start_date, date(2025, 3, 9))
+
+    def test_main_reports_missing_input(self):
+        """A missing case list ends with an error line, not a traceback."""
+        import contextlib
+        import io
+        import os
+        import tempfile
+        from .docket import main
+        with tempfile.TemporaryDirectory() as folder:
+            stderr = io.StringIO()
+            with contextlib.redirect_stderr(stderr):
+                self.assertEqual(main([os.path.join(folder, "missing.csv")]), 1)
+        self.assertTrue(stderr.getvalue().startswith("Error: "))
+
+    def test_matches_scan(self):
+        """Queries return what filtering every case's deadlines would."""
+        import random
+        from datetime import timedelta
+        from .docket import Docket
+        random.seed(7)
+        docket = Docket()
+        for number in range(300):
+            docket.add(number, date(2025, 1, 1) + timedelta(days=random.randrange(120)), random.randint(1, 8))
+        for number in range(0, 300, 3):
+            docket.redate(number, date(2025, 2, 1) + timedelta(days=number % 40))
+        for number in range(1, 300, 5):
+            docket.close(number)
+        first, last = date(2025, 3, 1), date(2025, 3, 31)
+        expected = sorted((deadline, week, case.case_id) for case in docket
+                          for week, deadline in case.deadlines.items() if first <= deadline <= last)
+        found = [(entry.deadline, entry.week, entry.case_id) for entry in docket.between(first, last)]
+        self.assertEqual(sorted(found), expected)
+        self.assertEqual(found, sorted(found, key=lambda item: item[:2]))
+
+
+class TestDeadlineGui(unittest.TestCase):
+    """Headless tests for the deadline screen."""
+
+    @classmethod
+    def setUpClass(cls):
+        import importlib.util
+        import os
+        if importlib.util.find_spec("kivy") is None:
+            raise unittest.SkipTest("Kivy is not installed")
+        os.environ.setdefault("KIVY_NO_ARGS", "1")  # Keep Kivy away from the test runner's arguments
+        from .gui import MediationTimeGUI
+        cls.gui_class = MediationTimeGUI
+
+    def setUp(self):
+        self.gui = self.gui_class()
+
+    def enter(self, text):
+        self.gui.ids.date_entry.text = text
+        self.gui._live_calculate(0)
+
+    def test_live_calculation_waits_for_a_whole_date(self):
+        """Partly typed dates leave the table alone; full ones are shown as typed."""
+        from .gui import is_complete_date
+        self.assertEqual([is_complete_date(text) for text in ("01.03.2", "1.3.2025", "0103202", "01.03.2025", "01032025")],
+                         [False, False, False, True, True])
+        self.enter("09.03.2025")
+        self.assertEqual(self.gui._last_start_date, datetime(2025, 3, 9))
+        self.enter("01.03.2")
+        self.assertEqual(self.gui._last_start_date, datetime(2025, 3, 9))
+        self.enter("01032025")
+        self.assertEqual(self.gui._last_start_date, datetime(2025, 3, 1))
+
+    def cell(self, dispute_name, week):
+        """Return the (text, color) of a cell as stored in the table's data"""
+        row, column = self.gui.data_cells[(dispute_name, week)]
+        entry = self.gui.deadline_table.data[row + 1]
+        return entry["texts"][column + 1], tuple(entry["colors"][column + 1])
+
+    def calculate(self, text):
+        self.gui.ids.date_entry.text = text
+        self.gui.calculate()
+
+    def test_cells_after_valid_invalid_and_valid_dates(self):
+        """Cells show dates, then the error, then dates again, with matching colors."""
+        from .gui import DATE_COLOR, EMPTY_COLOR, ERROR_COLOR
+        labor, commerce = "İş Hukuku Uyuşmazlıkları", "Ticaret Hukuku Uyuşmazlıkları"
+        self.calculate("09.03.2025")
+        self.assertEqual(self.cell(labor, 3), ("30.03.2025", DATE_COLOR))
+        self.assertEqual(self.cell(labor, 6), ("-", EMPTY_COLOR))
+        self.assertEqual(self.cell(commerce, 6), ("20.04.2025", DATE_COLOR))
+        self.calculate("31.02.2025")
+        self.assertEqual(self.cell(labor, 3), ("Invalid date", ERROR_COLOR))
+        self.assertEqual(self.cell(labor, 6), ("-", EMPTY_COLOR))
+        self.calculate("09.03.2025")
+        self.assertEqual(self.cell(labor, 3), ("30.03.2025", DATE_COLOR))
+        self.assertEqual(self.cell(commerce, 6), ("20.04.2025", DATE_COLOR))
+        for key, value in self.gui._cell_state.items():
+            self.assertEqual(self.cell(*key), value)
+
+    def test_only_changed_cells_are_refreshed(self):
+        """Unchanged cells are not rewritten and an unchanged table is not refreshed."""
+        table = self.gui.deadline_table
+        written, refreshed = [], []
+        set_cell, refresh_cells = table.set_cell, table.refresh_cells
+        table.set_cell = lambda *args: (written.append(args[:2]), set_cell(*args))
+        table.refresh_cells = lambda: (refreshed.append(True), refresh_cells())
+        self.calculate("09.03.2025")
+        applicable = sum(self.gui.calculator.should_calculate(*key) for key in self.gui.data_cells)
+        self.assertEqual((len(written), len(refreshed)), (applicable, 1))
+        self.gui.update_table_dates()
+        self.calculate("31.02.2025")
+        self.assertEqual((len(written), len(refreshed)), (2 * applicable, 2))
+        self.calculate("31.02.2025")  # The same error again changes nothing
+        self.assertEqual((len(written), len(refreshed)), (2 * applicable, 2))
+
+    def test_recycled_rows_and_grid_mesh(self):
+        """Visible rows are recycled views showing the data, and the grid is one mesh."""
+        from kivy.clock import Clock
+        from kivy.graphics import Mesh
+        from .table import DeadlineRow
+        self.calculate("09.03.2025")
+        self.gui.size = (1200, 600)
+        for _ in range(3):
+            Clock.tick()
+        table = self.gui.deadline_table
+        views = table.layout_manager.children
+        self.assertTrue(views and all(isinstance(view, DeadlineRow) for view in views))
+        self.assertLessEqual(len(views), len(table.data))
+        shown = 0
+        for index, entry in enumerate(table.data):
+            view = table.view_adapter.get_visible_view(index)
+            if view is not None:
+                self.assertEqual([label.text for label in view.cells], entry["texts"])
+                shown += 1
+        self.assertEqual(shown, len(views))
+        meshes = [instruction for instruction in table._grid.children if isinstance(instruction, Mesh)]
+        self.assertEqual(len(meshes), 1)
+        self.assertGreater(table.grid_segment_count(), len(table.column_widths))
+        table.data = []
+        table._update_grid()
+        self.assertEqual(table.grid_segment_count(), 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,268 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+"""
+MedTime Workdays - Holiday and judicial recess aware deadline adjustment
+------------------------------------------------------------------------
+This module moves deadlines that land on weekends, public holidays or the
+judicial recess (adli tatil) according to a configurable policy.
+
+All days of the configured year range are classified once into a compact
+flag array (one byte per day) and the adjusted target of every day is
+precomputed, so adjusting a deadline is a single array lookup.
+
+Religious holidays follow the lunar calendar. Official first days are listed in
+KNOWN_RELIGIOUS_HOLIDAYS; other years fall back to the tabular Islamic
+calendar, which can be a day off the officially announced date. Use
+extra_holidays to correct or extend the list.
+"""
+
+import math
+from array import array
+from datetime import date, datetime, timedelta
+from enum import Enum
+from typing import Dict, Iterable, List, Optional, Tuple, Union
+
+# Flag bits stored per day
+WEEKEND = 1
+HOLIDAY = 2
+HALF_DAY = 4
+RECESS = 8
+
+# Fixed-date public holidays: (month, day, name, first year in force)
+FIXED_HOLIDAYS = [
+    (1, 1, "Yılbaşı", 1900),
+    (4, 23, "Ulusal Egemenlik ve Çocuk Bayramı", 1900),
+    (5, 1, "Emek ve Dayanışma Günü", 2009),
+    (5, 19, "Atatürk'ü Anma, Gençlik ve Spor Bayramı", 1900),
+    (7, 15, "Demokrasi ve Milli Birlik Günü", 2017),
+    (8, 30, "Zafer Bayramı", 1900),
+    (10, 29, "Cumhuriyet Bayramı", 1900),
+]
+
+# Official first days of Ramazan Bayramı and Kurban Bayramı
+KNOWN_RELIGIOUS_HOLIDAYS: Dict[int, Tuple[date, date]] = {
+    2020: (date(2020, 5, 24), date(2020, 7, 31)),
+    2021: (date(2021, 5, 13), date(2021, 7, 20)),
+    2022: (date(2022, 5, 2), date(2022, 7, 9)),
+    2023: (date(2023, 4, 21), date(2023, 6, 28)),
+    2024: (date(2024, 4, 10), date(2024, 6, 16)),
+    2025: (date(2025, 3, 30), date(2025, 6, 6)),
+    2026: (date(2026, 3, 20), date(2026, 5, 27)),
+}
+
+# Judicial recess (HMK m.102): 20 July - 31 August
+RECESS_START = (7, 20)
+RECESS_END = (8, 31)
+
+
+class RollPolicy(Enum):
+    """What to do with a deadline that lands on a non-working day"""
+    NONE = "none"
+    NEXT_WORKING_DAY = "next"
+    PREVIOUS_WORKING_DAY = "previous"
+
+
+def _hijri_to_gregorian(year: int, month: int, day: int) -> date:
+    """Convert a tabular Islamic calendar date to a Gregorian date"""
+    julian_day = (day + math.ceil(29.5 * (month - 1)) + 354 * (year - 1)
+                  + (3 + 11 * year) // 30 + 1948438)
+    return date.fromordinal(julian_day - 1721425)
+
+
+def religious_holiday_starts(year: int) -> List[Tuple[date, str, int]]:
+    """Return the religious holidays starting in a Gregorian year
+
+    Returns:
+        List[Tuple[date, str, int]]: (first day, name, length in days) tuples
+    """
+    if year in KNOWN_RELIGIOUS_HOLIDAYS:
+        ramazan, kurban = KNOWN_RELIGIOUS_HOLIDAYS[year]
+        return [(ramazan, "Ramazan Bayramı", 3), (kurban, "Kurban Bayramı", 4)]
+
+    starts = []
+    hijri_year = int((year - 622) * 33 / 32)
+    for candidate in range(hijri_year - 1, hijri_year + 3):
+        # 1 Şevval and 10 Zilhicce
+        for month, day, name, length in ((10, 1, "Ramazan Bayramı", 3), (12, 10, "Kurban Bayramı", 4)):
+            start = _hijri_to_gregorian(candidate, month, day)
+            if start.year == year:
+                starts.append((start, name, length))
+    return sorted(starts)
+
+
+def holidays_for_year(year: int) -> List[Tuple[date, str, bool]]:
+    """List the public holidays of a year
+
+    Returns:
+        List[Tuple[date, str, bool]]: (day, name, is_half_day) tuples; the arife
+        afternoons before religious holidays and 28 October are half days
+    """
+    days = [(date(year, month, day), name, False)
+            for month, day, name, since in FIXED_HOLIDAYS if year >= since]
+    days.append((date(year, 10, 28), "Cumhuriyet Bayramı Arifesi", True))
+
+    for start, name, length in religious_holiday_starts(year):
+        days.append((start - timedelta(days=1), f"{name} Arifesi", True))
+        days.extend((start + timedelta(days=offset), name, False) for offset in range(length))
+    return sorted(days)
+
+
+class WorkCalendar:
+    """Precomputed non-working day index with O(1) deadline adjustment"""
+
+    def __init__(self, start_year: int = 2000, end_year: int = 2060,
+                 roll: RollPolicy = RollPolicy.NEXT_WORKING_DAY,
+                 judicial_recess: bool = False, recess_extension_days: int = 7,
+                 half_days_are_holidays: bool = False,
+                 extra_holidays: Iterable[date] = ()):
+        """Classify every day of the year range and precompute adjustments
+
+        Args:
+            start_year: First year covered by the index
+            end_year: Last year covered by the index
+            roll: Where a deadline on a weekend or holiday is moved
+            judicial_recess: Extend deadlines that fall into the judicial recess
+                to recess_extension_days after the recess ends (HMK m.104)
+            recess_extension_days: Days added after the end of the recess
+            half_days_are_holidays: Treat arife half days as non-working days
+            extra_holidays: Additional non-working days (e.g. bridge days)
+        """
+        if end_year < start_year:
+            raise ValueError("end_year must not be before start_year")
+        self.start_year = start_year
+        self.end_year = end_year
+        self.roll = roll
+        self.judicial_recess = judicial_recess
+        self.recess_extension_days = recess_extension_days
+        self.half_days_are_holidays = half_days_are_holidays
+
+        self.first_day = date(start_year, 1, 1)
+        self._base = self.first_day.toordinal()
+        # Leave a margin after the range so rolled or extended days stay indexable
+        self._size = date(end_year, 12, 31).toordinal() - self._base + 1
+        margin = 60
+        self.flags = bytearray(self._size + margin)
+        self._names: Dict[int, str] = {}
+
+        for offset in range(len(self.flags)):
+            if (self.first_day + timedelta(days=offset)).weekday() >= 5:
+                self.flags[offset] |= WEEKEND
+        for year in range(start_year, end_year + 2):
+            for day, name, half in holidays_for_year(year):
+                self._mark(day, HALF_DAY if half else HOLIDAY, name)
+            if judicial_recess:
+                recess_day = date(year, *RECESS_START)
+                while recess_day <= date(year, *RECESS_END):
+                    self._mark(recess_day, RECESS)
+                    recess_day += timedelta(days=1)
+        for day in extra_holidays:
+            self._mark(day, HOLIDAY, "Ek tatil")
+
+        self._adjusted = self._build_adjustments()
+
+    def _mark(self, day: date, flag: int, name: Optional[str] = None) -> None:
+        offset = day.toordinal() - self._base
+        if 0 <= offset < len(self.flags):
+            self.flags[offset] |= flag
+            if name and flag != RECESS:
+                self._names.setdefault(offset, name)
+
+    def _non_working_mask(self) -> int:
+        return WEEKEND | HOLIDAY | (HALF_DAY if self.half_days_are_holidays else 0)
+
+    def _build_adjustments(self) -> array:
+        """Precompute the adjusted offset for every day of the range"""
+        mask = self._non_working_mask()
+        total = len(self.flags)
+
+        # Nearest working day on or after / on or before each offset
+        next_working = array("i", [0]) * total
+        upcoming = total - 1
+        for offset in range(total - 1, -1, -1):
+            if not self.flags[offset] & mask:
+                upcoming = offset
+            next_working[offset] = upcoming
+        previous_working = array("i", [0]) * total
+        latest = 0
+        for offset in range(total):
+            if not self.flags[offset] & mask:
+                latest = offset
+            previous_working[offset] = latest
+
+        adjusted = array("i", range(self._size))
+        for offset in range(self._size):
+            target = offset
+            if self.judicial_recess and self.flags[target] & RECESS:
+                year = (self.first_day + timedelta(days=target)).year
+                recess_end = date(year, *RECESS_END).toordinal() - self._base
+                target = min(recess_end + self.recess_extension_days, total - 1)
+            if self.roll is RollPolicy.NEXT_WORKING_DAY:
+                target = next_working[target]
+            elif self.roll is RollPolicy.PREVIOUS_WORKING_DAY:
+                target = previous_working[target]
+            adjusted[offset] = target
+        return adjusted
+
+    def _offset(self, day: date) -> int:
+        offset = day.toordinal() - self._base
+        if not 0 <= offset < self._size:
+            raise ValueError(f"{day} is outside the calendar range {self.start_year}-{self.end_year}")
+        return offset
+
+    def is_working_day(self, day: Union[date, datetime]) -> bool:
+        """Return True if the day is neither a weekend nor a holiday"""
+        if isinstance(day, datetime):
+            day = day.date()
+        return not self.flags[self._offset(day)] & self._non_working_mask()
+
+    def in_judicial_recess(self, day: Union[date, datetime]) -> bool:
+        """Return True if the day falls into the judicial recess"""
+        if isinstance(day, datetime):
+            day = day.date()
+        month_day = (day.month, day.day)
+        return RECESS_START <= month_day <= RECESS_END
+
+    def holiday_name(self, day: Union[date, datetime]) -> Optional[str]:
+        """Return the holiday name for a day, or None"""
+        if isinstance(day, datetime):
+            day = day.date()
+        return self._names.get(self._offset(day))
+
+    def adjust(self, day: Union[date, datetime]) -> Union[date, datetime]:
+        """Move a deadline according to the calendar's policy
+
+        Args:
+            day: The unadjusted deadline; datetimes keep their time of day
+
+        Returns:
+            Union[date, datetime]: The adjusted deadline, of the same type as day
+
+        Raises:
+            ValueError: If the day is outside the calendar's year range
+        """
+        plain = day.date() if isinstance(day, datetime) else day
+        shift = self._adjusted[self._offset(plain)] - (plain.toordinal() - self._base)
+        return day + timedelta(days=shift) if shift else day
+
+    def adjust_ordinals(self, ordinals):
+        """Vectorized adjust for a NumPy array of proleptic Gregorian ordinals
+
+        Raises:
+            ValueError: If any day is outside the calendar's year range
+        """
+        import numpy as np
+        offsets = np.asarray(ordinals, dtype=np.int64) - self._base
+        if offsets.size and (offsets.min() < 0 or offsets.max() >= self._size):
+            raise ValueError(f"Some dates are outside the calendar range {self.start_year}-{self.end_year}")
+        table = np.frombuffer(self._adjusted, dtype=np.int32)
+        return table.take(offsets) + self._base
+
+    def adjust_datetime64(self, days):
+        """Vectorized adjust for a datetime64[D] array"""
+        import numpy as np
+        days = np.asarray(days, dtype="datetime64[D]")
+        # datetime64[D] counts days from 1970-01-01, ordinal 719163
+        epoch = date(1970, 1, 1).toordinal()
+        ordinals = days.astype(np.int64) + epoch
+        return (self.adjust_ordinals(ordinals) - epoch).astype("datetime64[D]")